@@ -3,7 +3,9 @@ from django.contrib.auth.admin import UserAdmin
 from django import forms
 from django.shortcuts import redirect
 from django.urls import reverse
-from .models import CustomUser
+from django.utils import timezone
+from django.utils.html import format_html
+from .models import CustomUser, Job, JobStatus
 from django.utils.translation import gettext_lazy as _
 
 class CustomUserForm(forms.ModelForm):
@@ -73,6 +75,87 @@ class CustomUserAdmin(UserAdmin):
         return form
 
 
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Progress of background jobs; users only see the jobs they queued."""
+    list_display = ("name", "status", "progress_bar", "message", "created_by", "created_at", "finished_at", "output")
+    list_filter = ("status", "name")
+    readonly_fields = (
+        "name",
+        "payload",
+        "status",
+        "progress",
+        "message",
+        "result",
+        "error",
+        "worker",
+        "created_by",
+        "started_at",
+        "finished_at",
+    )
+    actions = ["retry_selected"]
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request).select_related("created_by")
+        if request.user.is_superuser:
+            return qs
+        return qs.filter(created_by=request.user)
+
+    def changelist_view(self, request, extra_context=None):
+        # The page refreshes itself while any visible job is still pending.
+        extra_context = {
+            **(extra_context or {}),
+            "has_active_jobs": self.get_queryset(request)
+            .filter(status__in=[JobStatus.QUEUED, JobStatus.RUNNING])
+            .exists(),
+        }
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def has_module_permission(self, request) -> bool:
+        return request.user.is_active and request.user.is_staff
+
+    def has_view_permission(self, request, obj=None) -> bool:
+        # Every staff member may follow the jobs they queued, see get_queryset.
+        return request.user.is_active and request.user.is_staff
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def progress_bar(self, obj):
+        return format_html(
+            '<div class="progress" style="min-width: 8em;">'
+            '<div class="progress-bar" style="width: {}%;">{}%</div></div>',
+            obj.progress,
+            obj.progress,
+        )
+
+    progress_bar.short_description = _("progress")
+
+    def output(self, obj):
+        if obj.status != JobStatus.SUCCEEDED or not (obj.result or {}).get("file"):
+            return "-"
+        return format_html('<a href="{}">{}</a>', reverse("job-output", args=[obj.pk]), _("Download"))
+
+    output.short_description = _("Output")
+
+    @admin.action(description=_("Retry selected failed jobs"))
+    def retry_selected(self, request, queryset):
+        count = queryset.filter(status=JobStatus.FAILED).update(
+            status=JobStatus.QUEUED,
+            progress=0,
+            message="",
+            error="",
+            started_at=None,
+            finished_at=None,
+            updated_at=timezone.now(),
+        )
+        self.message_user(request, _("%(count)d jobs queued again.") % {"count": count})
+
+
 _original_index = admin.site.index
 
 def custom_index(self, request, extra_context=None):
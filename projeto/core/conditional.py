@@ -0,0 +1,66 @@
+import hashlib
+
+from django.contrib import messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+
+class ConditionalChangelistMixin:
+    """
+    Answers repeat changelist loads with 304 Not Modified before rendering.
+    The ETag is derived from the filtered queryset's count and latest
+    ``updated_at`` (see ``changelist_version``), the page URL, the user and
+    the language; the latest ``updated_at`` is also sent as Last-Modified.
+    ``changelist_related`` names the relations the rows render (e.g. in
+    ``__str__``), whose latest ``updated_at`` is part of the ETag too.
+    Browsers are told to revalidate on every load.
+    """
+    changelist_related = ()
+
+    def changelist_version(self, request, queryset):
+        """Values that change whenever the rendered changelist would."""
+        return queryset.order_by().aggregate(
+            count=Count("pk"), last_modified=Max("updated_at"), **self.related_versions()
+        )
+
+    def related_versions(self):
+        """Aggregates of the latest ``updated_at`` of each of ``changelist_related``."""
+        return {f"{path}_modified": Max(f"{path}__updated_at") for path in self.changelist_related}
+
+    def get_changelist_instance(self, request):
+        # changelist_view builds the ChangeList again: reuse the one built for the ETag.
+        changelist = getattr(request, "_conditional_changelist", None)
+        if changelist is None or changelist.model_admin is not self:
+            changelist = super().get_changelist_instance(request)
+        return changelist
+
+    def changelist_view(self, request, extra_context=None):
+        # Pending messages are shown once on the page: it must be rendered.
+        if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+            return super().changelist_view(request, extra_context)
+        try:
+            changelist = request._conditional_changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return super().changelist_view(request, extra_context)
+
+        version = self.changelist_version(request, changelist.queryset)
+        key = repr(
+            (request.get_full_path(), request.user.pk, get_language(), sorted(version.items(), key=str))
+        )
+        etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        last_modified = version.get("last_modified")
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().changelist_view(request, extra_context)
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            if timestamp is not None:
+                response.headers["Last-Modified"] = http_date(timestamp)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Cookie",))
+        return response
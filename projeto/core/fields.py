@@ -0,0 +1,69 @@
+import zlib
+
+from django.core.exceptions import FieldError
+from django.db import models
+
+# First byte of a stored value: how the rest of it is encoded.
+STORED = b"\x00"
+DEFLATED = b"\x01"
+# Shorter texts rarely shrink enough to pay for decompressing them.
+MIN_COMPRESS_SIZE = 64
+
+
+def compress_text(value):
+    if value == "":
+        return b""
+    data = value.encode()
+    if len(data) >= MIN_COMPRESS_SIZE:
+        deflated = zlib.compress(data, 6)
+        if len(deflated) < len(data):
+            return DEFLATED + deflated
+    return STORED + data
+
+
+def decompress_text(value):
+    value = bytes(value)
+    if not value:
+        return ""
+    if value[:1] == DEFLATED:
+        return zlib.decompress(value[1:]).decode()
+    return value[1:].decode()
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField stored as a binary column, zlib-compressed when that makes
+    it smaller; Python code reads and writes plain str. Queries can only
+    compare the whole value (e.g. ``exclude(field="")``): contains and
+    other text lookups would not see the compressed content, so they
+    raise FieldError.
+    """
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return None if value is None else compress_text(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        return None if value is None else connection.Database.Binary(value)
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else decompress_text(value)
+
+
+class UnsupportedLookup(models.Lookup):
+    def __init__(self, lhs, rhs):
+        raise FieldError(
+            f"Unsupported lookup '{self.lookup_name}' for {type(lhs.output_field).__name__}: "
+            "its values are stored compressed and can only be compared whole."
+        )
+
+
+for lookup_name in (
+    "iexact", "contains", "icontains", "startswith", "istartswith", "endswith", "iendswith", "regex", "iregex",
+):
+    CompressedTextField.register_lookup(
+        type(f"Unsupported{lookup_name.capitalize()}", (UnsupportedLookup,), {"lookup_name": lookup_name})
+    )
@@ -0,0 +1,154 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def register(name):
+    """
+    Registers a job handler under ``name``. The handler is called as
+    ``handler(job, **payload)`` and may call ``report_progress(job, ...)``;
+    its return value (JSON-serializable) is stored as the job result.
+    Handlers that run longer than ``JOB_LEASE_SECONDS`` must report
+    progress, which renews their lease.
+    """
+    def decorator(function):
+        HANDLERS[name] = function
+        return function
+    return decorator
+
+
+def enqueue(name, payload=None, user=None):
+    if name not in HANDLERS:
+        raise KeyError(f"No job handler registered as {name!r}")
+    return Job.objects.create(name=name, payload=payload or {}, created_by=user)
+
+
+def report_progress(job, progress, message=""):
+    """
+    Writes progress (0-100) straight to the row, outside the handler's
+    transactions, and renews the lease, unless the job was requeued and
+    is no longer this worker's.
+    """
+    job.progress = max(0, min(int(progress), 100))
+    job.message = message[:255]
+    Job.objects.filter(pk=job.pk, worker=job.worker).update(
+        progress=job.progress, message=job.message, updated_at=timezone.now()
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_stale():
+    """
+    Puts running jobs whose lease expired (no progress reported for
+    ``JOB_LEASE_SECONDS``) back in the queue: their worker died without
+    recording an outcome. Returns how many were requeued.
+    """
+    expired = timezone.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    stale = Job.objects.filter(status=JobStatus.RUNNING, updated_at__lt=expired)
+    count = 0
+    for pk, worker in stale.values_list("pk", "worker"):
+        # Guarded like the claim, so a job that just reported progress stays with its worker.
+        if Job.objects.filter(pk=pk, status=JobStatus.RUNNING, updated_at__lt=expired).update(
+            status=JobStatus.QUEUED, worker="", started_at=None, progress=0, message="", updated_at=timezone.now()
+        ):
+            logger.warning("Job %s was left running by %s; queued again", pk, worker)
+            count += 1
+    return count
+
+
+def claim_next(worker):
+    """
+    Atomically moves the oldest queued job to running and returns it, or
+    None when the queue is empty. Stale running jobs are requeued first.
+
+    Databases with ``SELECT ... FOR UPDATE SKIP LOCKED`` (PostgreSQL) lock
+    the row so concurrent workers skip it. Elsewhere (SQLite) the claim is
+    a compare-and-swap UPDATE guarded by ``status='queued'``: the database
+    write lock serializes it, and a worker that loses the race just tries
+    the next candidate.
+    """
+    requeue_stale()
+    queued = Job.objects.filter(status=JobStatus.QUEUED).order_by("created_at")
+    now = timezone.now()
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = queued.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(
+                status=JobStatus.RUNNING, worker=worker, started_at=now, updated_at=now
+            )
+    else:
+        for pk in queued.values_list("pk", flat=True)[:10]:
+            claimed = Job.objects.filter(pk=pk, status=JobStatus.QUEUED).update(
+                status=JobStatus.RUNNING, worker=worker, started_at=now, updated_at=now
+            )
+            if claimed:
+                break
+        else:
+            return None
+        job = Job(pk=pk)
+
+    job.refresh_from_db()
+    return job
+
+
+def record_outcome(job, **values):
+    """
+    Stores the outcome of a run, unless the job was requeued meanwhile
+    (see requeue_stale): the worker that holds it now records its own.
+    """
+    recorded = Job.objects.filter(pk=job.pk, status=JobStatus.RUNNING, worker=job.worker).update(
+        **values, finished_at=timezone.now(), updated_at=timezone.now()
+    )
+    if not recorded:
+        logger.warning("Job %s was requeued while %s ran it; its outcome is dropped", job.pk, job.worker)
+
+
+def run_job(job):
+    """Runs a claimed job and records its outcome."""
+    try:
+        result = HANDLERS[job.name](job, **job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.name)
+        record_outcome(job, status=JobStatus.FAILED, error=traceback.format_exc())
+        return False
+
+    record_outcome(job, status=JobStatus.SUCCEEDED, progress=100, result=result)
+    return True
+
+
+def work(worker=None, once=False, poll_interval=2.0):
+    """
+    Worker loop: claims and runs jobs until the queue is empty (``once``)
+    or forever, sleeping ``poll_interval`` seconds when idle.
+    Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while True:
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                return count
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        count += 1
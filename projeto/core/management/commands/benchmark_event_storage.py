@@ -0,0 +1,108 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from projeto.core.fields import compress_text, decompress_text
+
+# Same layout Django uses for Event on SQLite, with the text columns as
+# TEXT (before migration 0019) or as compressed BLOBs (after).
+CREATE_TABLE = """
+CREATE TABLE event (
+    uuid char(32) NOT NULL PRIMARY KEY,
+    item_id char(32) NOT NULL,
+    kind varchar(50) NOT NULL,
+    send_at datetime NOT NULL,
+    returned_at datetime NULL,
+    certificate_number varchar(50) NOT NULL,
+    certificate_results {type} NOT NULL,
+    observation {type} NOT NULL
+)
+"""
+# What the event changelist reads: every column but the texts.
+LIST_QUERY = (
+    "SELECT uuid, item_id, kind, send_at, returned_at, certificate_number FROM event "
+    "WHERE kind = 'calibration' ORDER BY send_at DESC LIMIT 100"
+)
+TEXT_QUERY = "SELECT certificate_results, observation FROM event"
+
+
+def certificate_results(points):
+    lines = [f"Faixa 0 a {random.choice((200, 500, 1000))} g, resolução 0,001 g"]
+    for _ in range(points):
+        nominal = random.choice((1, 2, 5, 10, 20, 50, 100, 200))
+        lines.append(
+            f"Ponto {nominal},000 g: indicação {nominal + random.uniform(-0.01, 0.01):.4f} g; "
+            f"incerteza expandida {random.uniform(0.0005, 0.003):.4f} g (k=2); tolerância 0,010 g"
+        )
+    return "\n".join(lines)
+
+
+class Command(BaseCommand):
+    help = "Compares table size and list scan time of events with plain and compressed text fields on SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--points", type=int, default=12, help="Calibration points per certificate.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        rows = [
+            (
+                uuid.uuid4().hex,
+                uuid.uuid4().hex[:8] * 4,
+                random.choice(("calibration", "preventive_maintenance", "check")),
+                f"20{random.randint(15, 26)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d} 12:00:00",
+                None,
+                f"CERT-{index}",
+                certificate_results(options["points"]),
+                "Equipamento recebido em bom estado, ajustado e aprovado para uso.",
+            )
+            for index in range(options["rows"])
+        ]
+
+        self.stdout.write(f"{'storage':<12} {'table MB':>10} {'list scan ms':>14} {'read texts ms':>14}")
+        for name, column_type, encode, decode in (
+            ("text", "text", str, str),
+            ("compressed", "BLOB", compress_text, decompress_text),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                result = self.run_one(os.path.join(directory, f"{name}.sqlite3"), column_type, encode, decode, rows, options)
+            self.stdout.write(
+                f"{name:<12} {result['table_mb']:>10.1f} {result['list_ms']:>14.1f} {result['text_ms']:>14.1f}"
+            )
+
+    def run_one(self, path, column_type, encode, decode, rows, options):
+        connection = sqlite3.connect(path)
+        connection.execute(CREATE_TABLE.format(type=column_type))
+        connection.executemany(
+            "INSERT INTO event VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*row[:6], encode(row[6]), encode(row[7])) for row in rows],
+        )
+        connection.commit()
+        table_bytes = connection.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'event'").fetchone()[0]
+        connection.close()
+
+        list_times, text_times = [], []
+        for _ in range(options["repeat"]):
+            # A new connection each time: SQLite's page cache starts empty.
+            connection = sqlite3.connect(path)
+            started = time.perf_counter()
+            connection.execute(LIST_QUERY).fetchall()
+            list_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            for results, observation in connection.execute(TEXT_QUERY):
+                decode(results), decode(observation)
+            text_times.append(time.perf_counter() - started)
+            connection.close()
+
+        return {
+            "table_mb": table_bytes / 2**20,
+            "list_ms": 1000 * min(list_times),
+            "text_ms": 1000 * min(text_times),
+        }
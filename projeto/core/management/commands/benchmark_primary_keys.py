@@ -0,0 +1,68 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from projeto.core.models import uuid7
+
+# Same layout Django uses for Event on SQLite: UUIDs are stored as char(32).
+CREATE_TABLE = """
+CREATE TABLE event (
+    uuid char(32) NOT NULL PRIMARY KEY,
+    item_id char(32) NOT NULL,
+    kind varchar(50) NOT NULL,
+    send_at datetime NOT NULL
+)
+"""
+CREATE_INDEX = "CREATE INDEX event_item_id ON event (item_id)"
+
+
+class Command(BaseCommand):
+    help = "Compares insert throughput and index size of uuid4 and uuid7 primary keys on SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2_000_000)
+        parser.add_argument("--equipment", type=int, default=10_000, help="Distinct item_id values.")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        items = [uuid.uuid4().hex for _ in range(options["equipment"])]
+
+        self.stdout.write(f"{'default':<8} {'rows/s':>12} {'pk index MB':>12} {'fk index MB':>12} {'file MB':>10}")
+        for name, factory in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+            with tempfile.TemporaryDirectory() as directory:
+                result = self.run_one(os.path.join(directory, f"{name}.sqlite3"), factory, items, options)
+            self.stdout.write(
+                f"{name:<8} {result['rows_per_second']:>12,.0f} {result['pk_index_mb']:>12.1f} "
+                f"{result['fk_index_mb']:>12.1f} {result['file_mb']:>10.1f}"
+            )
+
+    def run_one(self, path, factory, items, options):
+        connection = sqlite3.connect(path)
+        connection.execute(CREATE_TABLE)
+        connection.execute(CREATE_INDEX)
+
+        rows, batch_size = options["rows"], options["batch_size"]
+        started = time.perf_counter()
+        for start in range(0, rows, batch_size):
+            batch = [
+                (factory().hex, random.choice(items), "calibration", "2025-01-01 00:00:00")
+                for _ in range(min(batch_size, rows - start))
+            ]
+            connection.executemany("INSERT INTO event VALUES (?, ?, ?, ?)", batch)
+            connection.commit()
+        elapsed = time.perf_counter() - started
+
+        sizes = dict(connection.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        connection.close()
+
+        return {
+            "rows_per_second": rows / elapsed,
+            "pk_index_mb": sizes.get("sqlite_autoindex_event_1", 0) / 2**20,
+            "fk_index_mb": sizes.get("event_item_id", 0) / 2**20,
+            "file_mb": os.path.getsize(path) / 2**20,
+        }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projeto.core.sharding import mirror_all, shard_databases
+
+
+class Command(BaseCommand):
+    help = "Copies every laboratory and asset into the campus databases (CAMPUS_DATABASES)."
+
+    def handle(self, *args, **options):
+        databases = shard_databases()
+        if not databases:
+            raise CommandError("CAMPUS_DATABASES names no campus database.")
+        count = mirror_all()
+        self.stdout.write(f"Mirrored {count} rows into {', '.join(databases)}.")
@@ -0,0 +1,39 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from projeto.core.jobs import work
+
+
+def start_worker(once, poll_interval):
+    # Child processes set Django up on their own (spawn) and never reuse
+    # the parent's database connections (fork).
+    django.setup()
+    connections.close_all()
+    return work(once=once, poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs with a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2)
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        processes = max(options["processes"], 1)
+        if processes == 1:
+            count = work(once=options["once"], poll_interval=options["poll_interval"])
+            self.stdout.write(f"Ran {count} jobs.")
+            return
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(start_worker, options["once"], options["poll_interval"]) for _ in range(processes)
+            ]
+            count = sum(future.result() for future in futures)
+        self.stdout.write(f"Ran {count} jobs.")
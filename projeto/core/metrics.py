@@ -0,0 +1,112 @@
+import bisect
+import threading
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names):
+        self.name, self.help_text, self.label_names = name, help_text, label_names
+        self.values = defaultdict(float)
+
+    def inc(self, labels, amount=1):
+        self.values[tuple(labels)] += amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, list(zip(self.label_names, labels)), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name, self.help_text, self.label_names = name, help_text, label_names
+        self.buckets = tuple(buckets)
+        self.counts = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, labels, value):
+        labels = tuple(labels)
+        self.counts[labels][bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self):
+        for labels, counts in sorted(self.counts.items()):
+            pairs = list(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", pairs + [("le", bound)], cumulative
+            yield f"{self.name}_sum", pairs, self.sums[labels]
+            yield f"{self.name}_count", pairs, cumulative
+
+
+class Registry:
+    """
+    In-process metrics in the Prometheus text format. Values live in the
+    memory of the serving process, so a scrape only sees the requests that
+    process handled: run the application in a single worker process (with
+    threads) for the counters to be complete.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(
+    Counter("http_requests_total", "Requests by view, method and status.", ("view", "method", "status"))
+)
+LATENCY = registry.register(
+    Histogram("http_request_duration_seconds", "Total request latency.", ("view",), LATENCY_BUCKETS)
+)
+QUERIES = registry.register(
+    Histogram("http_request_db_queries", "SQL queries run per request.", ("view",), QUERY_COUNT_BUCKETS)
+)
+SQL_TIME = registry.register(
+    Histogram("http_request_db_duration_seconds", "Time spent in SQL per request.", ("view",), LATENCY_BUCKETS)
+)
+RESPONSE_SIZE = registry.register(
+    Histogram("http_response_size_bytes", "Response body size.", ("view",), SIZE_BUCKETS)
+)
+
+
+def observe_request(view, method, status, duration, queries, sql_duration, size):
+    with registry.lock:
+        REQUESTS.inc((view, method, status))
+        LATENCY.observe((view,), duration)
+        QUERIES.observe((view,), queries)
+        SQL_TIME.observe((view,), sql_duration)
+        if size is not None:
+            RESPONSE_SIZE.observe((view,), size)
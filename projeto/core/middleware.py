@@ -0,0 +1,239 @@
+import cProfile
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.regex_helper import _lazy_re_compile
+
+from . import metrics, sharding
+from .profiling import SlowQueryCapture, profile_sort_key, save_profile
+from .scoping import get_laboratory_scope, resolve_laboratory_scope
+
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip.
+    brotli = None
+
+slow_request_logger = logging.getLogger("projeto.requests")
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class LaboratoryScopeMiddleware:
+    """
+    Attaches ``request.laboratory_scope``, resolved at most once per request.
+    Must come after AuthenticationMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.laboratory_scope = SimpleLazyObject(lambda: resolve_laboratory_scope(request.user))
+        return self.get_response(request)
+
+
+class CampusDatabaseMiddleware:
+    """
+    Runs requests scoped to a laboratory against the database of its
+    campus (see ``projeto.core.sharding``), streamed content included.
+    Does nothing until CAMPUS_DATABASES names a database.
+    Must come after LaboratoryScopeMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not sharding.shard_databases():
+            return self.get_response(request)
+        scope = get_laboratory_scope(request)
+        if scope.is_global:
+            return self.get_response(request)
+
+        alias = sharding.database_for_laboratory(scope.laboratory_id)
+        with sharding.using_database(alias):
+            response = self.get_response(request)
+        # Files are streamed without queries; keep them on wsgi.file_wrapper.
+        if response.streaming and not isinstance(response, FileResponse):
+            response.streaming_content = sharding.iterate_in_database(alias, response.streaming_content)
+        return response
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` that counts queries and sums their time."""
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get("Content-Length")
+        return int(length) if length else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, SQL query count and time, and response size per URL
+    name into ``projeto.core.metrics``, and logs requests slower than
+    ``SLOW_REQUEST_THRESHOLD_MS`` to the ``projeto.requests`` logger.
+    Goes first in MIDDLEWARE so the latency covers the whole stack.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view = view_label(request)
+        size = response_size(response)
+        metrics.observe_request(
+            view, request.method, response.status_code, duration, timer.count, timer.duration, size
+        )
+
+        threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD_MS", None)
+        if threshold is not None and duration * 1000 >= threshold:
+            entry = {
+                "event": "slow_request",
+                "view": view,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 1),
+                "queries": timer.count,
+                "sql_ms": round(timer.duration * 1000, 1),
+                "size": size,
+                "user": getattr(getattr(request, "user", None), "pk", None),
+            }
+            slow_request_logger.warning(json.dumps(entry, default=str), extra=entry)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Lets superusers profile a single request with cProfile by sending the
+    ``X-Profile`` header or the ``_profile`` query flag (optionally naming
+    the sort key, e.g. ``?_profile=tottime``). The report is saved under
+    PROFILE_ROOT and its name returned in the ``X-Profile-Report`` header.
+
+    SELECTs slower than ``SLOW_QUERY_THRESHOLD_MS`` are EXPLAINed and logged
+    on every request, and included in the report of profiled ones.
+    Must come after AuthenticationMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+        captures = []
+        with ExitStack() as stack:
+            if threshold is not None:
+                for alias in connections:
+                    capture = SlowQueryCapture(connections[alias], threshold)
+                    stack.enter_context(connections[alias].execute_wrapper(capture))
+                    captures.append(capture)
+
+            sort_key = self.profile_request(request)
+            if sort_key is None:
+                return self.get_response(request)
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+
+        slow_queries = [query for capture in captures for query in capture.queries]
+        response["X-Profile-Report"] = save_profile(profiler, request, view_label(request), sort_key, slow_queries)
+        return response
+
+    def profile_request(self, request):
+        """Returns the pstats sort key when this request should be profiled, else None."""
+        flag = request.headers.get("X-Profile")
+        if flag is None and "_profile" in request.GET:
+            # Drop the flag so it does not reach views (the admin changelist
+            # would treat it as an unknown filter).
+            request.GET = request.GET.copy()
+            flag = request.GET.pop("_profile")[-1]
+        if flag is None or not request.user.is_superuser:
+            return None
+        return profile_sort_key(flag)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that answers with brotli instead when the client accepts
+    it and the ``brotli`` package is installed. Streaming responses are
+    always gzipped. Byte-range responses and already compressed types are
+    passed through: encoding them would break resumed downloads (and their
+    strong ETag) and save nothing.
+    """
+    brotli_quality = 5
+    incompressible_types = (
+        "application/pdf",
+        "application/zip",
+        "application/gzip",
+        "application/vnd.apache.parquet",
+        "image/png",
+        "image/jpeg",
+        "image/gif",
+        "image/webp",
+        "audio/",
+        "video/",
+    )
+
+    def compressible(self, response):
+        if response.status_code == 206 or response.has_header("Content-Range") or response.has_header("Accept-Ranges"):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return not content_type.startswith(self.incompressible_types)
+
+    def process_response(self, request, response):
+        if not self.compressible(response):
+            return response
+        accepts_brotli = re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is None or not accepts_brotli or response.streaming:
+            return super().process_response(request, response)
+        if len(response.content) < 200 or response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        # As GZipMiddleware: the encoded body is no longer byte-identical.
+        if (etag := response.get("ETag")) and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -1,14 +1,62 @@
+import os
+import threading
+import time
 import uuid
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
+_uuid7_lock = threading.Lock()
+_uuid7_last = {"timestamp_ms": 0, "counter": 0}
+
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7): a 48-bit Unix timestamp in
+    milliseconds, a 12-bit counter that keeps ids monotonic within the same
+    millisecond, and 62 random bits.
+    """
+    with _uuid7_lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms <= _uuid7_last["timestamp_ms"]:
+            timestamp_ms = _uuid7_last["timestamp_ms"]
+            counter = _uuid7_last["counter"] + 1
+            if counter > 0xFFF:
+                timestamp_ms += 1
+                counter = 0
+        else:
+            counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        _uuid7_last["timestamp_ms"] = timestamp_ms
+        _uuid7_last["counter"] = counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        (timestamp_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
+
+
+def default_uuid():
+    """
+    Primary key default of BaseModel. Random uuid4 unless
+    ``TIME_ORDERED_PRIMARY_KEYS`` is enabled; existing rows keep their keys
+    either way, only new rows pick up the configured format.
+    """
+    if getattr(settings, "TIME_ORDERED_PRIMARY_KEYS", False):
+        return uuid7()
+    return uuid.uuid4()
+
 
 class BaseModel(models.Model):
     """
     Base model that includes common fields for all models.
     """
-    uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uuid = models.UUIDField(primary_key=True, default=default_uuid, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -23,3 +71,52 @@ class CustomUser(AbstractUser):
         null=True,
         blank=True
     )
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", _("Queued")
+    RUNNING = "running", _("Running")
+    SUCCEEDED = "succeeded", _("Succeeded")
+    FAILED = "failed", _("Failed")
+
+
+class Job(BaseModel):
+    """
+    Background job run by `manage.py run_workers`. ``name`` selects a handler
+    registered with ``projeto.core.jobs.register``, ``payload`` holds its
+    keyword arguments.
+    """
+    name = models.CharField(verbose_name=_("name"), max_length=100)
+    payload = models.JSONField(verbose_name=_("payload"), default=dict, blank=True)
+    status = models.CharField(
+        verbose_name=_("status"), max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    progress = models.PositiveSmallIntegerField(verbose_name=_("progress"), default=0)
+    message = models.CharField(verbose_name=_("message"), max_length=255, blank=True, default="")
+    result = models.JSONField(verbose_name=_("result"), null=True, blank=True)
+    error = models.TextField(verbose_name=_("error"), blank=True, default="")
+    worker = models.CharField(verbose_name=_("worker"), max_length=100, blank=True, default="")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("created by"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    started_at = models.DateTimeField(verbose_name=_("started at"), null=True, blank=True)
+    finished_at = models.DateTimeField(verbose_name=_("finished at"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = _("Job")
+        verbose_name_plural = _("Jobs")
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+        ]
@@ -0,0 +1,87 @@
+import io
+import json
+import logging
+import pstats
+import time
+import uuid
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+slow_query_logger = logging.getLogger("projeto.sql")
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls")
+
+
+def explain(connection, sql, params):
+    """Returns the backend's query plan for ``sql`` as text lines."""
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+    except DatabaseError as error:
+        return [f"EXPLAIN failed: {error}"]
+
+
+class SlowQueryCapture:
+    """
+    ``connection.execute_wrapper`` that runs EXPLAIN for every SELECT
+    slower than ``threshold_ms`` and logs it to ``projeto.sql``.
+    """
+    def __init__(self, connection, threshold_ms):
+        self.connection = connection
+        self.threshold = threshold_ms / 1000
+        self.queries = []
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold and not many and sql.lstrip()[:6].upper() in ("SELECT", "WITH"):
+            self.explaining = True
+            try:
+                plan = explain(self.connection, sql, params)
+            finally:
+                self.explaining = False
+            entry = {
+                "event": "slow_query",
+                "database": self.connection.alias,
+                "duration_ms": round(duration * 1000, 1),
+                "sql": sql,
+                "params": params,
+                "plan": plan,
+            }
+            self.queries.append(entry)
+            slow_query_logger.warning(json.dumps(entry, default=str))
+        return result
+
+
+def profile_sort_key(value):
+    return value if value in PROFILE_SORT_KEYS else "cumulative"
+
+
+def save_profile(profiler, request, view, sort_key, slow_queries, limit=60):
+    """
+    Writes the raw cProfile data (``.prof``, for snakeviz or pstats) and a
+    text report with the top functions and the captured slow queries under
+    PROFILE_ROOT. Returns the report name.
+    """
+    root = settings.PROFILE_ROOT
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"{timezone.now():%Y%m%dT%H%M%S}-{slugify(view)}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(root / f"{name}.prof")
+
+    output = io.StringIO()
+    output.write(f"{request.method} {request.get_full_path()}\nview: {view}\nuser: {request.user}\n\n")
+    pstats.Stats(profiler, stream=output).sort_stats(sort_key).print_stats(limit)
+    for query in slow_queries:
+        output.write(f"\n-- {query['duration_ms']} ms ({query['database']})\n{query['sql']}\nparams: {query['params']}\n")
+        output.writelines(f"  {line}\n" for line in query["plan"])
+    (root / f"{name}.txt").write_text(output.getvalue(), encoding="utf-8")
+    return name
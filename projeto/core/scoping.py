@@ -0,0 +1,118 @@
+from contextlib import nullcontext
+from dataclasses import dataclass
+from uuid import UUID
+
+from django.contrib import messages
+from django.contrib.admin import helpers
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext as _
+
+from .sharding import across_databases, database_of, fans_out, shard_databases, using_database
+
+
+@dataclass(frozen=True)
+class LaboratoryScope:
+    """
+    Laboratory a request is restricted to. ``laboratory_id`` is None for
+    superusers and users without laboratory, who see every laboratory.
+    """
+    laboratory_id: UUID | None = None
+
+    @property
+    def is_global(self):
+        return self.laboratory_id is None
+
+    def filter(self, queryset, lookup="laboratory"):
+        """Restricts ``queryset`` to the scope; ``lookup`` is the path to the laboratory FK."""
+        if self.is_global:
+            return queryset
+        return queryset.filter(**{lookup: self.laboratory_id})
+
+
+def resolve_laboratory_scope(user):
+    # laboratory_id is read from the already loaded user row: no query is made.
+    if not user.is_authenticated or user.is_superuser or not user.laboratory_id:
+        return LaboratoryScope()
+    return LaboratoryScope(user.laboratory_id)
+
+
+def get_laboratory_scope(request):
+    """
+    Scope set by LaboratoryScopeMiddleware, resolved on first access
+    when the middleware did not run (e.g. RequestFactory requests).
+    """
+    if not hasattr(request, "laboratory_scope"):
+        request.laboratory_scope = resolve_laboratory_scope(request.user)
+    return request.laboratory_scope
+
+
+class LaboratoryScopedAdminMixin:
+    """
+    Restricts a ModelAdmin to the laboratory of the current user.
+    ``laboratory_lookup`` is the path from the model to its laboratory and
+    ``scoped_foreignkeys`` maps FK fields to the path from the related model.
+
+    Users without a laboratory read every campus database: changelists and
+    choices merge them, object pages and actions run in the database of
+    their objects.
+    """
+    laboratory_lookup = "laboratory"
+    scoped_foreignkeys = {}
+
+    def scope_queryset(self, request, queryset, lookup=None):
+        scope = get_laboratory_scope(request)
+        if scope.is_global:
+            return across_databases(queryset)
+        return scope.filter(queryset, lookup or self.laboratory_lookup)
+
+    def object_database(self, object_id):
+        """Runs an object page in the database holding the object."""
+        if object_id is None or not fans_out():
+            return nullcontext()
+        return using_database(database_of(self.model, object_id) or DEFAULT_DB_ALIAS)
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        with self.object_database(object_id):
+            return super().changeform_view(request, object_id, form_url, extra_context)
+
+    def history_view(self, request, object_id, extra_context=None):
+        with self.object_database(object_id):
+            return super().history_view(request, object_id, extra_context)
+
+    def delete_view(self, request, object_id, extra_context=None):
+        with self.object_database(object_id):
+            return super().delete_view(request, object_id, extra_context)
+
+    def response_action(self, request, queryset):
+        if not fans_out():
+            return super().response_action(request, queryset)
+        selection = queryset
+        if request.POST.get("select_across") != "1":
+            selection = queryset.filter(pk__in=request.POST.getlist(helpers.ACTION_CHECKBOX_NAME))
+        databases = [alias for alias in shard_databases() if selection.using(alias).exists()]
+        # A selection found in no campus database is in "default", only looked up to rule out a mix.
+        if not databases or selection.using(DEFAULT_DB_ALIAS).exists():
+            databases.insert(0, DEFAULT_DB_ALIAS)
+        if len(databases) > 1:
+            self.message_user(
+                request, _("The selection spans several campus databases: select one campus at a time."),
+                messages.WARNING,
+            )
+            return None
+        with using_database(databases[0]):
+            return super().response_action(request, queryset)
+
+    def get_queryset(self, request):
+        return self.scope_queryset(request, super().get_queryset(request))
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if lookup := self.scoped_foreignkeys.get(db_field.name):
+            queryset = kwargs.get("queryset", db_field.remote_field.model._default_manager.all())
+            kwargs["queryset"] = self.scope_queryset(request, queryset, lookup)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        scope = get_laboratory_scope(request)
+        if not scope.is_global and self.laboratory_lookup == "laboratory":
+            obj.laboratory_id = scope.laboratory_id
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,417 @@
+"""
+Per-campus databases. Laboratories name their campus and CAMPUS_DATABASES
+maps campuses to database aliases; the equipment app's rows (equipment,
+events and everything hanging off them, outbox included) live in the
+database of their laboratory's campus, "default" for campuses without
+one. Laboratories and assets are written to "default" and mirrored into
+every campus database, so foreign keys and joins stay within one
+database. Users, jobs and the rest of the project stay in "default".
+
+Queries that carry no instance go to the database set by
+``using_database``: CampusDatabaseMiddleware sets it for requests
+scoped to a laboratory, ``fan_out`` runs a function once per database.
+Outside of it, querysets passed through ``across_databases`` read every
+database, e.g. the admin pages of superusers.
+"""
+import heapq
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from itertools import chain, islice
+from operator import itemgetter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, transaction
+from django.db.models import Count, F, Max, Min, Model, OrderBy, QuerySet, Sum
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import FlatValuesListIterable, ModelIterable, ValuesIterable
+
+SHARDED_APPS = {"equipment"}
+MIRRORED_MODELS = {"equipment.laboratory", "equipment.asset"}
+
+_database = ContextVar("campus_database", default=None)
+
+
+def shard_databases():
+    """Aliases of the campus databases, "default" excluded."""
+    return sorted(set(settings.CAMPUS_DATABASES.values()) - {DEFAULT_DB_ALIAS})
+
+
+def all_databases():
+    return [DEFAULT_DB_ALIAS, *shard_databases()]
+
+
+def database_for_campus(campus):
+    return settings.CAMPUS_DATABASES.get(campus, DEFAULT_DB_ALIAS)
+
+
+def database_for_laboratory(laboratory_id):
+    """
+    Database of the laboratory's campus. The campus is read from "default"
+    on every call: a copy kept in memory would go stale in the other
+    processes when it changes.
+    """
+    if laboratory_id is None or not shard_databases():
+        return DEFAULT_DB_ALIAS
+    Laboratory = apps.get_model("equipment", "Laboratory")
+    campus = (
+        Laboratory.objects.using(DEFAULT_DB_ALIAS).filter(pk=laboratory_id).values_list("campus", flat=True).first()
+    )
+    return database_for_campus(campus or "")
+
+
+def database_of(model, pk):
+    """Database holding the ``model`` row ``pk``, looked up in each; None when none has it."""
+    for alias in all_databases():
+        try:
+            if model._base_manager.using(alias).filter(pk=pk).exists():
+                return alias
+        except (ValidationError, ValueError):
+            return None
+    return None
+
+
+def current_database():
+    """Alias set by ``using_database``, or None outside of it."""
+    return _database.get()
+
+
+@contextmanager
+def using_database(alias):
+    token = _database.set(alias)
+    try:
+        yield alias
+    finally:
+        _database.reset(token)
+
+
+def using_laboratory_database(laboratory_id):
+    """``using_database`` with the laboratory's database, unless one is already in context."""
+    return using_database(current_database() or database_for_laboratory(laboratory_id))
+
+
+def atomic():
+    """``transaction.atomic`` on the database in context."""
+    return transaction.atomic(using=current_database())
+
+
+def fans_out():
+    """Whether a query made here should run once per database: shards exist and none is in context."""
+    return current_database() is None and bool(shard_databases())
+
+
+def fan_out(function, *args, **kwargs):
+    """
+    Results of ``function(*args, **kwargs)`` called once per database,
+    with that database in context. Calls run one after the other, in the
+    current thread, so they see its connections and transactions.
+    """
+    results = []
+    for alias in all_databases():
+        with using_database(alias):
+            results.append(function(*args, **kwargs))
+    return results
+
+
+def iterate_in_database(alias, iterable):
+    """
+    Iterates ``iterable`` with ``alias`` in context while each item is
+    produced, e.g. the content of a streamed response, which is consumed
+    after the view returned.
+    """
+    iterator = iter(iterable)
+    while True:
+        with using_database(alias):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class SortKey:
+    """
+    Orders rows by ``(value, descending)`` pairs the way SQLite does:
+    NULL first in ascending order, last in descending order.
+    """
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __lt__(self, other):
+        for (value, descending), (other_value, _) in zip(self.values, other.values):
+            if value == other_value:
+                continue
+            if value is None:
+                less = True
+            elif other_value is None:
+                less = False
+            else:
+                less = value < other_value
+            return less != descending
+        return False
+
+
+def attribute_path(instance, path):
+    """Value of ``path`` (an ordering lookup split on "__") read from a model instance."""
+    value = instance
+    for position, name in enumerate(path):
+        if value is None:
+            return None
+        if name == "pk":
+            name = value._meta.pk.attname
+        elif position == len(path) - 1:
+            # A foreign key orders by its value, without loading the related row.
+            try:
+                field = value._meta.get_field(name)
+            except FieldDoesNotExist:
+                pass
+            else:
+                if field.many_to_one or (field.one_to_one and field.concrete):
+                    name = field.attname
+        value = getattr(value, name)
+    return value
+
+
+def unique(rows):
+    seen = set()
+    for row in rows:
+        marker = tuple(row.items()) if isinstance(row, dict) else row
+        if marker not in seen:
+            seen.add(marker)
+            yield row
+
+
+class FanOutQuerySet(QuerySet):
+    """
+    Queryset read from every database while none is in context (see
+    ``fans_out``) and none was picked with ``using()``: rows are merged in
+    the queryset's ordering, counts and Count, Sum, Min and Max aggregates
+    combined, and updates and deletes run in each database, one
+    transaction per database. Otherwise it is a plain queryset.
+    Made by ``across_databases``.
+    """
+    def reads_every_database(self):
+        return self._db is None and fans_out()
+
+    def parts(self):
+        """The queryset once per database, as plain querysets, each limited to the end of the slice."""
+        for alias in all_databases():
+            part = QuerySet(model=self.model, query=self.query.chain(), using=alias, hints=self._hints)
+            part.query.clear_limits()
+            if self.query.high_mark is not None:
+                part.query.set_limits(high=self.query.high_mark)
+            part._iterable_class = self._iterable_class
+            part._fields = self._fields
+            part._prefetch_related_lookups = self._prefetch_related_lookups
+            part._known_related_objects = self._known_related_objects
+            yield part
+
+    def row_getter(self, name):
+        """Reads the ordering lookup ``name`` from a row, or None when rows do not carry it."""
+        if self._iterable_class is ModelIterable:
+            return partial(attribute_path, path=name.split(LOOKUP_SEP))
+        fields = list(self._fields) or [field.attname for field in self.model._meta.concrete_fields]
+        candidates = [name, self.model._meta.pk.name if name == "pk" else name]
+        try:
+            candidates.append(self.model._meta.get_field(candidates[1]).attname)
+        except (FieldDoesNotExist, AttributeError):
+            pass
+        found = next((candidate for candidate in candidates if candidate in fields), None)
+        if found is None:
+            return None
+        if self._iterable_class is ValuesIterable:
+            return itemgetter(found)
+        if self._iterable_class is FlatValuesListIterable:
+            return (lambda row: row) if fields.index(found) == 0 else None
+        return itemgetter(fields.index(found))
+
+    def sort_key(self):
+        """Key that merges rows in the queryset's ordering, or None when it cannot be read from them."""
+        if self.query.order_by:
+            ordering = self.query.order_by
+        elif self.query.default_ordering:
+            ordering = self.model._meta.ordering
+        else:
+            ordering = ()
+        getters = []
+        for term in ordering:
+            if isinstance(term, str):
+                name, descending = term.lstrip("-"), term.startswith("-")
+            elif isinstance(term, OrderBy) and isinstance(term.expression, F):
+                name, descending = term.expression.name, term.descending
+            elif isinstance(term, F):
+                name, descending = term.name, False
+            else:
+                return None
+            getter = None if name == "?" else self.row_getter(name)
+            if getter is None:
+                return None
+            getters.append((getter, descending))
+        if not getters:
+            return None
+        return lambda row: SortKey([(getter(row), descending) for getter, descending in getters])
+
+    def merged(self, parts):
+        """Rows of the ``parts`` merged, deduplicated and sliced as the queryset asks."""
+        key = self.sort_key()
+        rows = heapq.merge(*parts, key=key) if key else chain(*parts)
+        if self.query.distinct and self._iterable_class is not ModelIterable:
+            rows = unique(rows)
+        return islice(rows, self.query.low_mark, self.query.high_mark)
+
+    def _fetch_all(self):
+        if self._result_cache is None and self.reads_every_database():
+            self._result_cache = list(self.merged(self.parts()))
+            # Each part prefetched the related objects of its own rows.
+            self._prefetch_done = True
+        super()._fetch_all()
+
+    def iterator(self, chunk_size=None):
+        if not self.reads_every_database():
+            return super().iterator(chunk_size)
+        return self.merged(part.iterator(chunk_size) for part in self.parts())
+
+    def count(self):
+        if self._result_cache is not None or not self.reads_every_database():
+            return super().count()
+        if self.query.is_sliced or (self.query.distinct and self._iterable_class is not ModelIterable):
+            return len(self)
+        return sum(part.count() for part in self.parts())
+
+    def exists(self):
+        if self._result_cache is not None or not self.reads_every_database():
+            return super().exists()
+        return any(part.exists() for part in self.parts())
+
+    def aggregate(self, *args, **kwargs):
+        if not self.reads_every_database():
+            return super().aggregate(*args, **kwargs)
+        aggregates = {**{arg.default_alias: arg for arg in args}, **kwargs}
+        results = [part.aggregate(**aggregates) for part in self.parts()]
+        combined = {}
+        for name, aggregate in aggregates.items():
+            values = [result[name] for result in results if result[name] is not None]
+            if isinstance(aggregate, (Count, Sum)):
+                combined[name] = sum(values) if values else results[0][name]
+            elif isinstance(aggregate, Max):
+                combined[name] = max(values, default=None)
+            elif isinstance(aggregate, Min):
+                combined[name] = min(values, default=None)
+            else:
+                raise NotSupportedError(f"{type(aggregate).__name__} cannot be combined across databases.")
+        return combined
+
+    def update(self, **kwargs):
+        if not self.reads_every_database():
+            return super().update(**kwargs)
+        return sum(part.update(**kwargs) for part in self.parts())
+
+    def delete(self):
+        if not self.reads_every_database():
+            return super().delete()
+        deleted, per_model = 0, Counter()
+        for part in self.parts():
+            count, counts = part.delete()
+            deleted += count
+            per_model.update(counts)
+        return deleted, dict(per_model)
+
+
+_fan_out_classes = {}
+
+
+def across_databases(queryset):
+    """
+    ``queryset`` as a FanOutQuerySet, keeping its own queryset methods: read
+    from every database when none is in context, e.g. for superusers.
+    Querysets of models that are not sharded are returned as they are, as
+    is every queryset while no campus database is configured.
+    """
+    if not shard_databases() or not is_sharded(queryset.model) or isinstance(queryset, FanOutQuerySet):
+        return queryset
+    base = type(queryset)
+    if base not in _fan_out_classes:
+        _fan_out_classes[base] = type(f"FanOut{base.__name__}", (FanOutQuerySet, base), {})
+    clone = queryset._chain()
+    clone.__class__ = _fan_out_classes[base]
+    return clone
+
+
+def is_sharded(model):
+    return model._meta.app_label in SHARDED_APPS and model._meta.label_lower not in MIRRORED_MODELS
+
+
+def is_mirrored(model):
+    return model._meta.label_lower in MIRRORED_MODELS
+
+
+def mirror(instance):
+    """
+    Copies a laboratory or asset saved in "default" into every campus
+    database. Saved raw, as by loaddata: timestamps are kept as they are
+    and no signals are handled.
+    """
+    model = type(instance)
+    for alias in shard_databases():
+        copy = model(**{field.attname: getattr(instance, field.attname) for field in model._meta.concrete_fields})
+        copy.save_base(using=alias, raw=True)
+
+
+def unmirror(instance):
+    for alias in shard_databases():
+        type(instance)._base_manager.using(alias).filter(pk=instance.pk).delete()
+
+
+def mirror_all():
+    """Copies every laboratory and asset into the campus databases. Returns how many rows."""
+    count = 0
+    for label in sorted(MIRRORED_MODELS):
+        for instance in apps.get_model(label)._base_manager.using(DEFAULT_DB_ALIAS).iterator():
+            mirror(instance)
+            count += 1
+    return count
+
+
+class CampusRouter:
+    """
+    Routes the equipment app's models to the database of the related
+    instance (its own database, or its laboratory's campus), else to the
+    one in context; laboratories and assets are always written to
+    "default" and read from the database in context, so subqueries on
+    them join the equipment there. Every database gets every table.
+    """
+    def db_for_read(self, model, **hints):
+        if is_mirrored(model):
+            return current_database()
+        return self.route(model, hints.get("instance"))
+
+    def db_for_write(self, model, **hints):
+        if is_mirrored(model):
+            return DEFAULT_DB_ALIAS
+        return self.route(model, hints.get("instance"))
+
+    def route(self, model, instance):
+        if not is_sharded(model):
+            return None
+        if instance is not None:
+            if instance._meta.label_lower == "equipment.laboratory":
+                return database_for_laboratory(instance.pk)
+            if is_sharded(instance):
+                if instance._state.db is not None:
+                    return instance._state.db
+                if getattr(instance, "laboratory_id", None) is not None:
+                    return database_for_laboratory(instance.laboratory_id)
+        return current_database()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_mirrored(obj1) or is_mirrored(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -0,0 +1,98 @@
+import gzip
+import mimetypes
+import os
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # Optional: only .gz copies are written.
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".ttf", ".eot")
+# Hashed names never change content; anything else may change on the next deploy.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MUTABLE_MAX_AGE = 60
+
+re_accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes ``.gz`` (and, with the
+    ``brotli`` package, ``.br``) copies of text assets during collectstatic,
+    so they are compressed once instead of on every request.
+    """
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in list(self.hashed_files.values()) + list(paths):
+            if self.exists(name):
+                self.write_compressed(name)
+
+    def write_compressed(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        path = self.path(name)
+        with open(path, "rb") as source:
+            content = source.read()
+        if len(content) < self.min_compress_size:
+            return
+        encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(content)
+            if len(compressed) < len(content):
+                with open(path + suffix, "wb") as target:
+                    target.write(compressed)
+
+
+@cache
+def hashed_names():
+    return frozenset(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+
+def serve(request, path):
+    """
+    Serves collected static files from STATIC_ROOT when no web server sits
+    in front: picks the precompressed copy the client accepts and caches
+    hashed names for a year.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path) or path.endswith((".gz", ".br")):
+        raise Http404
+
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    encoding = None
+    for suffix, name, pattern in ((".br", "br", re_accepts_brotli), (".gz", "gzip", re_accepts_gzip)):
+        if pattern.search(accept_encoding) and os.path.isfile(full_path + suffix):
+            encoding = name
+            full_path += suffix
+            break
+
+    content_type, _ = mimetypes.guess_type(path)
+    response = FileResponse(
+        open(full_path, "rb"), content_type=content_type or "application/octet-stream", filename=os.path.basename(path)
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if path in hashed_names():
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
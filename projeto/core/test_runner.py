@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases
+
+from .sharding import shard_databases
+
+# Campus database the sharding tests map a campus to when CAMPUS_DATABASES names none.
+TEST_CAMPUS_DATABASE = "campus_test"
+
+
+class CampusTestRunner(DiscoverRunner):
+    """
+    Runs the tests with the campus databases (CAMPUS_DATABASES): laboratories
+    and assets are mirrored into each of them, so every test case that uses
+    "default" gets them all. Without campus databases, TEST_CAMPUS_DATABASE
+    is set up for the test cases that ask for every database.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not shard_databases() and TEST_CAMPUS_DATABASE not in settings.DATABASES:
+            settings.DATABASES[TEST_CAMPUS_DATABASE] = {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+            connections.settings = connections.configure_settings(settings.DATABASES)
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        if shards := shard_databases():
+            for test in iter_test_cases(suite):
+                test_case = type(test)
+                if (
+                    isinstance(test, TransactionTestCase)
+                    and test_case.databases != "__all__"
+                    and DEFAULT_DB_ALIAS in test_case.databases
+                ):
+                    test_case.databases = {*test_case.databases, *shards}
+        return suite
@@ -0,0 +1,136 @@
+import gzip
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core import middleware
+from projeto.core.models import CustomUser
+from projeto.core.staticfiles import CompressedManifestStaticFilesStorage
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.url = reverse('admin:equipment_equipment_changelist')
+
+    def test_gzips_admin_pages(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<html', gzip.decompress(response.content))
+
+    def test_skips_already_compressed_types(self):
+        response = middleware.CompressionMiddleware(lambda request: None).process_response(
+            RequestFactory().get('/', headers={'Accept-Encoding': 'gzip'}),
+            HttpResponse(b'%PDF-1.4 ' * 100, content_type='application/pdf'),
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @unittest.skipUnless(middleware.brotli, 'brotli is not installed')
+    def test_prefers_brotli(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(b'<html', middleware.brotli.decompress(response.content))
+
+
+class ConditionalChangelistTest(TestCase):
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.url = reverse('admin:equipment_equipment_changelist')
+        self.item = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=Laboratory.objects.create(name='Lab A'),
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=Asset.objects.create(brand='HP', model='X200', kind='analog')
+        )
+
+    def revalidate(self, etag):
+        return self.client.get(self.url, headers={'If-None-Match': etag})
+
+    def test_repeat_load_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertTrue(response['Last-Modified'])
+
+        response = self.revalidate(response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_changes_invalidate_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Event.objects.create(
+            item=self.item,
+            kind=EventKind.CORRECTIVE,
+            send_at=timezone.now(),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+        )
+        self.assertEqual(self.revalidate(etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, {'asset__kind': 'analog'}, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_event_changelist(self):
+        url = reverse('admin:equipment_event_changelist')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_related_changes_invalidate_the_etag(self):
+        Event.objects.create(
+            item=self.item,
+            kind=EventKind.CORRECTIVE,
+            send_at=timezone.now(),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+        )
+        urls = [reverse(f'admin:equipment_{model}_changelist') for model in ('event', 'eventhistory')]
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        self.item.tag_number = 'NEW'
+        self.item.save()
+        for url, etag in etags.items():
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        laboratory = self.item.laboratory
+        laboratory.name = 'Lab B'
+        laboratory.save()
+        self.assertEqual(self.revalidate(etag).status_code, 200)
+
+
+class StaticFilesTest(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'app.css').write_text('body { color: black; }\n' * 100)
+        (self.root / 'logo.png').write_bytes(b'\x89PNG' + bytes(300))
+
+    def test_writes_compressed_copies(self):
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        storage.write_compressed('app.css')
+        storage.write_compressed('logo.png')
+        self.assertEqual(gzip.decompress((self.root / 'app.css.gz').read_bytes()), (self.root / 'app.css').read_bytes())
+        self.assertFalse((self.root / 'logo.png.gz').exists())
+
+    def test_serves_precompressed_files(self):
+        CompressedManifestStaticFilesStorage(location=self.root).write_compressed('app.css')
+        with override_settings(STATIC_ROOT=self.root):
+            response = self.client.get('/static/app.css', headers={'Accept-Encoding': 'gzip'})
+            plain = self.client.get('/static/app.css')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'color', gzip.decompress(b''.join(response.streaming_content)))
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('max-age=60', plain['Cache-Control'])
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.core.exceptions import FieldError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.fields import DEFLATED, STORED, compress_text, decompress_text
+from projeto.core.models import CustomUser
+from projeto.equipment.archive import archive_events
+from projeto.equipment.models import Asset, Equipment, Event, EventHistory, EventKind, EventTier, Laboratory
+
+RESULTS = "Ponto 10,000 g: indicação 10,0021 g; incerteza expandida 0,0012 g (k=2)\n" * 20
+
+
+class CompressTextTest(SimpleTestCase):
+    def test_round_trip(self):
+        for value in ("", "-", "observação", RESULTS):
+            self.assertEqual(decompress_text(compress_text(value)), value)
+
+    def test_only_compresses_when_smaller(self):
+        self.assertEqual(compress_text(""), b"")
+        self.assertEqual(compress_text("-"), STORED + b"-")
+        self.assertTrue(compress_text(RESULTS).startswith(DEFLATED))
+        self.assertLess(len(compress_text(RESULTS)), len(RESULTS) / 10)
+
+
+class CompressedTextFieldTest(TestCase):
+    def setUp(self):
+        self.item = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=Laboratory.objects.create(name='Lab A'),
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=Asset.objects.create(brand='HP', model='X200', kind='analog')
+        )
+        self.event = Event.objects.create(
+            item=self.item,
+            kind=EventKind.CALIBRATION,
+            send_at=timezone.now() - timedelta(days=5000),
+            returned_at=timezone.now() - timedelta(days=4990),
+            certificate_number='C1',
+            certificate_results=RESULTS,
+            observation='',
+        )
+
+    def test_stored_compressed_and_read_as_text(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT certificate_results FROM equipment_event")
+            stored = bytes(cursor.fetchone()[0])
+        self.assertEqual(stored, compress_text(RESULTS))
+        self.assertEqual(Event.objects.get().certificate_results, RESULTS)
+        self.assertEqual(Event.objects.exclude(certificate_results='').count(), 1)
+        self.assertEqual(Event.objects.filter(observation='').count(), 1)
+
+    def test_text_lookups_are_refused(self):
+        for lookup in ('contains', 'icontains', 'startswith', 'iexact', 'regex'):
+            with self.assertRaises(FieldError, msg=lookup):
+                Event.objects.filter(**{f'certificate_results__{lookup}': 'Ponto'})
+        with self.assertRaises(FieldError):
+            EventHistory.objects.filter(observation__icontains='-')
+        self.assertEqual(Event.objects.filter(certificate_results__in=[RESULTS]).count(), 1)
+
+    def test_archived_history_keeps_texts(self):
+        Event.objects.create(
+            item=self.item,
+            kind=EventKind.CHECK,
+            send_at=timezone.now(),
+            returned_at=timezone.now(),
+            certificate_number='C2',
+            certificate_results='',
+            observation='-',
+        )
+        archive_events(horizon_days=365)
+        event = EventHistory.objects.get(pk=self.event.pk)
+        self.assertEqual(event.tier, EventTier.ARCHIVE)
+        self.assertEqual(event.certificate_results, RESULTS)
+
+    def test_changelists_defer_texts(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        for url in (reverse('admin:equipment_event_changelist'), reverse('admin:equipment_eventhistory_changelist')):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertFalse([query for query in queries if 'certificate_results' in query['sql']], url)
+
+        response = self.client.get(reverse('admin:equipment_event_change', args=[self.event.pk]))
+        self.assertContains(response, 'Ponto 10,000 g')
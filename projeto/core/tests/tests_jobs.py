@@ -0,0 +1,130 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.jobs import claim_next, enqueue, register, report_progress, run_job
+from projeto.core.models import CustomUser, Job, JobStatus
+from projeto.equipment.models import Asset, Equipment, Laboratory
+
+
+@register("tests.add")
+def add(job, a, b):
+    report_progress(job, 50, "halfway")
+    return {"sum": a + b}
+
+
+@register("tests.fail")
+def fail(job):
+    raise ValueError("boom")
+
+
+class JobQueueTest(TestCase):
+    def test_claims_oldest_queued_job_once(self):
+        first = enqueue("tests.add", {"a": 1, "b": 2})
+        second = enqueue("tests.add", {"a": 3, "b": 4})
+        Job.objects.filter(pk=second.pk).update(created_at=first.created_at + timedelta(seconds=1))
+
+        claimed = claim_next("worker-1")
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, JobStatus.RUNNING)
+        self.assertEqual(claimed.worker, "worker-1")
+        self.assertEqual(claim_next("worker-2").pk, second.pk)
+        self.assertIsNone(claim_next("worker-3"))
+
+    def test_records_result_and_failure(self):
+        ok = enqueue("tests.add", {"a": 1, "b": 2})
+        broken = enqueue("tests.fail")
+
+        self.assertTrue(run_job(claim_next("w")))
+        with self.assertLogs("projeto.core.jobs", "ERROR"):
+            self.assertFalse(run_job(claim_next("w")))
+
+        ok.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual((ok.status, ok.progress, ok.result), (JobStatus.SUCCEEDED, 100, {"sum": 3}))
+        self.assertEqual(broken.status, JobStatus.FAILED)
+        self.assertIn("ValueError: boom", broken.error)
+
+    def test_requeues_jobs_whose_lease_expired(self):
+        crashed = enqueue("tests.add", {"a": 1, "b": 2})
+        alive = enqueue("tests.add", {"a": 3, "b": 4})
+        self.assertEqual(claim_next("dead-worker").pk, crashed.pk)
+        self.assertEqual(claim_next("live-worker").pk, alive.pk)
+        Job.objects.filter(pk=crashed.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        with self.assertLogs("projeto.core.jobs", "WARNING"):
+            claimed = claim_next("new-worker")
+
+        self.assertEqual(claimed.pk, crashed.pk)
+        self.assertEqual((claimed.status, claimed.worker), (JobStatus.RUNNING, "new-worker"))
+        alive.refresh_from_db()
+        self.assertEqual((alive.status, alive.worker), (JobStatus.RUNNING, "live-worker"))
+        self.assertIsNone(claim_next("new-worker"))
+
+    def test_requeued_job_keeps_the_outcome_of_its_new_worker(self):
+        job = enqueue("tests.add", {"a": 1, "b": 2})
+        slow = claim_next("slow-worker")
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        with self.assertLogs("projeto.core.jobs", "WARNING"):
+            fast = claim_next("fast-worker")
+
+        report_progress(slow, 80, "late")
+        with self.assertLogs("projeto.core.jobs", "WARNING"):
+            run_job(slow)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.progress), (JobStatus.RUNNING, "fast-worker", 0))
+
+        self.assertTrue(run_job(fast))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (JobStatus.SUCCEEDED, {"sum": 3}))
+
+    def test_unknown_job_cannot_be_queued(self):
+        with self.assertRaises(KeyError):
+            enqueue("tests.missing")
+
+
+class EquipmentJobsTest(TestCase):
+    def setUp(self):
+        self.output_root = Path(tempfile.mkdtemp())
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.user = CustomUser.objects.create_user(
+            'lab_user', password='x', is_staff=True, laboratory=self.laboratory
+        )
+        self.user.user_permissions.set(Permission.objects.filter(codename='view_equipment'))
+        self.equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=Asset.objects.create(brand='HP', model='X200', kind='analog')
+        )
+
+    def test_admin_action_enqueues_export_run_by_workers(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('admin:equipment_equipment_changelist'),
+            {'action': 'export_in_background', '_selected_action': [self.equipment.pk]},
+        )
+        self.assertEqual(response.status_code, 302)
+        job = Job.objects.get()
+        self.assertEqual(job.payload, {"equipment": [str(self.equipment.pk)]})
+
+        with override_settings(JOB_OUTPUT_ROOT=self.output_root):
+            call_command('run_workers', processes=1, once=True, stdout=StringIO())
+            job.refresh_from_db()
+            self.assertEqual(job.status, JobStatus.SUCCEEDED)
+            self.assertEqual(job.result["rows"], 1)
+
+            changelist = self.client.get(reverse('admin:core_job_changelist'))
+            self.assertContains(changelist, 'equipment.export_equipment')
+            response = self.client.get(reverse('job-output', args=[job.pk]))
+            self.assertIn(b'SN1', b''.join(response.streaming_content))
@@ -0,0 +1,76 @@
+import json
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from projeto.core import metrics
+from projeto.core.models import CustomUser
+
+
+class HistogramTest(TestCase):
+    def test_renders_cumulative_buckets(self):
+        registry = metrics.Registry()
+        histogram = registry.register(metrics.Histogram("latency", "Latency.", ("view",), (0.1, 1)))
+        histogram.observe(("home",), 0.05)
+        histogram.observe(("home",), 0.5)
+        histogram.observe(("home",), 5)
+
+        output = registry.render()
+        self.assertIn('latency_bucket{view="home",le="0.1"} 1', output)
+        self.assertIn('latency_bucket{view="home",le="1"} 2', output)
+        self.assertIn('latency_bucket{view="home",le="+Inf"} 3', output)
+        self.assertIn('latency_count{view="home"} 3', output)
+        self.assertIn('latency_sum{view="home"} 5.55', output)
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('staff', password='x', is_staff=True)
+        self.user.user_permissions.add(*Permission.objects.filter(codename='view_equipment'))
+        self.client.force_login(self.user)
+
+    def count(self, view):
+        labels = (view, 'GET', 200)
+        return metrics.REQUESTS.values.get(labels, 0)
+
+    def test_records_changelist_by_url_name(self):
+        view = 'admin:equipment_equipment_changelist'
+        before = self.count(view)
+        queries_before = sum(metrics.QUERIES.counts.get((view,), [0]))
+
+        self.client.get(reverse(view))
+
+        self.assertEqual(self.count(view), before + 1)
+        self.assertEqual(sum(metrics.QUERIES.counts[(view,)]), queries_before + 1)
+        self.assertGreater(metrics.SQL_TIME.sums[(view,)], 0)
+
+        output = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(f'http_request_duration_seconds_count{{view="{view}"}}', output)
+        self.assertIn(f'http_request_db_queries_bucket{{view="{view}",le="+Inf"}}', output)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_logs_slow_requests(self):
+        with self.assertLogs('projeto.requests', 'WARNING') as logs:
+            self.client.get(reverse('admin:equipment_equipment_changelist'))
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['event'], 'slow_request')
+        self.assertEqual(entry['view'], 'admin:equipment_equipment_changelist')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreater(entry['queries'], 0)
+
+    def test_metrics_hidden_from_anonymous_remote_clients(self):
+        self.client.logout()
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token_replaces_the_address_check(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,65 @@
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.middleware import LaboratoryScopeMiddleware
+from projeto.core.models import CustomUser
+from projeto.equipment.models import Asset, Equipment, Laboratory
+
+
+class LaboratoryScopeMiddlewareTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        self.user = CustomUser.objects.create_user(
+            'lab_user', password='x', is_staff=True, laboratory=self.laboratory
+        )
+        self.superuser = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x')
+
+    def resolve(self, user):
+        request = RequestFactory().get('/')
+        request.user = CustomUser.objects.get(pk=user.pk)
+        LaboratoryScopeMiddleware(lambda request: None)(request)
+        return request
+
+    def test_resolves_scope_without_queries(self):
+        request = self.resolve(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(request.laboratory_scope.laboratory_id, self.laboratory.pk)
+            self.assertFalse(request.laboratory_scope.is_global)
+
+    def test_superuser_scope_is_global(self):
+        request = self.resolve(self.superuser)
+        self.assertTrue(request.laboratory_scope.is_global)
+
+    def test_scoped_changelist_does_not_load_the_laboratory(self):
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        for laboratory in (self.laboratory, self.other_laboratory):
+            Equipment.objects.create(
+                serial_number=f'SN-{laboratory.name}',
+                tag_number='TAG',
+                bought_at=timezone.now(),
+                laboratory=laboratory,
+                maintenance_periodicity=90,
+                calibration_periodicity=365,
+                asset=asset
+            )
+        self.client.force_login(self.user)
+        self.user.user_permissions.add(*Permission.objects.filter(codename='view_equipment'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:equipment_equipment_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 1)
+        # With campus databases, CampusDatabaseMiddleware reads the campus alone.
+        laboratory_lookups = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "equipment_laboratory"' in query['sql']
+            and 'equipment_equipment' not in query['sql']
+            and not query['sql'].startswith('SELECT "equipment_laboratory"."campus" AS "campus" FROM')
+        ]
+        self.assertEqual(laboratory_lookups, [])
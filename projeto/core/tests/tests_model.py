@@ -0,0 +1,26 @@
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+
+from projeto.core.models import default_uuid, uuid7
+
+
+class Uuid7Test(SimpleTestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_values_are_time_ordered(self):
+        values = [uuid7() for _ in range(5000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+
+class DefaultUuidTest(SimpleTestCase):
+    def test_uses_uuid4_by_default(self):
+        self.assertEqual(default_uuid().version, 4)
+
+    @override_settings(TIME_ORDERED_PRIMARY_KEYS=True)
+    def test_uses_uuid7_when_enabled(self):
+        self.assertEqual(default_uuid().version, 7)
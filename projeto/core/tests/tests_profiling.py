@@ -0,0 +1,76 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from projeto.core.models import CustomUser
+from projeto.core.profiling import SlowQueryCapture
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.profile_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.profile_root)
+        self.superuser = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x')
+        self.url = reverse('admin:equipment_equipment_changelist')
+
+    def get(self, *args, **kwargs):
+        with override_settings(PROFILE_ROOT=self.profile_root):
+            return self.client.get(*args, **kwargs)
+
+    def test_query_flag_profiles_the_request(self):
+        self.client.force_login(self.superuser)
+        response = self.get(self.url, {'_profile': 'tottime'})
+
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Report']
+        self.assertTrue((self.profile_root / f'{name}.prof').is_file())
+        report = (self.profile_root / f'{name}.txt').read_text()
+        self.assertIn('admin:equipment_equipment_changelist', report)
+        self.assertIn('tottime', report)
+
+    def test_header_profiles_the_request(self):
+        self.client.force_login(self.superuser)
+        response = self.get(self.url, headers={'X-Profile': '1'})
+        self.assertIn('X-Profile-Report', response)
+
+    def test_staff_cannot_profile(self):
+        staff = CustomUser.objects.create_user('staff', password='x', is_staff=True)
+        self.client.force_login(staff)
+        response = self.get(reverse('admin:index'), {'_profile': '1'})
+
+        self.assertNotIn('X-Profile-Report', response)
+        self.assertEqual(list(self.profile_root.iterdir()), [])
+
+    def test_without_flag_nothing_is_saved(self):
+        self.client.force_login(self.superuser)
+        response = self.get(self.url)
+        self.assertNotIn('X-Profile-Report', response)
+        self.assertEqual(list(self.profile_root.iterdir()), [])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_explained_in_the_report(self):
+        self.client.force_login(self.superuser)
+        with self.assertLogs('projeto.sql', 'WARNING'):
+            response = self.get(self.url, {'_profile': '1'})
+
+        report = (self.profile_root / f"{response['X-Profile-Report']}.txt").read_text()
+        self.assertIn('FROM "equipment_equipment"', report)
+
+
+class SlowQueryCaptureTest(TestCase):
+    def test_explains_slow_selects_only(self):
+        capture = SlowQueryCapture(connection, threshold_ms=0)
+        with self.assertLogs('projeto.sql', 'WARNING') as logs, connection.execute_wrapper(capture):
+            CustomUser.objects.filter(username='nobody').exists()
+            CustomUser.objects.filter(username='nobody').update(first_name='x')
+
+        self.assertEqual(len(capture.queries), 1)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['event'], 'slow_query')
+        self.assertTrue(entry['plan'])
+        self.assertNotIn('EXPLAIN failed', entry['plan'][0])
@@ -0,0 +1,247 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.middleware import CampusDatabaseMiddleware
+from projeto.core.models import CustomUser
+from projeto.core.sharding import (
+    across_databases,
+    current_database,
+    database_for_laboratory,
+    shard_databases,
+    using_database,
+)
+from projeto.core.test_runner import TEST_CAMPUS_DATABASE
+from projeto.equipment.bi_export import TABLES, pa, write_table
+from projeto.equipment.bulk import move_equipment
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory, OutboxEntry
+from projeto.equipment.projections import get_projection
+
+
+# Uses the configured campus databases, or the test one CampusTestRunner adds.
+@override_settings(CAMPUS_DATABASES=settings.CAMPUS_DATABASES or {'norte': TEST_CAMPUS_DATABASE})
+class CampusShardingTest(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.shard = shard_databases()[0]
+        campus = next(campus for campus, alias in settings.CAMPUS_DATABASES.items() if alias == self.shard)
+        self.campus_laboratory = Laboratory.objects.create(name='Lab Campus', campus=campus)
+        self.laboratory = Laboratory.objects.create(name='Lab Sede')
+        self.asset = Asset.objects.create(brand='HP', model='X200', category='electrical', kind='analog')
+
+    def create_equipment(self, laboratory, serial_number):
+        equipment = Equipment(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=timezone.now() - timedelta(days=30),
+            laboratory=laboratory,
+            maintenance_periodicity=90,
+            calibration_periodicity=365,
+            asset=self.asset,
+        )
+        equipment.save()
+        return equipment
+
+    def test_laboratories_and_assets_are_mirrored(self):
+        self.assertTrue(Laboratory.objects.using(self.shard).filter(pk=self.laboratory.pk).exists())
+        self.assertTrue(Asset.objects.using(self.shard).filter(pk=self.asset.pk).exists())
+
+        self.laboratory.name = 'Lab Sede 2'
+        self.laboratory.save()
+        mirrored = Laboratory.objects.using(self.shard).get(pk=self.laboratory.pk)
+        self.assertEqual(mirrored.name, 'Lab Sede 2')
+        self.assertEqual(mirrored.updated_at, self.laboratory.updated_at)
+
+        self.laboratory.delete()
+        self.assertFalse(Laboratory.objects.using(self.shard).filter(pk=self.laboratory.pk).exists())
+
+    def test_equipment_and_events_are_written_to_the_campus_database(self):
+        equipment = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        equipment.events.create(kind=EventKind.CALIBRATION, send_at=timezone.now())
+
+        self.assertEqual(equipment._state.db, self.shard)
+        self.assertFalse(Equipment.all_objects.using('default').filter(pk=equipment.pk).exists())
+        self.assertEqual(Event.objects.using(self.shard).filter(item=equipment).count(), 1)
+        self.assertEqual(OutboxEntry.objects.using(self.shard).filter(object_uuid=equipment.pk).count(), 1)
+
+        other = self.create_equipment(self.laboratory, 'SN-SEDE')
+        self.assertEqual(other._state.db, 'default')
+
+    def test_scoped_request_uses_the_campus_database(self):
+        user = CustomUser.objects.create_user('campus', password='x', is_staff=True, laboratory=self.campus_laboratory)
+        request = RequestFactory().get('/')
+        request.user = user
+
+        def stream(request):
+            return StreamingHttpResponse(current_database() for _ in range(2))
+
+        response = CampusDatabaseMiddleware(lambda request: HttpResponse(current_database()))(request)
+        self.assertEqual(response.content.decode(), self.shard)
+        response = CampusDatabaseMiddleware(stream)(request)
+        self.assertEqual(b''.join(response.streaming_content).decode(), self.shard * 2)
+        self.assertIsNone(current_database())
+
+    def test_outbox_feed_reads_each_database_with_its_own_cursor(self):
+        campus = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        self.login_superuser()
+        url = reverse('equipment:outbox-feed')
+
+        entries = self.client.get(url).json()['entries']
+        self.assertNotIn(str(campus.pk), {entry['object_uuid'] for entry in entries})
+        response = self.client.get(url, {'database': self.shard}).json()
+        self.assertEqual(response['database'], self.shard)
+        self.assertEqual([entry['object_uuid'] for entry in response['entries']], [str(campus.pk)])
+
+        user = CustomUser.objects.create_user('campus', password='x', is_staff=True, laboratory=self.campus_laboratory)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).json()['database'], self.shard)
+        self.assertEqual(self.client.get(url, {'database': 'default'}).status_code, 400)
+
+    def test_scoped_changelist_lists_campus_equipment(self):
+        self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        user = CustomUser.objects.create_user('campus', password='x', is_staff=True, laboratory=self.campus_laboratory)
+        user.user_permissions.add(*Permission.objects.filter(codename='view_equipment'))
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('admin:equipment_equipment_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_global_projection_merges_every_database(self):
+        self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        self.create_equipment(self.laboratory, 'SN-SEDE')
+
+        laboratories = {row.laboratory for row in get_projection(12)}
+
+        self.assertEqual(laboratories, {'Lab Campus', 'Lab Sede'})
+        with using_database(self.shard):
+            self.assertEqual({row.laboratory for row in get_projection(12)}, {'Lab Campus'})
+
+    def test_database_for_laboratory_follows_campus_changes(self):
+        self.assertEqual(database_for_laboratory(self.laboratory.pk), 'default')
+        Laboratory.objects.filter(pk=self.laboratory.pk).update(campus=self.campus_laboratory.campus)
+        self.assertEqual(database_for_laboratory(self.laboratory.pk), self.shard)
+
+    def test_across_databases_merges_in_order(self):
+        campus = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        sede = self.create_equipment(self.laboratory, 'SN-SEDE')
+        Equipment.all_objects.using(self.shard).filter(pk=campus.pk).update(calibration_due_date=timezone.now())
+
+        queryset = across_databases(Equipment.objects.order_by('calibration_due_date'))
+
+        self.assertEqual([item.serial_number for item in queryset], ['SN-SEDE', 'SN-CAMPUS'])
+        self.assertEqual(queryset.count(), 2)
+        self.assertEqual(list(queryset.values_list('pk', flat=True)[1:]), [campus.pk])
+        self.assertEqual(queryset.filter(pk=sede.pk).get(), sede)
+        with using_database(self.shard):
+            self.assertEqual(list(queryset.all()), [campus])
+
+    def login_superuser(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', password='x'))
+
+    def test_superuser_admin_reads_every_database(self):
+        campus = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        self.create_equipment(self.laboratory, 'SN-SEDE')
+        self.login_superuser()
+
+        response = self.client.get(reverse('admin:equipment_equipment_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertEqual(
+            {item.serial_number for item in response.context['cl'].result_list}, {'SN-CAMPUS', 'SN-SEDE'}
+        )
+
+        response = self.client.get(reverse('admin:equipment_equipment_change', args=[campus.pk]))
+        self.assertContains(response, 'SN-CAMPUS')
+
+    def test_superuser_adds_events_to_campus_equipment(self):
+        campus = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        self.login_superuser()
+        url = reverse('admin:equipment_event_add')
+
+        response = self.client.get(url)
+        choices = response.context['adminform'].form.fields['item'].choices
+        self.assertIn(str(campus.pk), [str(value) for value, _ in choices])
+
+        now = timezone.now()
+        response = self.client.post(url, {
+            'item': campus.pk,
+            'kind': EventKind.CHECK,
+            'send_at_0': now.strftime('%d/%m/%Y'),
+            'send_at_1': '08:00',
+            'returned_at_0': '',
+            'returned_at_1': '',
+            'certificate_number': 'C1',
+            'certificate_results': '-',
+            'observation': '-',
+            'attachments-TOTAL_FORMS': '0',
+            'attachments-INITIAL_FORMS': '0',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Event.objects.using(self.shard).filter(item=campus).count(), 1)
+
+    def test_actions_refuse_selections_of_several_databases(self):
+        equipment = [
+            self.create_equipment(self.campus_laboratory, 'SN-CAMPUS'),
+            self.create_equipment(self.laboratory, 'SN-SEDE'),
+        ]
+        self.login_superuser()
+        url = reverse('admin:equipment_equipment_changelist')
+
+        response = self.client.post(
+            url, {'action': 'archive_selected', helpers.ACTION_CHECKBOX_NAME: [item.pk for item in equipment]}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Equipment.all_objects.using(self.shard).filter(archived=True).exists())
+
+        self.client.post(url, {'action': 'archive_selected', helpers.ACTION_CHECKBOX_NAME: [equipment[0].pk]})
+        self.assertTrue(Equipment.all_objects.using(self.shard).get(pk=equipment[0].pk).archived)
+
+    def test_equipment_is_not_moved_between_databases(self):
+        equipment = self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+
+        self.laboratory.campus = self.campus_laboratory.campus
+        self.laboratory.full_clean()
+        self.campus_laboratory.campus = ''
+        with self.assertRaises(ValidationError):
+            self.campus_laboratory.full_clean()
+
+        equipment.laboratory = Laboratory.objects.create(name='Lab Sede 2')
+        with self.assertRaises(ValidationError):
+            equipment.full_clean()
+        with self.assertRaises(ValidationError):
+            move_equipment(across_databases(Equipment.objects.all()), self.laboratory)
+        self.assertEqual(Equipment.objects.using(self.shard).get().laboratory, self.campus_laboratory)
+
+    def test_reports_read_every_database(self):
+        self.create_equipment(self.campus_laboratory, 'SN-CAMPUS')
+        self.create_equipment(self.laboratory, 'SN-SEDE')
+
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('print_labels', os.path.join(directory, 'labels.pdf'), stdout=output)
+        self.assertIn('Wrote 2 labels', output.getvalue())
+        if pa is not None:
+            self.assertEqual(write_table(TABLES['equipment'], io.BytesIO(), 'arrow'), 2)
+
+        self.login_superuser()
+        response = self.client.get(reverse('equipment:dashboard'))
+        self.assertEqual({row['laboratory'] for row in response.context['workload']}, {'Lab Campus', 'Lab Sede'})
+
+        user = CustomUser.objects.create_user('campus', password='x', is_staff=True, laboratory=self.campus_laboratory)
+        self.client.force_login(user)
+        response = self.client.get(reverse('equipment:dashboard'))
+        self.assertEqual({row['laboratory'] for row in response.context['workload']}, {'Lab Campus'})
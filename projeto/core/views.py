@@ -1,6 +1,15 @@
-from django.shortcuts import render, redirect
+import hmac
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404, render, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from projeto.core import metrics as request_metrics
 from projeto.core.forms import SignUpForm
+from projeto.core.models import Job, JobStatus
 
 def signup_view(request):
     if request.method == 'POST':
@@ -17,3 +26,34 @@ def signup_view(request):
     return render(request, 'registration/signup.html', {'form': form})
 
 
+@staff_member_required
+def job_output(request, uuid):
+    """Downloads the file produced by a finished job."""
+    jobs = Job.objects.filter(status=JobStatus.SUCCEEDED)
+    if not request.user.is_superuser:
+        jobs = jobs.filter(created_by=request.user)
+    job = get_object_or_404(jobs, pk=uuid)
+
+    filename = (job.result or {}).get("file")
+    path = settings.JOB_OUTPUT_ROOT / filename if filename else None
+    if path is None or not path.is_file():
+        raise Http404
+    return FileResponse(path.open("rb"), as_attachment=True, filename=f"{job.name}-{filename}")
+
+
+@require_GET
+def metrics(request):
+    """
+    Request metrics in the Prometheus text format, for staff users and for
+    scrapers: those holding METRICS_TOKEN when it is set, otherwise those
+    on METRICS_ALLOWED_IPS.
+    """
+    if settings.METRICS_TOKEN:
+        allowed = hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+        )
+    else:
+        allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+    if not (allowed or request.user.is_staff):
+        raise Http404
+    return HttpResponse(request_metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
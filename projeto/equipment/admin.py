@@ -1,31 +1,159 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Max, Q
 from django.db.models.aggregates import Sum
+from django.template.response import TemplateResponse
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.shortcuts import redirect
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.urls import path
+from projeto.equipment.batch import create_event_batch
+from projeto.equipment.bulk import archive_equipment, move_equipment, set_calibration_periodicity
+from projeto.equipment.forms import (
+    CalibrationPeriodicityForm,
+    CertificateAttachmentForm,
+    EventBatchForm,
+    EventBatchRowFormSet,
+    MoveToLaboratoryForm,
+)
+from projeto.equipment.intervals import accept_recommendations
+from projeto.equipment.labels import label_sheets
 from projeto.equipment.models import (
     Asset,
+    CertificateAttachment,
     Equipment,
     Event,
+    EventHistory,
+    EventTier,
+    IntervalRecommendation,
     Laboratory,
+    MaintenanceStatus,
+    OutboxEntry,
 )
+from projeto.core.conditional import ConditionalChangelistMixin
+from projeto.core.jobs import enqueue
+from projeto.core.scoping import LaboratoryScopedAdminMixin, get_laboratory_scope
+from projeto.core.sharding import across_databases
 from projeto.core.widgets import PeriodicityWidget
+from django.urls import reverse
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from datetime import timedelta
 
+def log_bulk_change(request, model, names, message):
+    """One admin log entry summarizing a bulk change, instead of one per object."""
+    names = list(names)
+    LogEntry.objects.create(
+        user_id=request.user.pk,
+        content_type=ContentType.objects.get_for_model(model),
+        object_repr=f"{len(names)} {model._meta.verbose_name_plural}",
+        action_flag=CHANGE,
+        change_message=f"{message}: {', '.join(names)}",
+    )
+
+
 @admin.register(Laboratory)
-class LaboratoryRecordAdmin(admin.ModelAdmin):
+class LaboratoryRecordAdmin(ConditionalChangelistMixin, admin.ModelAdmin):
     list_display = ("name",)
     search_fields = ("name",)
 
 
 @admin.register(Asset)
-class AssetRecordAdmin(admin.ModelAdmin):
+class AssetRecordAdmin(ConditionalChangelistMixin, admin.ModelAdmin):
     list_display = ("uuid", "category", "kind", "brand", "model", "description")
     list_filter = ("category", "kind", "brand", "model")
     search_fields = ("category", "kind", "brand", "model", "description")
 
 
+class ArchivedListFilter(admin.SimpleListFilter):
+    """Shows only active equipment unless archived equipment is explicitly requested."""
+    title = _("archived")
+    parameter_name = "archived"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("include", _("Include archived")),
+            ("only", _("Archived only")),
+        )
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": _("Active only"),
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == "include":
+            return queryset
+        if self.value() == "only":
+            return queryset.filter(archived=True)
+        return queryset.filter(archived=False)
+
+
+class MaintenanceStatusListFilter(admin.SimpleListFilter):
+    """Filters on maintenance_due_date ranges, so the partial index does the work."""
+    title = _("Maintenance Status")
+    parameter_name = "maintenance_status"
+
+    def lookups(self, request, model_admin):
+        return MaintenanceStatus.choices
+
+    def queryset(self, request, queryset):
+        now = timezone.now()
+        in_30_days = now + timedelta(days=30)
+        in_60_days = now + timedelta(days=60)
+        if self.value() == MaintenanceStatus.NOT_SCHEDULED:
+            return queryset.filter(maintenance_due_date__isnull=True)
+        if self.value() == MaintenanceStatus.EXPIRED:
+            return queryset.filter(maintenance_due_date__lt=now)
+        if self.value() == MaintenanceStatus.EXPIRES_IN_30_DAYS:
+            return queryset.filter(maintenance_due_date__gte=now, maintenance_due_date__lt=in_30_days)
+        if self.value() == MaintenanceStatus.EXPIRES_IN_60_DAYS:
+            return queryset.filter(maintenance_due_date__gte=in_30_days, maintenance_due_date__lt=in_60_days)
+        if self.value() == MaintenanceStatus.UP_TO_DATE:
+            return queryset.filter(maintenance_due_date__gte=in_60_days)
+        return queryset
+
+
+class EquipmentListFilter(admin.RelatedFieldListFilter):
+    """Equipment choices with their laboratory in one query (it is part of __str__)."""
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        equipment = model_admin.scope_queryset(
+            request, Equipment.objects.select_related("laboratory").order_by(*ordering), "laboratory"
+        )
+        return [(item.pk, str(item)) for item in equipment]
+
+
+class DeferredFieldsChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.defer(*self.model_admin.changelist_deferred_fields)
+
+
+class EventTextDeferredMixin:
+    """Leaves the long event texts, only shown on the change form, out of changelist queries."""
+    changelist_deferred_fields = ("certificate_results", "observation")
+
+    def get_changelist(self, request, **kwargs):
+        return DeferredFieldsChangeList
+
+
 @admin.register(Equipment)
-class EquipmentRecordAdmin(admin.ModelAdmin):
+class EquipmentRecordAdmin(ConditionalChangelistMixin, LaboratoryScopedAdminMixin, admin.ModelAdmin):
     list_display = (
         "serial_number",
         "tag_number",
@@ -33,10 +161,14 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
         "status_display",
         "calibration_status",
         "calibration_due_date",
+        "maintenance_status",
+        "maintenance_due_date",
         "laboratory",
         "full_description",
     )
     list_filter = (
+        ArchivedListFilter,
+        MaintenanceStatusListFilter,
         "asset__category",
         "asset__kind",
         "asset__brand",
@@ -48,10 +180,47 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
         "tag_number",
         "full_description",
     )
-    readonly_fields = ("status_display", "full_description", "calibration_due_date")
-    actions = ["show_expiring_calibration"]
+    readonly_fields = (
+        "status_display",
+        "full_description",
+        "calibration_due_date",
+        "maintenance_due_date",
+        "last_audited_at",
+    )
+    actions = [
+        "show_expiring_calibration",
+        "show_expiring_maintenance",
+        "archive_selected",
+        "move_to_laboratory",
+        "change_calibration_periodicity",
+        "register_batch_event",
+        "print_labels",
+        "export_in_background",
+        "recompute_due_dates_in_background",
+        "rebuild_calibration_points_in_background",
+    ]
+    list_select_related = ("laboratory", "asset")
+    changelist_related = ("laboratory", "asset")
     ordering = ("calibration_due_date",)
 
+    def changelist_version(self, request, queryset):
+        # Statuses also change with the clock (due dates passing) and with events.
+        now = timezone.now()
+        boundaries = {}
+        for days in (0, 30, 60):
+            limit = now + timedelta(days=days)
+            boundaries[f"calibration_due_{days}"] = Count("pk", filter=Q(calibration_due_date__lt=limit))
+            boundaries[f"maintenance_due_{days}"] = Count("pk", filter=Q(maintenance_due_date__lt=limit))
+        version = queryset.order_by().aggregate(
+            count=Count("pk"), last_modified=Max("updated_at"), **boundaries, **self.related_versions()
+        )
+        version.update(
+            across_databases(Event.objects.filter(item__in=queryset.values("pk"))).aggregate(
+                events=Count("pk"), events_modified=Max("updated_at")
+            )
+        )
+        return version
+
     def full_description(self, obj):
         return obj.full_description
 
@@ -64,10 +233,12 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
         return form
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_superuser and request.user.laboratory:
-            qs = qs.filter(laboratory=request.user.laboratory)
-        return qs
+        # Archived equipment must stay reachable from the change form,
+        # the changelist hides it through ArchivedListFilter.
+        qs = Equipment.all_objects.with_status()
+        if ordering := self.get_ordering(request):
+            qs = qs.order_by(*ordering)
+        return self.scope_queryset(request, qs)
 
     def get_fieldsets(self, request, obj=None):
         if request.user.is_superuser:
@@ -86,6 +257,8 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
                             "maintenance_periodicity",
                             "calibration_periodicity",
                             "calibration_due_date",
+                            "maintenance_due_date",
+                            "last_audited_at",
                             "archived",
                             "full_description",
                             "description",
@@ -108,6 +281,8 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
                             "maintenance_periodicity",
                             "calibration_periodicity",
                             "calibration_due_date",
+                            "maintenance_due_date",
+                            "last_audited_at",
                             "archived",
                             "full_description",
                             "description",
@@ -116,12 +291,6 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
                 ),
             )
 
-    def save_model(self, request, obj, form, change):
-        if not request.user.is_superuser and request.user.laboratory:
-            obj.laboratory = request.user.laboratory
-
-        super().save_model(request, obj, form, change)
-
     def status_display(self, obj):
         """Display status with custom label and icon"""
         from django.utils.html import format_html
@@ -155,52 +324,203 @@ class EquipmentRecordAdmin(admin.ModelAdmin):
 
     calibration_status.short_description = _("Calibration Status")
 
+    def maintenance_status(self, obj):
+        """Display preventive maintenance status, computed from maintenance_due_date alone"""
+        status = obj.maintenance_status
+        label = obj.maintenance_status_display
+        if status == MaintenanceStatus.UP_TO_DATE:
+            return format_html('<span class="bg-green text-white">{}</span>', label)
+        if status == MaintenanceStatus.EXPIRES_IN_60_DAYS:
+            return format_html('<span class="bg-yellow text-white">{}</span>', label)
+        if status == MaintenanceStatus.EXPIRES_IN_30_DAYS:
+            return format_html('<span class="bg-orange text-white">{}</span>', label)
+        if status == MaintenanceStatus.EXPIRED:
+            return format_html('<span class="bg-red text-white">{}</span>', label)
+        return label
+
+    maintenance_status.short_description = _("Maintenance Status")
+    maintenance_status.admin_order_field = "maintenance_due_date"
+
     def show_expiring_calibration(self, request, queryset):
         """Admin action to show equipment with calibration expiring in the next month"""
         today = timezone.now()
         next_month = today + timedelta(days=30)
 
-        expiring_equipment_ids = []
+        # calibration_due_date is kept up to date by the Event signals,
+        # so the partial index on active equipment answers this directly.
+        filtered_queryset = queryset.filter(
+            archived=False, calibration_due_date__range=(today, next_month)
+        )
+        expiring_count = filtered_queryset.count()
 
-        for equipment in queryset.filter(archived=False):
-            latest_calibration = (
-                equipment.events.filter(kind="calibration", returned_at__isnull=False)
-                .order_by("-returned_at")
-                .first()
+        if expiring_count:
+            self.message_user(
+                request,
+                f"{expiring_count} equipment found with calibration expiring in the next 30 days.",
+            )
+            return filtered_queryset
+        else:
+            self.message_user(
+                request,
+                "No equipment found with calibration expiring in the next 30 days.",
             )
 
-            if latest_calibration:
-                expiry_date = latest_calibration.returned_at + timedelta(
-                    days=equipment.calibration_periodicity
-                )
+    show_expiring_calibration.short_description = _(
+        "Show equipment with expiring calibration"
+    )
 
-                if today <= expiry_date <= next_month:
-                    expiring_equipment_ids.append(equipment.uuid)
+    def show_expiring_maintenance(self, request, queryset):
+        """Admin action to show equipment with preventive maintenance due in the next month"""
+        today = timezone.now()
+        next_month = today + timedelta(days=30)
 
-        filtered_queryset = queryset.filter(uuid__in=expiring_equipment_ids)
+        filtered_queryset = queryset.filter(
+            archived=False, maintenance_due_date__range=(today, next_month)
+        )
+        expiring_count = filtered_queryset.count()
 
-        if expiring_equipment_ids:
+        if expiring_count:
             self.message_user(
                 request,
-                f"{len(expiring_equipment_ids)} equipment found with calibration expiring in the next 30 days.",
+                f"{expiring_count} equipment found with preventive maintenance due in the next 30 days.",
             )
             return filtered_queryset
         else:
             self.message_user(
                 request,
-                "No equipment found with calibration expiring in the next 30 days.",
+                "No equipment found with preventive maintenance due in the next 30 days.",
             )
 
-    show_expiring_calibration.short_description = _(
-        "Show equipment with expiring calibration"
+    show_expiring_maintenance.short_description = _(
+        "Show equipment with preventive maintenance due"
     )
 
+    def has_move_permission(self, request):
+        # Users scoped to a laboratory cannot hand equipment over to another one.
+        return self.has_change_permission(request) and get_laboratory_scope(request).is_global
+
+    def log_bulk_change(self, request, pks, message):
+        if pks:
+            serial_numbers = Equipment.all_objects.filter(pk__in=pks).values_list("serial_number", flat=True)
+            log_bulk_change(request, Equipment, serial_numbers, message)
+        self.message_user(request, _("%(count)d equipment updated.") % {"count": len(pks)})
+
+    def render_bulk_action_form(self, request, queryset, form, title):
+        """Intermediate page of the actions that need a value."""
+        return TemplateResponse(
+            request,
+            "admin/equipment/equipment/bulk_action.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": title,
+                "opts": self.model._meta,
+                "form": form,
+                "action": request.POST["action"],
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+                "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                "equipment_count": queryset.count(),
+                "preview": queryset.select_related("laboratory")[:20],
+            },
+        )
+
+    @admin.action(description=_("Archive selected equipment"), permissions=["change"])
+    def archive_selected(self, request, queryset):
+        pks = archive_equipment(queryset)
+        self.log_bulk_change(request, pks, "Archived")
+
+    @admin.action(description=_("Move selected equipment to another laboratory"), permissions=["move"])
+    def move_to_laboratory(self, request, queryset):
+        form = MoveToLaboratoryForm(request.POST if "apply" in request.POST else None)
+        if not form.is_valid():
+            return self.render_bulk_action_form(request, queryset, form, _("Move to laboratory"))
+
+        laboratory = form.cleaned_data["laboratory"]
+        try:
+            pks = move_equipment(queryset, laboratory)
+        except ValidationError as error:
+            self.message_user(request, " ".join(error.messages), messages.ERROR)
+            return None
+        self.log_bulk_change(request, pks, f"Moved to {laboratory}")
+
+    @admin.action(description=_("Change calibration periodicity"), permissions=["change"])
+    def change_calibration_periodicity(self, request, queryset):
+        form = CalibrationPeriodicityForm(request.POST if "apply" in request.POST else None)
+        if not form.is_valid():
+            return self.render_bulk_action_form(request, queryset, form, _("Change calibration periodicity"))
+
+        periodicity = form.cleaned_data["calibration_periodicity"]
+        pks = set_calibration_periodicity(queryset, periodicity)
+        self.log_bulk_change(request, pks, f"Changed calibration periodicity to {periodicity} days")
+
+    @admin.action(description=_("Register an event for the selected equipment"))
+    def register_batch_event(self, request, queryset):
+        ids = ",".join(str(pk) for pk in queryset.values_list("pk", flat=True))
+        return redirect(f"{reverse('admin:equipment_event_batch')}?ids={ids}")
+
+    def enqueue_for_selection(self, request, name, queryset):
+        equipment = [str(pk) for pk in queryset.values_list("pk", flat=True)]
+        job = enqueue(name, {"equipment": equipment}, user=request.user)
+        self.message_user(
+            request,
+            format_html(
+                _('Job queued for {} equipment. <a href="{}">Follow its progress</a>.'),
+                len(equipment),
+                reverse("admin:core_job_change", args=[job.pk]),
+            ),
+        )
+
+    @admin.action(description=_("Print labels for selected equipment"))
+    def print_labels(self, request, queryset):
+        response = StreamingHttpResponse(
+            label_sheets(queryset, request.build_absolute_uri("/"), processes=settings.LABEL_PROCESSES),
+            content_type="application/pdf",
+        )
+        response["Content-Disposition"] = content_disposition_header(True, "labels.pdf")
+        return response
+
+    @admin.action(description=_("Export selected equipment (background)"))
+    def export_in_background(self, request, queryset):
+        self.enqueue_for_selection(request, "equipment.export_equipment", queryset)
+
+    @admin.action(description=_("Recompute due dates (background)"), permissions=["change"])
+    def recompute_due_dates_in_background(self, request, queryset):
+        self.enqueue_for_selection(request, "equipment.recompute_due_dates", queryset)
+
+    @admin.action(description=_("Rebuild calibration points (background)"), permissions=["change"])
+    def rebuild_calibration_points_in_background(self, request, queryset):
+        self.enqueue_for_selection(request, "equipment.rebuild_calibration_points", queryset)
+
+
+class CertificateAttachmentInline(admin.TabularInline):
+    model = CertificateAttachment
+    form = CertificateAttachmentForm
+    fields = ("file", "download", "size", "sha256")
+    readonly_fields = ("download", "size", "sha256")
+    extra = 1
+    can_delete = False
+
+    def download(self, obj):
+        if not obj.pk:
+            return "-"
+        return format_html(
+            '<a href="{}">{}</a>', reverse("equipment:certificate-download", args=[obj.pk]), obj.filename
+        )
+
+    download.short_description = _("Certificate")
+
 
 @admin.register(Event)
-class EventRecordAdmin(admin.ModelAdmin):
+class EventRecordAdmin(
+    EventTextDeferredMixin, ConditionalChangelistMixin, LaboratoryScopedAdminMixin, admin.ModelAdmin
+):
+    laboratory_lookup = "item__laboratory"
+    scoped_foreignkeys = {"item": "laboratory"}
+    inlines = (CertificateAttachmentInline,)
     list_display = ("item", "kind", "send_at", "returned_at", "formatted_price", "certificate_number")
+    list_select_related = ("item__laboratory",)
+    changelist_related = ("item", "item__laboratory", "item__asset")
     list_filter = (
-        "item",
+        ("item", EquipmentListFilter),
         "item__asset__category",
         "item__asset__kind",
         "item__asset__brand",
@@ -210,6 +530,12 @@ class EventRecordAdmin(admin.ModelAdmin):
     )
     ordering = ("-send_at", "-returned_at")
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "item":
+            # The laboratory is part of Equipment.__str__, shown for every choice.
+            kwargs["queryset"] = Equipment.objects.select_related("laboratory")
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
     def formatted_price(self, obj):
         if not obj.price:
             return "-"
@@ -217,14 +543,63 @@ class EventRecordAdmin(admin.ModelAdmin):
     formatted_price.short_description = _("Price")
     formatted_price.admin_order_field = "price"
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        if not request.user.is_superuser and request.user.laboratory:
-            qs = qs.filter(item__laboratory=request.user.laboratory)
-        return qs
+    def get_urls(self):
+        return [
+            path("batch/", self.admin_site.admin_view(self.batch_view), name="equipment_event_batch"),
+        ] + super().get_urls()
+
+    def batch_view(self, request):
+        """
+        Registers one event per selected equipment: shared kind and dates,
+        per-row certificate. Rows are validated together and saved with
+        create_event_batch.
+        """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        equipment = self.scope_queryset(request, Equipment.objects.select_related("asset", "laboratory"), "laboratory")
+        header = EventBatchForm(
+            request.POST or None,
+            equipment=equipment,
+            initial={"equipment": request.GET.get("ids", "").split(",") if request.GET.get("ids") else []},
+        )
+        rows = None
+        if request.method == "POST" and header.is_valid():
+            selected = {item.pk: item for item in header.cleaned_data["equipment"]}
+            rows = EventBatchRowFormSet(
+                request.POST if "save" in request.POST else None,
+                initial=[{"item": pk} for pk in selected],
+                form_kwargs={"equipment": selected},
+            )
+            if "save" in request.POST and rows.is_valid():
+                shared = {
+                    field: header.cleaned_data[field]
+                    for field in ("kind", "send_at", "returned_at", "observation", "requires_recalibration")
+                }
+                created = create_event_batch(Event(**shared, **row.cleaned_data) for row in rows.forms)
+                log_bulk_change(
+                    request, Event, [row.cleaned_data["certificate_number"] for row in rows.forms], "Batch entry"
+                )
+                self.message_user(request, _("%(count)d events registered.") % {"count": len(created)})
+                return redirect("admin:equipment_event_changelist")
+
+        return TemplateResponse(
+            request,
+            "admin/equipment/event/batch.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": _("Batch event entry"),
+                "opts": self.model._meta,
+                "header": header,
+                "rows": rows,
+                "media": self.media + header.media,
+            },
+        )
 
     def changelist_view(self, request, extra_context=None):
         response = super().changelist_view(request, extra_context=extra_context)
+        if response.status_code == 304:
+            return response
 
         try:
             queryset = response.context_data['cl'].queryset
@@ -238,3 +613,91 @@ class EventRecordAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None) -> bool:
         return False
+
+
+@admin.register(EventHistory)
+class EventHistoryRecordAdmin(
+    EventTextDeferredMixin, ConditionalChangelistMixin, LaboratoryScopedAdminMixin, admin.ModelAdmin
+):
+    """Audit view over recent and archived events."""
+    laboratory_lookup = "item__laboratory"
+    list_display = ("item", "kind", "send_at", "returned_at", "certificate_number", "tier")
+    list_select_related = ("item__laboratory",)
+    changelist_related = ("item", "item__laboratory", "item__asset")
+    list_filter = (
+        "tier",
+        "item__asset__category",
+        "kind",
+        "returned_at",
+    )
+    search_fields = ("item__serial_number", "item__tag_number", "certificate_number")
+    ordering = ("-send_at", "-returned_at")
+
+    def changelist_version(self, request, queryset):
+        # Archiving moves rows between tiers without touching updated_at.
+        return queryset.order_by().aggregate(
+            count=Count("pk"),
+            last_modified=Max("updated_at"),
+            archived=Count("pk", filter=Q(tier=EventTier.ARCHIVE)),
+            **self.related_versions(),
+        )
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return False
+
+
+@admin.register(IntervalRecommendation)
+class IntervalRecommendationRecordAdmin(ConditionalChangelistMixin, LaboratoryScopedAdminMixin, admin.ModelAdmin):
+    laboratory_lookup = "item__laboratory"
+    list_display = (
+        "item",
+        "current_periodicity",
+        "recommended_periodicity",
+        "calibrations",
+        "failures",
+        "corrective_maintenances",
+        "projected_tolerance_usage",
+        "accepted_at",
+    )
+    list_filter = ("accepted_at", "item__asset__category")
+    list_select_related = ("item__laboratory",)
+    changelist_related = ("item", "item__laboratory", "item__asset")
+    search_fields = ("item__serial_number", "item__tag_number")
+    actions = ["accept_selected"]
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_accept_permission(self, request):
+        return request.user.has_perm("equipment.change_equipment")
+
+    @admin.action(description=_("Accept selected recommendations"), permissions=["accept"])
+    def accept_selected(self, request, queryset):
+        updated = accept_recommendations(queryset)
+        self.message_user(request, _("%(count)d equipment updated.") % {"count": updated})
+
+
+@admin.register(OutboxEntry)
+class OutboxEntryRecordAdmin(LaboratoryScopedAdminMixin, admin.ModelAdmin):
+    list_display = ("sequence", "model", "action", "object_uuid", "created_at")
+    list_filter = ("model", "action")
+    search_fields = ("object_uuid",)
+    ordering = ("-sequence",)
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return False
@@ -6,4 +6,5 @@ class EquipmentConfig(AppConfig):
     name = "projeto.equipment"
 
     def ready(self):
+        import projeto.equipment.jobs
         import projeto.equipment.signals
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from projeto.core.sharding import atomic
+
+from .models import ArchivedEvent, Event, OutboxAction
+from .outbox import record_bulk_changes
+
+ARCHIVED_COLUMNS = [field.column for field in Event._meta.concrete_fields]
+
+
+def archivable_events(horizon_days=None, now=None):
+    """
+    Events that belong in the archive tier: every event of archived equipment,
+    plus events returned before the horizon. The latest event of each active
+    equipment always stays hot because status lookups depend on it.
+    """
+    if horizon_days is None:
+        horizon_days = settings.EVENT_ARCHIVE_HORIZON_DAYS
+    cutoff = (now or timezone.now()) - timedelta(days=horizon_days)
+
+    latest_event = Event.objects.filter(item=OuterRef("item")).order_by("-returned_at").values("pk")[:1]
+
+    return Event.objects.filter(
+        Q(item__archived=True)
+        | (Q(returned_at__lt=cutoff) & ~Q(pk=Subquery(latest_event)))
+    )
+
+
+def archive_events(horizon_days=None, batch_size=1000, now=None):
+    """
+    Moves archivable events into ArchivedEvent in batches, each batch in its own
+    transaction. Returns the number of archived events.
+    """
+    archived_at = now or timezone.now()
+    pks = list(archivable_events(horizon_days, now=archived_at).order_by("pk").values_list("pk", flat=True))
+
+    for start in range(0, len(pks), batch_size):
+        chunk = pks[start:start + batch_size]
+        with atomic():
+            _copy_to_archive(chunk, archived_at)
+            # Consumers of the outbox learn the events left the hot table.
+            record_bulk_changes(Event.objects.filter(pk__in=chunk), action=OutboxAction.ARCHIVED)
+            # QuerySet.delete() bypasses Event.delete(), which forbids removing history.
+            Event.objects.filter(pk__in=chunk).delete()
+
+    return len(pks)
+
+
+def _copy_to_archive(pks, archived_at):
+    """
+    Copies events with ``INSERT ... SELECT`` so rows keep their original
+    created_at/updated_at (bulk_create would reset the auto_now fields).
+    """
+    select_sql, params = (
+        Event.objects.filter(pk__in=pks).values_list(*ARCHIVED_COLUMNS).query.sql_with_params()
+    )
+    connection = connections[router.db_for_write(ArchivedEvent)]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(column) for column in ARCHIVED_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(ArchivedEvent._meta.db_table)} ({columns}, {quote('archived_at')}) "
+            f"SELECT batch.*, %s FROM ({select_sql}) batch",
+            [connection.ops.adapt_datetimefield_value(archived_at), *params],
+        )
@@ -0,0 +1,65 @@
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from projeto.core.sharding import atomic, current_database, using_database
+
+from .calibration import sync_calibration_points
+from .due_dates import recalibration_requests, recompute_calibration_due_dates, recompute_maintenance_due_dates
+from .models import Equipment, Event, EventKind, OutboxAction
+from .outbox import record_bulk_changes
+
+
+def create_event_batch(events):
+    """
+    Saves many unsaved Event instances with bulk inserts and applies,
+    set-based, what the Event post_save signals would do one by one:
+    calibration and maintenance due dates, forced recalibration,
+    calibration points and outbox entries. All in one transaction per
+    database: events are saved in the database of their equipment.
+    Returns the created events.
+    """
+    by_database = {}
+    for event in events:
+        by_database.setdefault(current_database() or event._state.db, []).append(event)
+    created = []
+    for alias, group in by_database.items():
+        with using_database(alias):
+            created += _create_events(group)
+    return created
+
+
+def _create_events(events):
+    returned = [event for event in events if event.returned_at is not None]
+    calibrated = {event.item_id for event in returned if event.kind == EventKind.CALIBRATION}
+    maintained = {event.item_id for event in returned if event.kind == EventKind.PREVENTIVE}
+    flagged = any(event.kind != EventKind.CALIBRATION and event.requires_recalibration for event in events)
+
+    with atomic():
+        created = Event.objects.bulk_create(events)
+        record_bulk_changes(Event.objects.filter(pk__in=[event.pk for event in created]), action=OutboxAction.CREATED)
+
+        if calibrated:
+            recompute_calibration_due_dates(Equipment.all_objects.filter(pk__in=calibrated))
+        if maintained:
+            recompute_maintenance_due_dates(Equipment.all_objects.filter(pk__in=maintained))
+        if flagged:
+            # Same as update_expiration_date: a flagged event expires the calibration now,
+            # unless a calibration returned after it was sent.
+            later_calibration = Event.objects.filter(
+                item=OuterRef("item"), kind=EventKind.CALIBRATION, returned_at__gte=OuterRef("send_at")
+            )
+            expired = set(
+                recalibration_requests()
+                .filter(pk__in=[event.pk for event in created])
+                .exclude(Exists(later_calibration))
+                .values_list("item_id", flat=True)
+            )
+            if expired:
+                now = timezone.now()
+                Equipment.all_objects.filter(pk__in=expired).update(calibration_due_date=now, updated_at=now)
+                record_bulk_changes(
+                    Equipment.all_objects.filter(pk__in=expired), changed_fields=["calibration_due_date"]
+                )
+
+        sync_calibration_points(created)
+    return created
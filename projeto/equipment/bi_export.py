@@ -0,0 +1,311 @@
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import groupby
+
+from django.utils import timezone
+
+from projeto.core.sharding import across_databases
+
+from .models import Asset, Equipment, EventHistory, Laboratory
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: install the "bi" extra to export.
+    pa = None
+
+FORMATS = ("parquet", "arrow")
+STATE_FILE = "_state.json"
+# Incremental exports re-read rows changed up to this long before the
+# previous export started, covering transactions that committed late.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class ExportUnavailable(Exception):
+    pass
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ExportUnavailable("pyarrow is not installed (poetry install --extras bi).")
+
+
+def arrow_type(kind):
+    return {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "int": pa.int32(),
+        "bool": pa.bool_(),
+        "money": pa.decimal128(10, 2),
+    }[kind]
+
+
+def as_arrow(value, kind):
+    # UUIDs (primary and foreign keys) are exported as their string form.
+    return str(value) if kind == "string" and value is not None else value
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """An exported table: its columns, as (name, type) pairs, and how to scope it to a laboratory."""
+    name: str
+    columns: tuple
+    laboratory_lookup: str = "laboratory"
+
+    @property
+    def schema(self):
+        return pa.schema([(name, arrow_type(kind)) for name, kind in self.columns])
+
+    @property
+    def fields(self):
+        return [name for name, _ in self.columns]
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def scope(self, queryset, scope):
+        return scope.filter(queryset, self.laboratory_lookup)
+
+    def rows(self, queryset, chunk_size):
+        for row in queryset.values_list(*self.fields).iterator(chunk_size=chunk_size):
+            yield [as_arrow(value, kind) for value, (_, kind) in zip(row, self.columns)]
+
+
+class LaboratoryTable(ExportTable):
+    def queryset(self):
+        return Laboratory.objects.all()
+
+
+class AssetTable(ExportTable):
+    def queryset(self):
+        return Asset.objects.all()
+
+    def scope(self, queryset, scope):
+        # Assets are shared: a laboratory sees the ones its equipment use.
+        if scope.is_global:
+            return queryset
+        return queryset.filter(pk__in=Equipment.all_objects.filter(laboratory=scope.laboratory_id).values("asset_id"))
+
+
+class EventTable(ExportTable):
+    # Live and archived events. Archiving keeps updated_at, so an incremental
+    # export does not move events archived since the last one to the archive tier.
+    def queryset(self):
+        return EventHistory.objects.all()
+
+
+class EquipmentTable(ExportTable):
+    """Equipment rows plus their statuses, computed when exported."""
+    computed = ("status", "calibration_status", "maintenance_status")
+
+    def queryset(self):
+        return Equipment.all_objects.with_status()
+
+    def rows(self, queryset, chunk_size):
+        for item in queryset.iterator(chunk_size=chunk_size):
+            values = {
+                "status": item.get_status(),
+                "calibration_status": item.get_calibration_status(),
+                "maintenance_status": item.get_maintenance_status(),
+            }
+            yield [
+                as_arrow(values[name] if name in self.computed else getattr(item, name), kind)
+                for name, kind in self.columns
+            ]
+
+
+TIMESTAMPS = (("created_at", "timestamp"), ("updated_at", "timestamp"))
+
+TABLES = {
+    table.name: table
+    for table in (
+        LaboratoryTable("laboratory", (("uuid", "string"), ("name", "string")) + TIMESTAMPS, laboratory_lookup="pk"),
+        AssetTable(
+            "asset",
+            (
+                ("uuid", "string"),
+                ("category", "string"),
+                ("kind", "string"),
+                ("brand", "string"),
+                ("model", "string"),
+                ("description", "string"),
+            ) + TIMESTAMPS,
+        ),
+        EquipmentTable(
+            "equipment",
+            (
+                ("uuid", "string"),
+                ("laboratory_id", "string"),
+                ("asset_id", "string"),
+                ("serial_number", "string"),
+                ("tag_number", "string"),
+                ("inventory_number", "string"),
+                ("description", "string"),
+                ("bought_at", "timestamp"),
+                ("archived", "bool"),
+                ("calibration_periodicity", "int"),
+                ("maintenance_periodicity", "int"),
+                ("calibration_due_date", "timestamp"),
+                ("maintenance_due_date", "timestamp"),
+                ("last_audited_at", "timestamp"),
+                ("status", "string"),
+                ("calibration_status", "string"),
+                ("maintenance_status", "string"),
+            ) + TIMESTAMPS,
+        ),
+        EventTable(
+            "event",
+            (
+                ("uuid", "string"),
+                ("item_id", "string"),
+                ("tier", "string"),
+                ("kind", "string"),
+                ("send_at", "timestamp"),
+                ("returned_at", "timestamp"),
+                ("price", "money"),
+                ("certificate_number", "string"),
+                ("certificate_results", "string"),
+                ("observation", "string"),
+                ("requires_recalibration", "bool"),
+            ) + TIMESTAMPS,
+            laboratory_lookup="item__laboratory",
+        ),
+    )
+}
+
+
+class BatchWriter:
+    """Writes record batches of ``schema`` to a Parquet or Arrow IPC file."""
+    def __init__(self, sink, schema, file_format):
+        self.schema = schema
+        if file_format == "parquet":
+            self.writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(sink, schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_table(table, sink, file_format="parquet", scope=None, chunk_size=5000):
+    """Writes ``table``, restricted to a LaboratoryScope, to one file or file object. Returns the row count."""
+    require_pyarrow()
+    queryset = across_databases(table.queryset().order_by("pk"))
+    if scope is not None:
+        queryset = table.scope(queryset, scope)
+    writer = BatchWriter(sink, table.schema, file_format)
+    count = 0
+    try:
+        for batch in batches(table.rows(queryset, chunk_size), chunk_size):
+            writer.write(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+
+def month_of(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y-%m")
+
+
+def write_partition(table, directory, rows, file_format, chunk_size):
+    """Writes ``rows`` to ``directory/part-0.<format>``, replacing the previous partition whole."""
+    temporary = directory + ".tmp"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+    count = 0
+    try:
+        writer = BatchWriter(os.path.join(temporary, f"part-0.{file_format}"), table.schema, file_format)
+        try:
+            for batch in batches(rows, chunk_size):
+                writer.write(batch)
+                count += len(batch)
+        finally:
+            writer.close()
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(temporary, directory)
+    finally:
+        shutil.rmtree(temporary, ignore_errors=True)
+    return count
+
+
+def export_partitions(table, root, file_format="parquet", since=None, chunk_size=5000):
+    """
+    Writes ``table`` under ``root/<table>/updated_month=YYYY-MM/`` (Hive
+    layout), one partition per ``updated_at`` month, reading the rows in
+    ``chunk_size`` chunks. A full export replaces the table directory; with
+    ``since``, only the partitions from the month of ``since`` on are
+    rewritten. A changed row is written to the month of its latest change
+    and stays in its older partition, so readers keep the copy with the
+    highest ``updated_at`` per uuid. Returns ``{month: rows}``.
+    """
+    require_pyarrow()
+    directory = os.path.join(root, table.name)
+    queryset = across_databases(table.queryset().order_by("updated_at", "pk"))
+    if since is None:
+        shutil.rmtree(directory, ignore_errors=True)
+    else:
+        since = since.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        queryset = queryset.filter(updated_at__gte=since)
+
+    updated_at = table.fields.index("updated_at")
+    written = {}
+    for month, rows in groupby(table.rows(queryset, chunk_size), key=lambda row: month_of(row[updated_at])):
+        partition = os.path.join(directory, f"updated_month={month}")
+        written[month] = write_partition(table, partition, rows, file_format, chunk_size)
+    return written
+
+
+def export(root, tables=None, file_format="parquet", incremental=False, chunk_size=5000, now=None):
+    """
+    Exports ``tables`` (all by default) under ``root`` and records when
+    each was exported in ``root/_state.json``. With ``incremental``, each
+    table restarts from its recorded export time (less WATERMARK_OVERLAP),
+    or is exported whole when it has none. Returns ``{table: {month: rows}}``.
+    """
+    require_pyarrow()
+    state = read_state(root)
+    results = {}
+    for name in tables or TABLES:
+        started = now or timezone.now()
+        since = None
+        if incremental and (previous := state.get(name, {}).get(file_format)):
+            since = datetime.fromisoformat(previous) - WATERMARK_OVERLAP
+        results[name] = export_partitions(TABLES[name], root, file_format, since=since, chunk_size=chunk_size)
+        state.setdefault(name, {})[file_format] = started.isoformat()
+        write_state(root, state)
+    return results
+
+
+def read_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE)) as state:
+            return json.load(state)
+    except FileNotFoundError:
+        return {}
+
+
+def write_state(root, state):
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, STATE_FILE), "w") as output:
+        json.dump(state, output, indent=2)
@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from projeto.core.sharding import all_databases, atomic, database_for_laboratory
+
+from .due_dates import recompute_calibration_due_dates
+from .models import Equipment
+from .outbox import record_bulk_changes
+
+
+def update_equipment(queryset, **values):
+    """
+    Writes ``values`` to the equipment of ``queryset`` that do not have
+    them yet, with one UPDATE, and records the change in the outbox.
+    Returns the primary keys of the changed equipment.
+    """
+    pks = list(queryset.exclude(**values).values_list("pk", flat=True))
+    if not pks:
+        return []
+    with atomic():
+        Equipment.all_objects.filter(pk__in=pks).update(**values, updated_at=timezone.now())
+        record_bulk_changes(Equipment.all_objects.filter(pk__in=pks), changed_fields=list(values))
+    return pks
+
+
+def archive_equipment(queryset):
+    return update_equipment(queryset, archived=True)
+
+
+def move_equipment(queryset, laboratory):
+    """
+    Hands the equipment of ``queryset`` over to ``laboratory``. Rows are
+    not migrated between campus databases: ValidationError is raised when
+    some of the equipment lives in another database than the laboratory's.
+    """
+    target = database_for_laboratory(laboratory.pk)
+    if any(queryset.using(alias).exists() for alias in all_databases() if alias != target):
+        raise ValidationError(_("Equipment cannot be moved to a laboratory of a campus with another database."))
+    return update_equipment(queryset, laboratory=laboratory)
+
+
+def set_calibration_periodicity(queryset, periodicity):
+    """
+    Changes calibration_periodicity and recomputes the calibration due
+    dates of the same equipment set-based, in one transaction.
+    """
+    with atomic():
+        pks = update_equipment(queryset, calibration_periodicity=periodicity)
+        if pks:
+            recompute_calibration_due_dates(Equipment.all_objects.filter(pk__in=pks))
+    return pks
@@ -0,0 +1,96 @@
+import re
+
+from projeto.core.sharding import atomic
+
+from .models import ArchivedEvent, CalibrationPoint, Event
+
+COLUMN_SEPARATOR = re.compile(r"[;|\t]")
+VALUE = re.compile(r"^\s*(?:±|\+/-)?\s*([-+]?\d+(?:[.,]\d+)?(?:[eE][-+]?\d+)?)\s*[^\d\s]*\s*$")
+
+
+def parse_value(token):
+    match = VALUE.match(token)
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "."))
+
+
+def parse_certificate_results(text):
+    """
+    Extracts calibration points from ``Event.certificate_results``.
+    Each point is a line of ``;``, ``|`` or tab separated columns:
+    nominal, measured and, optionally, uncertainty and tolerance. Decimal
+    commas and unit suffixes are accepted (``10,0 V; 10,02 V; ±0,01``).
+    Lines that are not such a table row are ignored.
+    Returns a list of ``(nominal, measured, uncertainty, tolerance)``.
+    """
+    points = []
+    for line in (text or "").splitlines():
+        columns = COLUMN_SEPARATOR.split(line)
+        if len(columns) < 2:
+            continue
+        values = [parse_value(column) for column in columns[:4] if column.strip()]
+        if len(values) < 2 or None in values:
+            continue
+        values += [None] * (4 - len(values))
+        points.append(tuple(values))
+    return points
+
+
+def build_points(event):
+    measured_at = event.returned_at or event.send_at
+    return [
+        CalibrationPoint(
+            event_id=event.pk,
+            item_id=event.item_id,
+            measured_at=measured_at,
+            nominal=nominal,
+            measured=measured,
+            error=measured - nominal,
+            uncertainty=uncertainty,
+            tolerance=abs(tolerance) if tolerance is not None else None,
+        )
+        for nominal, measured, uncertainty, tolerance in parse_certificate_results(event.certificate_results)
+    ]
+
+
+def sync_calibration_points(events):
+    """
+    Replaces the calibration points of ``events`` with freshly parsed ones.
+    Accepts Event and ArchivedEvent instances.
+    """
+    events = list(events)
+    points = [point for event in events for point in build_points(event)]
+    with atomic():
+        CalibrationPoint.objects.filter(event_id__in=[event.pk for event in events]).delete()
+        CalibrationPoint.objects.bulk_create(points)
+    return len(points)
+
+
+def rebuild_calibration_points(item_ids=None, batch_size=2000, progress=None):
+    """
+    Re-parses certificate_results of every event of both tiers (or only
+    those of ``item_ids``) in batches. ``progress(done, total)`` is called
+    after each batch. Returns the number of calibration points.
+    """
+    querysets = [model.objects.exclude(certificate_results="") for model in (Event, ArchivedEvent)]
+    if item_ids is not None:
+        querysets = [queryset.filter(item_id__in=item_ids) for queryset in querysets]
+    total = sum(queryset.count() for queryset in querysets)
+
+    count = done = 0
+    for queryset in querysets:
+        batch = []
+        for event in queryset.iterator(chunk_size=batch_size):
+            batch.append(event)
+            if len(batch) == batch_size:
+                count += sync_calibration_points(batch)
+                done += len(batch)
+                batch = []
+                if progress:
+                    progress(done, total)
+        count += sync_calibration_points(batch)
+        done += len(batch)
+    if progress:
+        progress(done, total)
+    return count
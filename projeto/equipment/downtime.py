@@ -0,0 +1,205 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from projeto.core.sharding import fan_out, fans_out
+
+from .models import Equipment, EventHistory, EventKind
+from .projections import CACHE_TIMEOUT, inputs_fingerprint
+
+PERCENTILES = (50, 90, 95)
+SECONDS_PER_HOUR = 3600.0
+
+
+@dataclass
+class DowntimeReport:
+    window_start: object
+    window_end: object
+    availability: list = field(default_factory=list)
+    turnaround: list = field(default_factory=list)
+
+
+def merge_intervals(groups, starts, ends):
+    """
+    Merges overlapping ``[start, end)`` intervals within each group.
+    All arguments are int64 arrays. Returns ``(groups, starts, ends)`` of
+    the merged intervals, sorted by group and start.
+    """
+    if not len(groups):
+        return groups, starts, ends
+
+    order = np.lexsort((starts, groups))
+    groups, starts, ends = groups[order], starts[order], ends[order]
+
+    # Running maximum of the end inside each group: offsetting every group
+    # above the previous one lets a single accumulate do all groups at once.
+    offset = groups * (int(ends.max()) - int(min(starts.min(), 0)) + 1)
+    running_end = np.maximum.accumulate(ends + offset) - offset
+
+    new_group = np.r_[True, groups[1:] != groups[:-1]]
+    new_interval = new_group | np.r_[True, starts[1:] > running_end[:-1]]
+    first = np.flatnonzero(new_interval)
+    last = np.r_[first[1:], len(starts)] - 1
+
+    return groups[first], starts[first], running_end[last]
+
+
+def grouped_percentiles(groups, values, percentiles=PERCENTILES):
+    """
+    Linear-interpolated percentiles of ``values`` for every group at once.
+    Returns ``(unique_groups, counts, matrix)`` with one column per percentile.
+    """
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    unique_groups, first, counts = np.unique(groups, return_index=True, return_counts=True)
+
+    matrix = np.empty((len(unique_groups), len(percentiles)))
+    for column, percentile in enumerate(percentiles):
+        position = first + (counts - 1) * percentile / 100.0
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, first + counts - 1)
+        fraction = position - lower
+        matrix[:, column] = values[lower] * (1 - fraction) + values[upper] * fraction
+    return unique_groups, counts, matrix
+
+
+def load_events(window_start, window_end, laboratory_id=None):
+    """
+    Out-of-service intervals of both event tiers overlapping the window,
+    as column arrays. Events not yet returned are open until ``window_end``.
+    """
+    events = EventHistory.objects.filter(send_at__lt=window_end).filter(
+        Q(returned_at__isnull=True) | Q(returned_at__gt=window_start)
+    )
+    if laboratory_id:
+        events = events.filter(item__laboratory_id=laboratory_id)
+
+    rows = events.values_list("item_id", "kind", "send_at", "returned_at")
+    items, kinds, starts, ends, returned = [], [], [], [], []
+    for item_id, kind, send_at, returned_at in rows.iterator(chunk_size=10000):
+        items.append(item_id)
+        kinds.append(kind)
+        starts.append(send_at.timestamp())
+        ends.append((returned_at or window_end).timestamp())
+        returned.append(returned_at is not None)
+
+    return {
+        "item": np.array(items, dtype=object),
+        "kind": np.array(kinds, dtype=object),
+        "start": np.array(starts, dtype=np.float64).astype(np.int64),
+        "end": np.array(ends, dtype=np.float64).astype(np.int64),
+        "returned": np.array(returned, dtype=bool),
+    }
+
+
+def compute_downtime(days=365, laboratory_id=None, now=None):
+    """
+    Availability and MTTR per laboratory and category, and out-of-service
+    turnaround percentiles per laboratory, kind and category, over the last
+    ``days``. Overlapping events of the same equipment count once.
+    """
+    window_end = now or timezone.now()
+    window_start = window_end - timedelta(days=days)
+    report = DowntimeReport(window_start=window_start, window_end=window_end)
+    start_ts, end_ts = int(window_start.timestamp()), int(window_end.timestamp())
+
+    equipment = Equipment.objects.filter(bought_at__lt=window_end)
+    if laboratory_id:
+        equipment = equipment.filter(laboratory_id=laboratory_id)
+    rows = list(equipment.values_list("uuid", "laboratory__name", "asset__category", "bought_at"))
+    if not rows:
+        return report
+
+    uuids, laboratories, categories, bought_at = map(list, zip(*rows))
+    index = {uuid: position for position, uuid in enumerate(uuids)}
+    group_names, equipment_group = np.unique(
+        np.array([f"{lab}\x00{category}" for lab, category in zip(laboratories, categories)], dtype=object),
+        return_inverse=True,
+    )
+    observed = end_ts - np.maximum(
+        start_ts, np.array([value.timestamp() for value in bought_at]).astype(np.int64)
+    )
+
+    data = load_events(window_start, window_end, laboratory_id)
+    known = np.array([item in index for item in data["item"]], dtype=bool)
+    codes = np.array([index[item] for item in data["item"][known]], dtype=np.int64)
+    kinds, returned = data["kind"][known], data["returned"][known]
+    starts, ends = data["start"][known], data["end"][known]
+
+    # Availability: merged downtime clipped to the window.
+    merged_items, merged_starts, merged_ends = merge_intervals(
+        codes, np.clip(starts, start_ts, end_ts), np.clip(ends, start_ts, end_ts)
+    )
+    downtime = np.bincount(merged_items, merged_ends - merged_starts, len(uuids))
+    group_observed = np.bincount(equipment_group, observed, len(group_names))
+    group_downtime = np.bincount(equipment_group, downtime, len(group_names))
+    group_equipment = np.bincount(equipment_group, minlength=len(group_names))
+
+    # MTTR: mean duration of returned corrective maintenance.
+    durations = (ends - starts) / SECONDS_PER_HOUR
+    corrective = returned & (kinds == EventKind.CORRECTIVE)
+    repair_groups = equipment_group[codes[corrective]]
+    repairs = np.bincount(repair_groups, minlength=len(group_names))
+    repair_hours = np.bincount(repair_groups, durations[corrective], len(group_names))
+
+    for position, name in enumerate(group_names):
+        laboratory, category = name.split("\x00")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            availability = 1 - group_downtime[position] / group_observed[position]
+        report.availability.append(
+            {
+                "laboratory": laboratory,
+                "category": category,
+                "equipment": int(group_equipment[position]),
+                "availability": float(availability) if group_observed[position] > 0 else None,
+                "downtime_hours": float(group_downtime[position] / SECONDS_PER_HOUR),
+                "repairs": int(repairs[position]),
+                "mttr_hours": float(repair_hours[position] / repairs[position]) if repairs[position] else None,
+            }
+        )
+
+    # Turnaround percentiles of returned events per laboratory, kind and category.
+    if returned.any():
+        kind_names, kind_codes = np.unique(kinds[returned], return_inverse=True)
+        turnaround_groups = equipment_group[codes[returned]] * len(kind_names) + kind_codes
+        unique_groups, counts, matrix = grouped_percentiles(turnaround_groups, durations[returned])
+        for group, count, values in zip(unique_groups, counts, matrix):
+            laboratory, category = group_names[group // len(kind_names)].split("\x00")
+            report.turnaround.append(
+                {
+                    "laboratory": laboratory,
+                    "category": category,
+                    "kind": kind_names[group % len(kind_names)],
+                    "events": int(count),
+                    **{f"p{percentile}_hours": float(value) for percentile, value in zip(PERCENTILES, values)},
+                }
+            )
+
+    return report
+
+
+def get_downtime(days=365, laboratory_id=None):
+    """
+    Cached compute_downtime, recomputed when its inputs change or the day turns.
+    Across laboratories with campus databases, merges the report of each.
+    """
+    if laboratory_id is None and fans_out():
+        reports = fan_out(get_downtime, days)
+        return DowntimeReport(
+            window_start=reports[0].window_start,
+            window_end=reports[0].window_end,
+            availability=sorted(
+                (row for report in reports for row in report.availability),
+                key=lambda row: (row["laboratory"], row["category"]),
+            ),
+            turnaround=sorted(
+                (row for report in reports for row in report.turnaround),
+                key=lambda row: (row["laboratory"], row["category"], row["kind"]),
+            ),
+        )
+    key = f"equipment:downtime:{days}:{timezone.localdate()}:{inputs_fingerprint(laboratory_id)}"
+    return cache.get_or_set(key, lambda: compute_downtime(days, laboratory_id), CACHE_TIMEOUT)
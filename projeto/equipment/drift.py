@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .models import CalibrationPoint
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class DriftResult:
+    equipment_uuid: object
+    category: str
+    points: int
+    slope_per_year: float
+    tolerance_usage: float
+    projected_usage: float
+
+    @property
+    def trending_out_of_tolerance(self):
+        return self.projected_usage > 1.0
+
+
+def load_points(queryset=None):
+    """
+    Loads calibration points into column arrays. Only points with a
+    tolerance take part, since drift is measured as the share of the
+    tolerance in use: (|error| + uncertainty) / tolerance. The calibration
+    periodicity and asset category of each instrument are read in the
+    same query, keyed by uuid under "equipment".
+    """
+    queryset = (queryset if queryset is not None else CalibrationPoint.objects.all()).filter(
+        tolerance__gt=0
+    )
+    rows = queryset.values_list(
+        "item_id",
+        "measured_at",
+        "nominal",
+        "error",
+        "uncertainty",
+        "tolerance",
+        "item__calibration_periodicity",
+        "item__asset__category",
+    )
+    items, times, nominals, errors, uncertainties, tolerances = [], [], [], [], [], []
+    equipment = {}
+    for item_id, measured_at, nominal, error, uncertainty, tolerance, periodicity, category in rows.iterator(
+        chunk_size=10000
+    ):
+        equipment[item_id] = (periodicity, category)
+        items.append(item_id)
+        times.append(measured_at.timestamp())
+        nominals.append(nominal)
+        errors.append(error)
+        uncertainties.append(uncertainty or 0.0)
+        tolerances.append(tolerance)
+
+    return {
+        "equipment": equipment,
+        "item": np.array(items, dtype=object),
+        "days": np.array(times, dtype=np.float64) / SECONDS_PER_DAY,
+        "nominal": np.array(nominals, dtype=np.float64),
+        "usage": (np.abs(np.array(errors, dtype=np.float64)) + np.array(uncertainties, dtype=np.float64))
+        / np.array(tolerances, dtype=np.float64),
+    }
+
+
+def grouped_regression(groups, x, y, group_count):
+    """
+    Least-squares slope and intercept of y over x for every group at once.
+    Groups with fewer than two distinct x values get a zero slope.
+    """
+    n = np.bincount(groups, minlength=group_count).astype(np.float64)
+    sx = np.bincount(groups, x, group_count)
+    sy = np.bincount(groups, y, group_count)
+    sxx = np.bincount(groups, x * x, group_count)
+    sxy = np.bincount(groups, x * y, group_count)
+
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denominator > 1e-9, (n * sxy - sx * sy) / denominator, 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / n, 0.0)
+    return slope, intercept
+
+
+def analyze_drift(queryset=None):
+    """
+    Fits a linear trend of tolerance usage per (instrument, nominal point)
+    series and projects it to each instrument's next calibration. An
+    instrument is trending out of tolerance when any of its series is
+    projected above 100% of the tolerance.
+    Returns DriftResult objects sorted by projected usage, highest first.
+    """
+    data = load_points(queryset)
+    if not len(data["item"]):
+        return []
+
+    item_uuids, item_codes = np.unique(data["item"], return_inverse=True)
+    _, series_codes = np.unique(
+        np.stack([item_codes.astype(np.float64), data["nominal"]]), axis=1, return_inverse=True
+    )
+    series_codes = series_codes.ravel()
+    series_count = series_codes.max() + 1
+
+    # Time is measured from each series' first point to keep the regression stable.
+    first_day = np.full(series_count, np.inf)
+    np.minimum.at(first_day, series_codes, data["days"])
+    x = data["days"] - first_day[series_codes]
+    slope, intercept = grouped_regression(series_codes, x, data["usage"], series_count)
+
+    last_x = np.full(series_count, -np.inf)
+    np.maximum.at(last_x, series_codes, x)
+    series_item = np.zeros(series_count, dtype=np.int64)
+    series_item[series_codes] = item_codes
+
+    equipment = data["equipment"]
+    periodicity = np.array(
+        [equipment.get(uuid, (None, ""))[0] or 365 for uuid in item_uuids], dtype=np.float64
+    )
+
+    current_usage = intercept + slope * last_x
+    projected_usage = intercept + slope * (last_x + periodicity[series_item])
+
+    item_count = len(item_uuids)
+    worst_current = np.full(item_count, -np.inf)
+    worst_projected = np.full(item_count, -np.inf)
+    steepest = np.full(item_count, -np.inf)
+    np.maximum.at(worst_current, series_item, current_usage)
+    np.maximum.at(worst_projected, series_item, projected_usage)
+    np.maximum.at(steepest, series_item, slope * 365.0)
+    point_counts = np.bincount(item_codes, minlength=item_count)
+
+    results = [
+        DriftResult(
+            equipment_uuid=uuid,
+            category=equipment.get(uuid, (None, ""))[1],
+            points=int(point_counts[index]),
+            slope_per_year=float(steepest[index]),
+            tolerance_usage=float(worst_current[index]),
+            projected_usage=float(worst_projected[index]),
+        )
+        for index, uuid in enumerate(item_uuids)
+    ]
+    return sorted(results, key=lambda result: result.projected_usage, reverse=True)
+
+
+def category_drift(results):
+    """
+    Summarizes drift results per asset category.
+    """
+    summary = {}
+    for result in results:
+        category = summary.setdefault(
+            result.category, {"instruments": 0, "trending_out": 0, "slopes": []}
+        )
+        category["instruments"] += 1
+        category["trending_out"] += result.trending_out_of_tolerance
+        category["slopes"].append(result.slope_per_year)
+
+    return {
+        name: {
+            "instruments": values["instruments"],
+            "trending_out": values["trending_out"],
+            "median_slope_per_year": float(np.median(values["slopes"])),
+        }
+        for name, values in summary.items()
+    }
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.db.models import (
+    Case,
+    DateTimeField,
+    DurationField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    When,
+)
+from django.utils import timezone
+
+from projeto.core.sharding import atomic
+
+from .models import Equipment, Event, EventKind
+from .outbox import record_bulk_changes
+
+
+def latest_returned_subquery(kind):
+    return Subquery(
+        Event.objects.filter(
+            item=OuterRef("pk"), kind=kind, returned_at__isnull=False
+        ).order_by("-returned_at").values("returned_at")[:1]
+    )
+
+
+def latest_calibration_subquery():
+    return latest_returned_subquery(EventKind.CALIBRATION)
+
+
+def due_date_expression(kind, periodicity_field):
+    return ExpressionWrapper(
+        latest_returned_subquery(kind)
+        + ExpressionWrapper(F(periodicity_field) * timedelta(days=1), output_field=DurationField()),
+        output_field=DateTimeField(),
+    )
+
+
+def recalibration_requests():
+    """
+    Non-calibration events flagged for recalibration. One expires the
+    calibration when it was sent after the latest calibration returned,
+    whatever order the events were entered in.
+    """
+    return Event.objects.filter(requires_recalibration=True).exclude(kind=EventKind.CALIBRATION)
+
+
+def recompute_calibration_due_dates(queryset):
+    """
+    Set-based equivalent of the update_expiration_date signal: sets
+    calibration_due_date to the latest calibration plus the current
+    calibration_periodicity, in one UPDATE. Equipment flagged for
+    recalibration by an event sent after that calibration keeps its
+    (already expired) due date.
+    Returns the number of updated equipment.
+    """
+    forced_recalibration = recalibration_requests().filter(
+        item=OuterRef("pk"), send_at__gt=OuterRef("_last_calibration")
+    )
+
+    pks = list(
+        queryset.annotate(_last_calibration=latest_calibration_subquery())
+        .filter(_last_calibration__isnull=False)
+        .exclude(Exists(forced_recalibration))
+        .values_list("pk", flat=True)
+    )
+    if not pks:
+        return 0
+
+    with atomic():
+        updated = Equipment.all_objects.filter(pk__in=pks).update(
+            calibration_due_date=due_date_expression(EventKind.CALIBRATION, "calibration_periodicity"),
+            updated_at=timezone.now(),
+        )
+        record_bulk_changes(Equipment.all_objects.filter(pk__in=pks), changed_fields=["calibration_due_date"])
+    return updated
+
+
+def recompute_maintenance_due_dates(queryset):
+    """
+    Set-based equivalent of the update_maintenance_due_date signal: sets
+    maintenance_due_date to the latest preventive maintenance plus the
+    current maintenance_periodicity, in one UPDATE. Equipment without a
+    positive periodicity is left unscheduled.
+    Returns the number of updated equipment.
+    """
+    preventive = Event.objects.filter(item=OuterRef("pk"), kind=EventKind.PREVENTIVE, returned_at__isnull=False)
+    pks = list(
+        queryset.filter(Q(maintenance_due_date__isnull=False) | Exists(preventive)).values_list("pk", flat=True)
+    )
+    if not pks:
+        return 0
+
+    with atomic():
+        updated = Equipment.all_objects.filter(pk__in=pks).update(
+            maintenance_due_date=Case(
+                When(
+                    maintenance_periodicity__gt=0,
+                    then=due_date_expression(EventKind.PREVENTIVE, "maintenance_periodicity"),
+                ),
+                default=None,
+                output_field=DateTimeField(),
+            ),
+            updated_at=timezone.now(),
+        )
+        record_bulk_changes(Equipment.all_objects.filter(pk__in=pks), changed_fields=["maintenance_due_date"])
+    return updated
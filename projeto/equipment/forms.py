@@ -0,0 +1,102 @@
+from django import forms
+from django.conf import settings
+from django.contrib.admin.widgets import AdminSplitDateTime
+from django.utils.translation import gettext_lazy as _
+
+from projeto.core.widgets import PeriodicityWidget
+
+from .models import CERTIFICATE_CONTENT_TYPES, CertificateAttachment, Equipment, EventKind, Laboratory
+from .storage import ContentAddressedStorage
+
+
+class CertificateAttachmentForm(forms.ModelForm):
+    file = forms.FileField(label=_("file"), required=False)
+
+    class Meta:
+        model = CertificateAttachment
+        fields = ()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get("file")
+        if self.instance._state.adding and self.has_changed() and not upload:
+            raise forms.ValidationError(_("Select a file to attach."))
+        if upload and upload.size > settings.CERTIFICATE_MAX_UPLOAD_SIZE:
+            raise forms.ValidationError(_("File too large."))
+        if upload and (upload.content_type or "application/octet-stream") not in CERTIFICATE_CONTENT_TYPES:
+            raise forms.ValidationError(_("Only PDF files can be attached."))
+        return cleaned_data
+
+    def save(self, commit=True):
+        if upload := self.cleaned_data.get("file"):
+            digest, size = ContentAddressedStorage().save(upload.chunks())
+            self.instance.filename = upload.name
+            self.instance.content_type = upload.content_type or "application/octet-stream"
+            self.instance.size = size
+            self.instance.sha256 = digest
+        return super().save(commit)
+
+
+class MoveToLaboratoryForm(forms.Form):
+    laboratory = forms.ModelChoiceField(label=_("laboratory"), queryset=Laboratory.objects.order_by("name"))
+
+
+class CalibrationPeriodicityForm(forms.Form):
+    calibration_periodicity = forms.IntegerField(
+        label=_("calibration periodicity"), min_value=1, widget=PeriodicityWidget()
+    )
+
+
+class EventBatchForm(forms.Form):
+    """Fields shared by every event of a batch, e.g. one vendor visit."""
+    equipment = forms.ModelMultipleChoiceField(label=_("equipment"), queryset=Equipment.objects.none())
+    kind = forms.ChoiceField(label=_("type"), choices=EventKind.choices)
+    send_at = forms.SplitDateTimeField(label=_("sent at"), widget=AdminSplitDateTime())
+    returned_at = forms.SplitDateTimeField(label=_("returned at"), widget=AdminSplitDateTime(), required=False)
+    observation = forms.CharField(label=_("observation"), widget=forms.Textarea(attrs={"rows": 2}))
+    requires_recalibration = forms.BooleanField(label=_("requires recalibration"), required=False)
+
+    def __init__(self, *args, equipment=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if equipment is not None:
+            self.fields["equipment"].queryset = equipment
+
+    def clean(self):
+        cleaned_data = super().clean()
+        send_at, returned_at = cleaned_data.get("send_at"), cleaned_data.get("returned_at")
+        if send_at and returned_at and returned_at < send_at:
+            self.add_error("returned_at", _("Return date cannot be before the send date."))
+        return cleaned_data
+
+
+class EventBatchRowForm(forms.Form):
+    """
+    Per-equipment fields of a batch. ``equipment`` maps the selected
+    primary keys to their instances, so rows validate without a query each.
+    """
+    item = forms.UUIDField(widget=forms.HiddenInput)
+    certificate_number = forms.CharField(label=_("calibration certificate"), max_length=50)
+    certificate_results = forms.CharField(
+        label=_("calibration ranges and points"), widget=forms.Textarea(attrs={"rows": 2})
+    )
+    price = forms.DecimalField(label=_("price"), max_digits=10, decimal_places=2, required=False)
+
+    def __init__(self, *args, equipment=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.equipment = equipment or {}
+
+    @property
+    def equipment_label(self):
+        try:
+            return str(self.equipment[self.fields["item"].to_python(self["item"].value())])
+        except (KeyError, forms.ValidationError):
+            return ""
+
+    def clean_item(self):
+        item = self.equipment.get(self.cleaned_data["item"])
+        if item is None:
+            raise forms.ValidationError(_("Select a valid choice."))
+        return item
+
+
+EventBatchRowFormSet = forms.formset_factory(EventBatchRowForm, extra=0)
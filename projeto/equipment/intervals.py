@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from projeto.core.sharding import atomic
+
+from .drift import analyze_drift
+from .due_dates import recompute_calibration_due_dates
+from .models import CalibrationPoint, Equipment, Event, EventKind, IntervalRecommendation
+from .outbox import record_bulk_changes
+
+# Interval adjustment factors, in the spirit of the ILAC G24 "staircase" method.
+FAILURE_FACTOR = 0.7
+CORRECTIVE_FACTOR = 0.85
+DRIFT_FACTOR = 0.75
+EXTENSION_FACTOR = 1.25
+MIN_CALIBRATIONS_TO_EXTEND = 3
+MIN_PERIODICITY = 30
+MAX_PERIODICITY = 5 * 365
+
+
+def compute_recommendations(now=None):
+    """
+    Computes a recommended calibration interval for every active equipment
+    with a periodicity, from the events of the lookback window:
+
+    - each failure (event with ``requires_recalibration``) shortens it by 30%;
+    - more than one corrective maintenance a year shortens it by 15%;
+    - calibration points projected out of tolerance shorten it by 25%;
+    - a clean record (no failures or corrective maintenance, at least three
+      calibrations and less than half the tolerance in use) extends it by 25%.
+
+    Returns a list of unsaved IntervalRecommendation for the equipment whose
+    recommended interval differs from the current one.
+    """
+    now = now or timezone.now()
+    lookback_days = settings.CALIBRATION_INTERVAL_LOOKBACK_DAYS
+    since = now - timedelta(days=lookback_days)
+
+    eligible = Equipment.objects.filter(calibration_periodicity__gt=0)
+    equipment = list(eligible.values_list("uuid", "calibration_periodicity"))
+    if not equipment:
+        return []
+    uuids = [uuid for uuid, _ in equipment]
+    index = {uuid: position for position, uuid in enumerate(uuids)}
+    current = np.array([periodicity for _, periodicity in equipment], dtype=np.float64)
+    count = len(uuids)
+
+    # Filtered by subquery: a list of every uuid would outgrow SQLite's parameter limit.
+    # Equipment added since the first query is skipped until the next run.
+    events = [
+        row for row in Event.objects.filter(item__in=eligible.values("pk"), send_at__gte=since).values_list(
+            "item_id", "kind", "requires_recalibration"
+        )
+        if row[0] in index
+    ]
+    codes = np.array([index[item_id] for item_id, _, _ in events], dtype=np.int64)
+    kinds = np.array([kind for _, kind, _ in events], dtype=object)
+    failed = np.array([flag for _, _, flag in events], dtype=bool)
+
+    calibrations = np.bincount(codes, (kinds == EventKind.CALIBRATION).astype(np.float64), count)
+    failures = np.bincount(codes, failed.astype(np.float64), count)
+    correctives = np.bincount(codes, (kinds == EventKind.CORRECTIVE).astype(np.float64), count)
+
+    usage = np.full(count, np.nan)
+    points = CalibrationPoint.objects.filter(item__in=eligible.values("pk"), measured_at__gte=since)
+    for result in analyze_drift(points):
+        if result.equipment_uuid in index:
+            usage[index[result.equipment_uuid]] = result.projected_usage
+
+    factor = FAILURE_FACTOR ** failures
+    factor *= np.where(correctives / (lookback_days / 365.0) > 1.0, CORRECTIVE_FACTOR, 1.0)
+    factor *= np.where(usage > 1.0, DRIFT_FACTOR, 1.0)
+    clean_record = (
+        (failures == 0)
+        & (correctives == 0)
+        & (calibrations >= MIN_CALIBRATIONS_TO_EXTEND)
+        & (np.nan_to_num(usage, nan=0.0) < 0.5)
+    )
+    factor *= np.where(clean_record, EXTENSION_FACTOR, 1.0)
+
+    recommended = np.clip(np.round(current * factor), MIN_PERIODICITY, MAX_PERIODICITY).astype(np.int64)
+    changed = np.flatnonzero(recommended != current)
+
+    return [
+        IntervalRecommendation(
+            item_id=uuids[position],
+            current_periodicity=int(current[position]),
+            recommended_periodicity=int(recommended[position]),
+            calibrations=int(calibrations[position]),
+            failures=int(failures[position]),
+            corrective_maintenances=int(correctives[position]),
+            projected_tolerance_usage=None if np.isnan(usage[position]) else float(usage[position]),
+        )
+        for position in changed
+    ]
+
+
+def refresh_recommendations(now=None):
+    """
+    Replaces every pending recommendation with a freshly computed set.
+    """
+    recommendations = compute_recommendations(now)
+    with atomic():
+        IntervalRecommendation.objects.filter(accepted_at__isnull=True).delete()
+        IntervalRecommendation.objects.bulk_create(recommendations)
+    return recommendations
+
+
+def accept_recommendations(queryset):
+    """
+    Applies pending recommendations with one UPDATE on Equipment, then
+    recomputes the affected calibration due dates set-based.
+    Returns the number of updated equipment.
+    """
+    pending = list(queryset.filter(accepted_at__isnull=True).values_list("pk", "item_id", "recommended_periodicity"))
+    if not pending:
+        return 0
+
+    item_ids = [item_id for _, item_id, _ in pending]
+    now = timezone.now()
+    with atomic():
+        updated = Equipment.all_objects.filter(pk__in=item_ids).update(
+            calibration_periodicity=Case(
+                *[When(pk=item_id, then=Value(periodicity)) for _, item_id, periodicity in pending],
+                output_field=IntegerField(),
+            ),
+            updated_at=now,
+        )
+        record_bulk_changes(Equipment.all_objects.filter(pk__in=item_ids), changed_fields=["calibration_periodicity"])
+        IntervalRecommendation.objects.filter(pk__in=[pk for pk, _, _ in pending]).update(accepted_at=now)
+        recompute_calibration_due_dates(Equipment.all_objects.filter(pk__in=item_ids))
+    return updated
@@ -0,0 +1,82 @@
+import csv
+
+from django.conf import settings
+
+from projeto.core.jobs import register, report_progress
+from projeto.core.sharding import across_databases, all_databases, using_database
+
+from .calibration import rebuild_calibration_points
+from .due_dates import recompute_calibration_due_dates, recompute_maintenance_due_dates
+from .models import Equipment
+
+EXPORT_COLUMNS = (
+    "uuid",
+    "serial_number",
+    "tag_number",
+    "inventory_number",
+    "laboratory__name",
+    "asset__category",
+    "asset__brand",
+    "asset__model",
+    "archived",
+    "calibration_periodicity",
+    "calibration_due_date",
+    "maintenance_periodicity",
+    "maintenance_due_date",
+)
+
+
+def selected_equipment(equipment):
+    queryset = Equipment.all_objects.all()
+    if equipment is not None:
+        queryset = queryset.filter(pk__in=equipment)
+    return queryset
+
+
+# Jobs run outside of requests: each database is processed in turn, and
+# progress is reported after each step, which renews the job's lease.
+@register("equipment.recompute_due_dates")
+def recompute_due_dates(job, equipment=None):
+    databases = all_databases()
+    calibration = maintenance = 0
+    for done, alias in enumerate(databases, start=1):
+        with using_database(alias):
+            calibration += recompute_calibration_due_dates(selected_equipment(equipment))
+            report_progress(job, 100 * (done - 0.5) / len(databases), f"{calibration} calibration due dates updated")
+            maintenance += recompute_maintenance_due_dates(selected_equipment(equipment))
+        report_progress(job, 100 * done / len(databases), f"{maintenance} maintenance due dates updated")
+    return {"calibration": calibration, "maintenance": maintenance}
+
+
+@register("equipment.rebuild_calibration_points")
+def rebuild_points(job, equipment=None):
+    databases = all_databases()
+    points = 0
+    for index, alias in enumerate(databases):
+        def progress(done, total):
+            share = done / total if total else 1
+            report_progress(job, 100 * (index + share) / len(databases), f"{alias}: {done}/{total} events")
+
+        with using_database(alias):
+            points += rebuild_calibration_points(equipment, progress=progress)
+    return {"points": points}
+
+
+@register("equipment.export_equipment")
+def export_equipment(job, equipment=None, chunk_size=2000):
+    queryset = across_databases(selected_equipment(equipment).order_by("laboratory__name", "serial_number"))
+    total = queryset.count()
+    output_root = settings.JOB_OUTPUT_ROOT
+    output_root.mkdir(parents=True, exist_ok=True)
+    filename = f"{job.pk}.csv"
+
+    rows = 0
+    with open(output_root / filename, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size):
+            writer.writerow(row)
+            rows += 1
+            if rows % chunk_size == 0:
+                report_progress(job, 100 * rows / total, f"{rows}/{total} equipment")
+    return {"file": filename, "rows": rows}
@@ -0,0 +1,208 @@
+import hashlib
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+
+import segno
+from django.core.cache import cache
+from django.urls import reverse
+
+CACHE_TIMEOUT = 30 * 24 * 60 * 60
+# Below this many labels to render, starting worker processes costs more than it saves.
+PARALLEL_THRESHOLD = 200
+MM = 72 / 25.4
+
+
+@dataclass(frozen=True)
+class LabelSheet:
+    """Label sheet geometry in points; the default is an A4 sheet of 3 x 8 labels."""
+    page_width: float = 210 * MM
+    page_height: float = 297 * MM
+    columns: int = 3
+    rows: int = 8
+    margin_x: float = 7 * MM
+    margin_y: float = 13 * MM
+    padding: float = 2 * MM
+
+    @property
+    def per_page(self):
+        return self.columns * self.rows
+
+    @property
+    def label_width(self):
+        return (self.page_width - 2 * self.margin_x) / self.columns
+
+    @property
+    def label_height(self):
+        return (self.page_height - 2 * self.margin_y) / self.rows
+
+    def origin(self, position):
+        """Bottom-left corner of the label at ``position``, filled left to right from the top."""
+        row, column = divmod(position, self.columns)
+        return (
+            self.margin_x + column * self.label_width,
+            self.page_height - self.margin_y - (row + 1) * self.label_height,
+        )
+
+    def page(self, fragments):
+        """Content stream of one page made of label fragments."""
+        content = []
+        for position, fragment in enumerate(fragments):
+            x, y = self.origin(position)
+            content.append(b"q 1 0 0 1 %s %s cm\n%sQ\n" % (number(x), number(y), fragment))
+        return b"".join(content)
+
+
+def number(value):
+    return (b"%.2f" % value).rstrip(b"0").rstrip(b".")
+
+
+def pdf_text(value, limit=28):
+    value = value if len(value) <= limit else value[: limit - 1] + "…"
+    encoded = value.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def qr_image(url):
+    """The QR code of ``url`` as a 1-bit inline image mask: dark modules are painted."""
+    qr = segno.make(url, error="m", micro=False)
+    rows = []
+    for row in qr.matrix_iter(scale=1, border=4):
+        bits = "".join("0" if dark else "1" for dark in row)
+        bits += "1" * (-len(bits) % 8)
+        rows.append(int(bits, 2).to_bytes(len(bits) // 8, "big"))
+    width = qr.symbol_size(scale=1, border=4)[0]
+    return b"BI /IM true /W %d /H %d /BPC 1 /F /AHx ID %s> EI" % (width, width, b"".join(rows).hex().encode())
+
+
+def render_label(sheet, label):
+    """
+    Content stream fragment of one label, drawn from its bottom-left
+    corner: the QR code of the equipment link and its tag and inventory
+    numbers. Runs in worker processes, so it only uses its arguments.
+    """
+    url, tag_number, inventory_number = label
+    side = sheet.label_height - 2 * sheet.padding
+    text_x = number(2 * sheet.padding + side)
+    return b"".join((
+        b"q %s 0 0 %s %s %s cm\n" % (number(side), number(side), number(sheet.padding), number(sheet.padding)),
+        qr_image(url),
+        b"\nQ\n",
+        b"BT /F2 11 Tf %s %s Td (%s) Tj ET\n" % (text_x, number(sheet.label_height * 0.55), pdf_text(tag_number)),
+        b"BT /F1 8 Tf %s %s Td (%s) Tj ET\n" % (text_x, number(sheet.label_height * 0.3), pdf_text(inventory_number)),
+    ))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def render_labels(queryset, base_url, sheet, processes=1, chunk_size=1000):
+    """
+    Label fragments of the equipment in ``queryset``, in order. Fragments
+    are cached per equipment and ``updated_at``; the missing ones are
+    rendered by a pool of ``processes`` worker processes, started once
+    there are PARALLEL_THRESHOLD of them in a chunk.
+    """
+    variant = hashlib.md5(f"{sheet!r}|{base_url}".encode(), usedforsecurity=False).hexdigest()[:12]
+    rows = queryset.values_list("uuid", "tag_number", "inventory_number", "updated_at").iterator(chunk_size=chunk_size)
+    with ExitStack() as stack:
+        pool = None
+        for chunk in chunked(rows, chunk_size):
+            keys = [f"equipment:label:{pk}:{updated_at.timestamp()}:{variant}" for pk, _, _, updated_at in chunk]
+            fragments = cache.get_many(keys)
+            missing = [
+                (key, (base_url + reverse("admin:equipment_equipment_change", args=[pk]), tag_number, inventory_number))
+                for key, (pk, tag_number, inventory_number, _) in zip(keys, chunk)
+                if key not in fragments
+            ]
+            if missing:
+                render = partial(render_label, sheet)
+                labels = [label for _, label in missing]
+                if processes > 1 and len(missing) >= PARALLEL_THRESHOLD:
+                    if pool is None:
+                        pool = stack.enter_context(ProcessPoolExecutor(max_workers=processes))
+                    rendered = pool.map(render, labels, chunksize=max(len(labels) // (4 * processes), 1))
+                else:
+                    rendered = map(render, labels)
+                new = dict(zip((key for key, _ in missing), rendered))
+                cache.set_many(new, CACHE_TIMEOUT)
+                fragments.update(new)
+            for key in keys:
+                yield fragments[key]
+
+
+class PdfWriter:
+    """
+    Writes a PDF object by object, as bytes to stream out, keeping the
+    offsets for the cross-reference table written by ``close``.
+    """
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+
+    def write(self, data):
+        self.offset += len(data)
+        return data
+
+    def object(self, number, body):
+        self.offsets[number] = self.offset
+        return self.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def stream(self, number, data):
+        data = zlib.compress(data)
+        return self.object(number, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data))
+
+    def close(self, root):
+        size = max(self.offsets) + 1
+        xref = self.offset
+        entries = [b"0000000000 65535 f \n"]
+        entries += [b"%010d 00000 n \n" % self.offsets[number] for number in range(1, size)]
+        return self.write(
+            b"xref\n0 %d\n%strailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, b"".join(entries), size, root, xref)
+        )
+
+
+def write_pdf(pages, sheet):
+    """Yields a PDF of the page content streams in ``pages`` as it is written."""
+    catalog, page_tree, regular, bold = 1, 2, 3, 4
+    pdf = PdfWriter()
+    yield pdf.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    yield pdf.object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % page_tree)
+    for font_object, font in ((regular, b"Helvetica"), (bold, b"Helvetica-Bold")):
+        yield pdf.object(font_object, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % font)
+
+    kids = []
+    next_object = bold + 1
+    for content in pages:
+        page, stream = next_object, next_object + 1
+        next_object += 2
+        kids.append(b"%d 0 R" % page)
+        yield pdf.stream(stream, content)
+        yield pdf.object(
+            page,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> >>"
+            % (page_tree, number(sheet.page_width), number(sheet.page_height), stream, regular, bold),
+        )
+    # The page tree lists every page, so it is written last.
+    yield pdf.object(page_tree, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids)))
+    yield pdf.close(catalog)
+
+
+def label_sheets(queryset, base_url, sheet=LabelSheet(), processes=1, chunk_size=1000):
+    """
+    Yields, as it is generated, a PDF of label sheets for the equipment in
+    ``queryset`` ordered by laboratory and tag number. ``base_url`` (e.g.
+    ``https://host``) prefixes the admin link encoded in the QR codes.
+    """
+    queryset = queryset.order_by("laboratory__name", "tag_number", "pk")
+    fragments = render_labels(queryset, base_url.rstrip("/"), sheet, processes, chunk_size)
+    pages = (sheet.page(chunk) for chunk in chunked(fragments, sheet.per_page))
+    yield from write_pdf(pages, sheet)
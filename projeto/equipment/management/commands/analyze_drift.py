@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from projeto.core.sharding import across_databases, fan_out
+from projeto.equipment.calibration import rebuild_calibration_points
+from projeto.equipment.drift import analyze_drift, category_drift
+from projeto.equipment.models import CalibrationPoint
+
+
+class Command(BaseCommand):
+    help = "Flags instruments whose calibration points are trending out of tolerance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", help="Restrict the analysis to one asset category.")
+        parser.add_argument("--all", action="store_true", help="List every instrument, not only flagged ones.")
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Re-parse certificate_results of every event (both tiers) before analysing.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            count = sum(fan_out(rebuild_calibration_points))
+            self.stdout.write(f"Parsed {count} calibration points.")
+
+        queryset = across_databases(CalibrationPoint.objects.all())
+        if options["category"]:
+            queryset = queryset.filter(item__asset__category=options["category"])
+
+        results = analyze_drift(queryset)
+        for result in results:
+            if options["all"] or result.trending_out_of_tolerance:
+                self.stdout.write(
+                    f"{result.equipment_uuid}  {result.category:<20} points={result.points:<5} "
+                    f"usage={result.tolerance_usage:6.1%}  projected={result.projected_usage:6.1%}  "
+                    f"slope/year={result.slope_per_year:+.1%}"
+                )
+
+        for category, summary in sorted(category_drift(results).items()):
+            self.stdout.write(
+                f"{category:<25} instruments={summary['instruments']:<5} "
+                f"trending_out={summary['trending_out']:<5} "
+                f"median slope/year={summary['median_slope_per_year']:+.1%}"
+            )
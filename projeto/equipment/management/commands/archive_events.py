@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from projeto.core.sharding import across_databases, fan_out
+from projeto.equipment.archive import archivable_events, archive_events
+
+
+class Command(BaseCommand):
+    help = "Moves old events and events of archived equipment into the archive tier."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=settings.EVENT_ARCHIVE_HORIZON_DAYS,
+            help="Events returned more than this many days ago are archived.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = across_databases(archivable_events(options["horizon_days"])).count()
+            self.stdout.write(f"{count} events would be archived.")
+            return
+
+        count = sum(fan_out(archive_events, options["horizon_days"], batch_size=options["batch_size"]))
+        self.stdout.write(f"Archived {count} events.")
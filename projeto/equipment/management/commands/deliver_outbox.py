@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from projeto.core.sharding import using_database
+from projeto.equipment.outbox import DeliveryError, deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Delivers pending outbox entries to a webhook in batches, with retries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", default="webhook", help="Cursor name of this consumer.")
+        parser.add_argument("--url", default=settings.OUTBOX_WEBHOOK_URL)
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument("--max-retries", type=int, default=settings.OUTBOX_MAX_RETRIES)
+        parser.add_argument("--backoff", type=float, default=1.0, help="Initial retry delay in seconds.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new entries.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Polling interval with --loop.")
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS, help="Database whose outbox is delivered (see CAMPUS_DATABASES)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                with using_database(options["database"]):
+                    delivered = deliver_pending(
+                        consumer=options["consumer"],
+                        url=options["url"],
+                        batch_size=options["batch_size"],
+                        max_retries=options["max_retries"],
+                        backoff=options["backoff"],
+                    )
+            except DeliveryError as exc:
+                raise CommandError(f"Delivery to {options['url']} failed: {exc}")
+
+            if delivered:
+                self.stdout.write(f"Delivered {delivered} entries to {options['url']}.")
+
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from projeto.equipment.bi_export import FORMATS, TABLES, ExportUnavailable, export
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the laboratory, asset, equipment (with computed statuses) and event tables as Parquet "
+        "or Arrow files partitioned by updated_at month, for BI loads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=settings.BI_EXPORT_ROOT, help="Directory the tables are written to.")
+        parser.add_argument("--tables", nargs="+", choices=list(TABLES), help="Defaults to every table.")
+        parser.add_argument("--format", choices=FORMATS, default="parquet")
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only rewrite the months changed since the previous export of each table.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=settings.BI_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            results = export(
+                str(options["output"]),
+                tables=options["tables"],
+                file_format=options["format"],
+                incremental=options["incremental"],
+                chunk_size=options["chunk_size"],
+            )
+        except ExportUnavailable as error:
+            raise CommandError(error)
+
+        for table, months in results.items():
+            self.stdout.write(f"{table}: {sum(months.values())} rows in {len(months)} partitions.")
@@ -0,0 +1,40 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from projeto.core.sharding import across_databases
+from projeto.equipment.labels import LabelSheet, label_sheets
+from projeto.equipment.models import Equipment
+
+
+class Command(BaseCommand):
+    help = "Writes a PDF of QR label sheets (tag and inventory numbers) for active equipment."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="PDF file to write, or - for standard output.")
+        parser.add_argument("--laboratory", help="Only the equipment of this laboratory (uuid).")
+        parser.add_argument("--equipment", nargs="+", help="Only these equipment (uuids).")
+        parser.add_argument("--base-url", default=settings.LABEL_BASE_URL)
+        parser.add_argument("--processes", type=int, default=settings.LABEL_PROCESSES)
+        parser.add_argument("--columns", type=int, default=LabelSheet.columns)
+        parser.add_argument("--rows", type=int, default=LabelSheet.rows)
+
+    def handle(self, *args, **options):
+        queryset = across_databases(Equipment.objects.all())
+        if options["laboratory"]:
+            queryset = queryset.filter(laboratory=options["laboratory"])
+        if options["equipment"]:
+            queryset = queryset.filter(pk__in=options["equipment"])
+        count = queryset.count()
+
+        sheet = LabelSheet(columns=options["columns"], rows=options["rows"])
+        chunks = label_sheets(queryset, options["base_url"], sheet, processes=options["processes"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        with open(options["output"], "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(f"Wrote {count} labels to {options['output']}.")
@@ -0,0 +1,21 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from projeto.core.sharding import fan_out
+from projeto.equipment.projections import compute_projection, merge_projections
+
+
+class Command(BaseCommand):
+    help = "Projects calibration and preventive maintenance workload and cost per laboratory, category and week."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=12)
+        parser.add_argument("--laboratory", help="Laboratory uuid to restrict the projection to.")
+
+    def handle(self, *args, **options):
+        writer = csv.writer(self.stdout)
+        writer.writerow(["week", "laboratory", "category", "kind", "count", "expected_cost"])
+        projections = fan_out(compute_projection, options["months"], options["laboratory"])
+        for row in merge_projections(projections):
+            writer.writerow([row.week, row.laboratory, row.category, row.kind, row.count, row.expected_cost])
@@ -0,0 +1,18 @@
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+
+from projeto.core.sharding import fan_out
+from projeto.equipment.intervals import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recomputes the recommended calibration interval of every active equipment."
+
+    def handle(self, *args, **options):
+        recommendations = list(chain.from_iterable(fan_out(refresh_recommendations)))
+        shorter = sum(r.recommended_periodicity < r.current_periodicity for r in recommendations)
+        self.stdout.write(
+            f"{len(recommendations)} recommendations: {shorter} shorter, "
+            f"{len(recommendations) - shorter} longer."
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from projeto.equipment.notifications import send_calibration_digests
+
+
+class Command(BaseCommand):
+    help = "E-mails each laboratory user a digest of equipment entering the 60-day, 30-day or expired calibration buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Print the digests instead of sending them.")
+
+    def handle(self, *args, **options):
+        equipment, messages = send_calibration_digests(dry_run=options["dry_run"])
+
+        if options["dry_run"]:
+            for message in messages:
+                self.stdout.write(f"To: {', '.join(message.to)}\nSubject: {message.subject}\n\n{message.body}")
+            self.stdout.write(f"{len(messages)} digests would be sent for {len(equipment)} equipment.")
+            return
+
+        self.stdout.write(f"Sent {len(messages)} digests for {len(equipment)} equipment.")
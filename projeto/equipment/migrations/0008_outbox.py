@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:11
+
+import django.core.serializers.json
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0007_delete_expiringequipment_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxCursor',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('consumer', models.CharField(max_length=100, unique=True, verbose_name='consumer')),
+                ('position', models.BigIntegerField(default=0, verbose_name='position')),
+            ],
+            options={
+                'verbose_name': 'Outbox cursor',
+                'verbose_name_plural': 'Outbox cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEntry',
+            fields=[
+                ('sequence', models.BigAutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('model', models.CharField(max_length=100, verbose_name='model')),
+                ('object_uuid', models.UUIDField(db_index=True, verbose_name='object')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated')], max_length=20, verbose_name='action')),
+                ('changed_fields', models.JSONField(blank=True, default=list, verbose_name='changed fields')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='payload')),
+            ],
+            options={
+                'verbose_name': 'Outbox entry',
+                'verbose_name_plural': 'Outbox entries',
+                'ordering': ('sequence',),
+            },
+        ),
+    ]
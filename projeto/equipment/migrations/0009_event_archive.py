@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:12
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+EVENT_COLUMNS = (
+    "uuid, created_at, updated_at, item_id, kind, send_at, returned_at, price, "
+    "certificate_number, certificate_results, observation, requires_recalibration"
+)
+
+CREATE_EVENT_HISTORY_VIEW = f"""
+CREATE VIEW equipment_eventhistory AS
+SELECT {EVENT_COLUMNS}, 'hot' AS tier FROM equipment_event
+UNION ALL
+SELECT {EVENT_COLUMNS}, 'archive' AS tier FROM equipment_archivedevent
+"""
+
+DROP_EVENT_HISTORY_VIEW = "DROP VIEW IF EXISTS equipment_eventhistory"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0008_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventHistory',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('preventive_maintenance', 'Preventive Maintenance'), ('corrective_maintenance', 'Corrective Maintenance'), ('calibration', 'Calibration'), ('qualification', 'Qualification'), ('check', 'Check')], max_length=50, verbose_name='type')),
+                ('send_at', models.DateTimeField(verbose_name='sent at')),
+                ('returned_at', models.DateTimeField(blank=True, null=True, verbose_name='returned at')),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='price')),
+                ('certificate_number', models.CharField(max_length=50, verbose_name='calibration certificate')),
+                ('certificate_results', models.TextField(verbose_name='calibration ranges and points')),
+                ('observation', models.TextField(verbose_name='observation')),
+                ('requires_recalibration', models.BooleanField(default=False, verbose_name='requires recalibration')),
+                ('tier', models.CharField(choices=[('hot', 'Recent'), ('archive', 'Archive')], max_length=10, verbose_name='tier')),
+            ],
+            options={
+                'verbose_name': 'Event history',
+                'verbose_name_plural': 'Event history',
+                'db_table': 'equipment_eventhistory',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('preventive_maintenance', 'Preventive Maintenance'), ('corrective_maintenance', 'Corrective Maintenance'), ('calibration', 'Calibration'), ('qualification', 'Qualification'), ('check', 'Check')], max_length=50, verbose_name='type')),
+                ('send_at', models.DateTimeField(verbose_name='sent at')),
+                ('returned_at', models.DateTimeField(blank=True, null=True, verbose_name='returned at')),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='price')),
+                ('certificate_number', models.CharField(max_length=50, verbose_name='calibration certificate')),
+                ('certificate_results', models.TextField(verbose_name='calibration ranges and points')),
+                ('observation', models.TextField(verbose_name='observation')),
+                ('requires_recalibration', models.BooleanField(default=False, verbose_name='requires recalibration')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='archived at')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_events', to='equipment.equipment', verbose_name='item')),
+            ],
+            options={
+                'verbose_name': 'Archived event',
+                'verbose_name_plural': 'Archived events',
+            },
+        ),
+        migrations.RunSQL(CREATE_EVENT_HISTORY_VIEW, DROP_EVENT_HISTORY_VIEW),
+    ]
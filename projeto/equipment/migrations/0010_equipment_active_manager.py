@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0009_event_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['calibration_due_date'], name='equipment_active_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['laboratory', 'calibration_due_date'], name='equipment_active_lab_due_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:15
+
+import projeto.core.models
+from django.db import migrations, models
+
+EVENT_COLUMNS = (
+    "uuid, created_at, updated_at, item_id, kind, send_at, returned_at, price, "
+    "certificate_number, certificate_results, observation, requires_recalibration"
+)
+
+CREATE_EVENT_HISTORY_VIEW = f"""
+CREATE VIEW equipment_eventhistory AS
+SELECT {EVENT_COLUMNS}, 'hot' AS tier FROM equipment_event
+UNION ALL
+SELECT {EVENT_COLUMNS}, 'archive' AS tier FROM equipment_archivedevent
+"""
+
+DROP_EVENT_HISTORY_VIEW = "DROP VIEW IF EXISTS equipment_eventhistory"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0010_equipment_active_manager'),
+    ]
+
+    # SQLite rebuilds the event tables on AlterField, which fails while the view references them.
+    operations = [
+        migrations.RunSQL(DROP_EVENT_HISTORY_VIEW, CREATE_EVENT_HISTORY_VIEW),
+        migrations.AlterField(
+            model_name='archivedevent',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='equipment',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='laboratory',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='outboxcursor',
+            name='uuid',
+            field=models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.RunSQL(CREATE_EVENT_HISTORY_VIEW, DROP_EVENT_HISTORY_VIEW),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:17
+
+import django.db.models.deletion
+import projeto.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0011_basemodel_default_uuid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateAttachment',
+            fields=[
+                ('uuid', models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('filename', models.CharField(max_length=255, verbose_name='file name')),
+                ('content_type', models.CharField(max_length=100, verbose_name='content type')),
+                ('size', models.BigIntegerField(verbose_name='size')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('event', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='attachments', to='equipment.event', verbose_name='event')),
+            ],
+            options={
+                'verbose_name': 'Certificate attachment',
+                'verbose_name_plural': 'Certificate attachments',
+            },
+        ),
+    ]
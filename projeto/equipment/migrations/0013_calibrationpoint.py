@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:19
+
+import django.db.models.deletion
+import projeto.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0012_certificateattachment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalibrationPoint',
+            fields=[
+                ('uuid', models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('measured_at', models.DateTimeField(verbose_name='measured at')),
+                ('nominal', models.FloatField(verbose_name='nominal value')),
+                ('measured', models.FloatField(verbose_name='measured value')),
+                ('error', models.FloatField(verbose_name='error')),
+                ('uncertainty', models.FloatField(blank=True, null=True, verbose_name='uncertainty')),
+                ('tolerance', models.FloatField(blank=True, null=True, verbose_name='tolerance')),
+                ('event', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='calibration_points', to='equipment.event', verbose_name='event')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='calibration_points', to='equipment.equipment', verbose_name='item')),
+            ],
+            options={
+                'verbose_name': 'Calibration point',
+                'verbose_name_plural': 'Calibration points',
+                'indexes': [models.Index(fields=['item', 'measured_at'], name='calibrationpoint_item_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:20
+
+import django.db.models.deletion
+import projeto.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0013_calibrationpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntervalRecommendation',
+            fields=[
+                ('uuid', models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('current_periodicity', models.IntegerField(verbose_name='current periodicity')),
+                ('recommended_periodicity', models.IntegerField(verbose_name='recommended periodicity')),
+                ('calibrations', models.IntegerField(verbose_name='calibrations')),
+                ('failures', models.IntegerField(verbose_name='failures')),
+                ('corrective_maintenances', models.IntegerField(verbose_name='corrective maintenances')),
+                ('projected_tolerance_usage', models.FloatField(blank=True, null=True, verbose_name='projected tolerance usage')),
+                ('accepted_at', models.DateTimeField(blank=True, null=True, verbose_name='accepted at')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='interval_recommendations', to='equipment.equipment', verbose_name='item')),
+            ],
+            options={
+                'verbose_name': 'Interval recommendation',
+                'verbose_name_plural': 'Interval recommendations',
+            },
+        ),
+    ]
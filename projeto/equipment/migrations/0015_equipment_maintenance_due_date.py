@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:27
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_maintenance_due_date(apps, schema_editor):
+    """Latest returned preventive maintenance plus maintenance_periodicity, in one UPDATE."""
+    Equipment = apps.get_model('equipment', 'Equipment')
+    Event = apps.get_model('equipment', 'Event')
+    latest_preventive = models.Subquery(
+        Event.objects.filter(
+            item=models.OuterRef('pk'), kind='preventive_maintenance', returned_at__isnull=False
+        ).order_by('-returned_at').values('returned_at')[:1]
+    )
+    Equipment.objects.filter(maintenance_periodicity__gt=0).update(
+        maintenance_due_date=models.ExpressionWrapper(
+            latest_preventive
+            + models.ExpressionWrapper(
+                models.F('maintenance_periodicity') * timedelta(days=1), output_field=models.DurationField()
+            ),
+            output_field=models.DateTimeField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0014_intervalrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='maintenance_due_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='maintenance due date'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['maintenance_due_date'], name='equipment_active_maint_due_idx'),
+        ),
+        migrations.RunPython(backfill_maintenance_due_date, migrations.RunPython.noop),
+    ]
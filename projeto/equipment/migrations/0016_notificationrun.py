@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:29
+
+import projeto.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0015_equipment_maintenance_due_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationRun',
+            fields=[
+                ('uuid', models.UUIDField(default=projeto.core.models.default_uuid, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('channel', models.CharField(max_length=100, verbose_name='channel')),
+                ('ran_at', models.DateTimeField(verbose_name='ran at')),
+                ('equipment_count', models.PositiveIntegerField(default=0, verbose_name='equipment')),
+                ('messages_sent', models.PositiveIntegerField(default=0, verbose_name='messages sent')),
+            ],
+            options={
+                'verbose_name': 'Notification run',
+                'verbose_name_plural': 'Notification runs',
+                'indexes': [models.Index(fields=['channel', '-ran_at'], name='notificationrun_channel_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0017_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='last_audited_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='last audited at'),
+        ),
+    ]
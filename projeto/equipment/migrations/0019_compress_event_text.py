@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:04
+
+import projeto.core.fields
+from django.db import migrations, models
+
+EVENT_COLUMNS = (
+    "uuid, created_at, updated_at, item_id, kind, send_at, returned_at, price, "
+    "certificate_number, certificate_results, observation, requires_recalibration"
+)
+
+CREATE_EVENT_HISTORY_VIEW = f"""
+CREATE VIEW equipment_eventhistory AS
+SELECT {EVENT_COLUMNS}, 'hot' AS tier FROM equipment_event
+UNION ALL
+SELECT {EVENT_COLUMNS}, 'archive' AS tier FROM equipment_archivedevent
+"""
+
+DROP_EVENT_HISTORY_VIEW = "DROP VIEW IF EXISTS equipment_eventhistory"
+
+MODELS = ("event", "archivedevent")
+FIELDS = {"certificate_results": "calibration ranges and points", "observation": "observation"}
+BATCH_SIZE = 500
+
+
+def copy_fields(apps, source, target):
+    # updated_at is left alone: the texts do not change, only how they are stored.
+    for model_name in MODELS:
+        model = apps.get_model("equipment", model_name)
+        pks = list(model.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), BATCH_SIZE):
+            rows = model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).values_list(
+                "pk", *(source % field for field in FIELDS)
+            )
+            model.objects.bulk_update(
+                [model(pk=pk, **{target % field: value for field, value in zip(FIELDS, values)}) for pk, *values in rows],
+                [target % field for field in FIELDS],
+            )
+
+
+def compress(apps, schema_editor):
+    copy_fields(apps, "%s", "%s_compressed")
+
+
+def decompress(apps, schema_editor):
+    copy_fields(apps, "%s_compressed", "%s")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0018_equipment_last_audited_at'),
+    ]
+
+    # SQLite rebuilds the event tables when columns are added or dropped,
+    # which fails while the view references them. The texts are copied to
+    # new binary columns, compressed on the way, which then take the old
+    # columns' place.
+    operations = [
+        migrations.RunSQL(DROP_EVENT_HISTORY_VIEW, CREATE_EVENT_HISTORY_VIEW),
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name=f'{field}_compressed',
+                field=projeto.core.fields.CompressedTextField(default='', verbose_name=verbose_name),
+                preserve_default=False,
+            )
+            for model_name in MODELS
+            for field, verbose_name in FIELDS.items()
+        ],
+        migrations.RunPython(compress, decompress),
+        # Only gives the old columns a default to be re-added with when unapplied.
+        *[
+            migrations.AlterField(
+                model_name=model_name,
+                name=field,
+                field=models.TextField(default='', verbose_name=verbose_name),
+            )
+            for model_name in MODELS
+            for field, verbose_name in FIELDS.items()
+        ],
+        *[
+            migrations.RemoveField(model_name=model_name, name=field)
+            for model_name in MODELS
+            for field in FIELDS
+        ],
+        *[
+            migrations.RenameField(model_name=model_name, old_name=f'{field}_compressed', new_name=field)
+            for model_name in MODELS
+            for field in FIELDS
+        ],
+        migrations.RunSQL(CREATE_EVENT_HISTORY_VIEW, DROP_EVENT_HISTORY_VIEW),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0019_compress_event_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laboratory',
+            name='campus',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='campus'),
+        ),
+    ]
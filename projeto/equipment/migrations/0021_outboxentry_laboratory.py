@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:27
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_laboratories(apps, schema_editor):
+    Equipment = apps.get_model("equipment", "Equipment")
+    OutboxEntry = apps.get_model("equipment", "OutboxEntry")
+    laboratories = dict(Equipment.objects.values_list("pk", "laboratory_id"))
+    batch = []
+    for entry in OutboxEntry.objects.order_by("sequence").iterator(chunk_size=BATCH_SIZE):
+        # Event payloads carry their equipment as "item".
+        item = entry.object_uuid if entry.model == "equipment.equipment" else entry.payload.get("item")
+        if item is None:
+            continue
+        entry.laboratory_id = laboratories.get(uuid.UUID(str(item)))
+        batch.append(entry)
+        if len(batch) == BATCH_SIZE:
+            OutboxEntry.objects.bulk_update(batch, ["laboratory"])
+            batch = []
+    OutboxEntry.objects.bulk_update(batch, ["laboratory"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0020_laboratory_campus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxentry',
+            name='laboratory',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='equipment.laboratory', verbose_name='laboratory'),
+        ),
+        migrations.RunPython(fill_laboratories, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='outboxentry',
+            name='action',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('archived', 'Archived'), ('deleted', 'Deleted')], max_length=20, verbose_name='action'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxentry',
+            index=models.Index(fields=['laboratory', 'sequence'], name='outbox_laboratory_idx'),
+        ),
+    ]
@@ -1,8 +1,12 @@
+from projeto.core.fields import CompressedTextField
 from projeto.core.models import BaseModel
-from django.db import models
-from django.core.exceptions import PermissionDenied
+from projeto.core.sharding import database_for_campus, database_for_laboratory
+from django.db import models, router, transaction
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from collections import namedtuple
 from datetime import timedelta
 
 
@@ -62,12 +66,33 @@ class CalibrationStatus(models.TextChoices):
     EXPIRED = "expired", _("Expired")
     UP_TO_DATE = "up_to_date", _("Up to Date")
 
+class MaintenanceStatus(models.TextChoices):
+    NOT_SCHEDULED = "not_scheduled", _("Not Scheduled")
+    EXPIRES_IN_30_DAYS = "expires_in_30_days", _("Expires in 30 Days")
+    EXPIRES_IN_60_DAYS = "expires_in_60_days", _("Expires in 60 Days")
+    EXPIRED = "expired", _("Expired")
+    UP_TO_DATE = "up_to_date", _("Up to Date")
+
 class Laboratory(BaseModel):
     name = models.CharField(verbose_name=_("name"), max_length=100, unique=True)
+    # Selects the database of the laboratory's equipment and events (CAMPUS_DATABASES).
+    campus = models.CharField(verbose_name=_("campus"), max_length=50, blank=True, default='')
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        # Equipment is not migrated between campus databases.
+        if self._state.adding:
+            return
+        previous = database_for_laboratory(self.pk)
+        if previous != database_for_campus(self.campus) and (
+            Equipment.all_objects.using(previous).filter(laboratory=self.pk).exists()
+        ):
+            raise ValidationError(
+                {"campus": _("The laboratory has equipment: it cannot move to a campus with another database.")}
+            )
+
     class Meta:
         verbose_name = _("Laboratory")
         verbose_name_plural = _("Laboratories")
@@ -90,6 +115,36 @@ class Asset(BaseModel):
         verbose_name_plural = _("Items")
 
 
+class EquipmentQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(archived=False)
+
+    def with_status(self):
+        """
+        Annotates the latest event (the one get_status and
+        get_calibration_status look at) so the status properties do not
+        query per equipment, e.g. in the admin changelist.
+        """
+        latest = Event.objects.filter(item=models.OuterRef("pk")).order_by("-returned_at")
+        return self.annotate(**{
+            f"latest_event_{field}": models.Subquery(latest.values(field)[:1])
+            for field in LATEST_EVENT_FIELDS
+        })
+
+
+LATEST_EVENT_FIELDS = ("kind", "returned_at", "requires_recalibration")
+LatestEvent = namedtuple("LatestEvent", LATEST_EVENT_FIELDS)
+
+
+class ActiveEquipmentManager(models.Manager.from_queryset(EquipmentQuerySet)):
+    """
+    Default manager of Equipment: archived equipment is left out.
+    Use ``Equipment.all_objects`` when archived rows are needed.
+    """
+    def get_queryset(self):
+        return super().get_queryset().active()
+
+
 class Equipment(BaseModel):
     serial_number = models.CharField(verbose_name=_("serial number"), max_length=50)
     tag_number = models.CharField(verbose_name=_("tag number"), max_length=50)
@@ -111,10 +166,40 @@ class Equipment(BaseModel):
     )
     description = models.TextField(verbose_name=_("complementary description"), blank=True, default='')
     calibration_due_date = models.DateTimeField(verbose_name=_("calibration due date"), null=True, blank=True)
+    maintenance_due_date = models.DateTimeField(verbose_name=_("maintenance due date"), null=True, blank=True)
+    last_audited_at = models.DateTimeField(verbose_name=_("last audited at"), null=True, blank=True)
+
+    objects = ActiveEquipmentManager()
+    all_objects = EquipmentQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.serial_number} - {self.tag_number} {self.laboratory}"
 
+    def clean(self):
+        # Equipment is not migrated between campus databases.
+        database = self._state.db
+        if database and self.laboratory_id and database_for_laboratory(self.laboratory_id) != database:
+            raise ValidationError(
+                {"laboratory": _("Equipment cannot be moved to a laboratory of a campus with another database.")}
+            )
+
+    def save(self, *args, **kwargs):
+        # Keeps the outbox entry written by the post_save signal in the same transaction.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def get_latest_event(self):
+        """
+        Kind, returned_at and requires_recalibration of the latest event, or
+        None. Read from the with_status() annotations when present.
+        """
+        if hasattr(self, "latest_event_kind"):
+            if self.latest_event_kind is None:
+                return None
+            return LatestEvent(*(getattr(self, f"latest_event_{field}") for field in LATEST_EVENT_FIELDS))
+        return self.events.order_by('-returned_at').values_list(*LATEST_EVENT_FIELDS, named=True).first()
+
     def get_status(self):
         """
         Determine equipment status based on calibration and maintenance events.
@@ -123,7 +208,7 @@ class Equipment(BaseModel):
         if self.archived:
             return EquipmentStatus.UNAVAILABLE
         
-        latest_event = self.events.order_by('-returned_at').first()
+        latest_event = self.get_latest_event()
         
         if not latest_event:
             return EquipmentStatus.UNAVAILABLE
@@ -135,7 +220,7 @@ class Equipment(BaseModel):
             if latest_event.requires_recalibration:
                 return EquipmentStatus.UNAVAILABLE
 
-        if timezone.now() > self.calibration_due_date:
+        if not self.calibration_due_date or timezone.now() > self.calibration_due_date:
             return EquipmentStatus.UNAVAILABLE
         
         return EquipmentStatus.AVAILABLE
@@ -148,7 +233,7 @@ class Equipment(BaseModel):
         if not self.calibration_due_date:
             return CalibrationStatus.NOT_CALIBRATED
 
-        if event := self.events.order_by('-returned_at').first():
+        if event := self.get_latest_event():
             if event.kind != EventKind.CALIBRATION and event.requires_recalibration:
                 return CalibrationStatus.EXPIRED
 
@@ -163,6 +248,26 @@ class Equipment(BaseModel):
 
         return CalibrationStatus.UP_TO_DATE
 
+    def get_maintenance_status(self):
+        """
+        Determine preventive maintenance status from maintenance_due_date alone,
+        which is kept up to date by the Event signals.
+        """
+        if not self.maintenance_due_date:
+            return MaintenanceStatus.NOT_SCHEDULED
+
+        now = timezone.now()
+        if self.maintenance_due_date < now:
+            return MaintenanceStatus.EXPIRED
+
+        if self.maintenance_due_date - timedelta(days=30) < now:
+            return MaintenanceStatus.EXPIRES_IN_30_DAYS
+
+        if self.maintenance_due_date - timedelta(days=60) < now:
+            return MaintenanceStatus.EXPIRES_IN_60_DAYS
+
+        return MaintenanceStatus.UP_TO_DATE
+
     @property
     def full_description(self):
         """
@@ -195,18 +300,49 @@ class Equipment(BaseModel):
         """Property to get the human-readable calibration status"""
         return dict(CalibrationStatus.choices)[self.get_calibration_status()]
 
+    @property
+    def maintenance_status(self):
+        """Property to get the current preventive maintenance status"""
+        return self.get_maintenance_status()
+
+    @property
+    def maintenance_status_display(self):
+        """Property to get the human-readable preventive maintenance status"""
+        return dict(MaintenanceStatus.choices)[self.get_maintenance_status()]
+
     class Meta:
         verbose_name = _("Equipment")
         verbose_name_plural = _("Equipments")
-
-
-class Event(BaseModel):
-    item = models.ForeignKey(
-        Equipment, 
-        verbose_name=_("item"), 
-        on_delete=models.PROTECT,
-        related_name='events'
-    )
+        indexes = [
+            models.Index(
+                fields=["calibration_due_date"],
+                condition=models.Q(archived=False),
+                name="equipment_active_due_idx",
+            ),
+            models.Index(
+                fields=["laboratory", "calibration_due_date"],
+                condition=models.Q(archived=False),
+                name="equipment_active_lab_due_idx",
+            ),
+            models.Index(
+                fields=["maintenance_due_date"],
+                condition=models.Q(archived=False),
+                name="equipment_active_maint_due_idx",
+            ),
+            # Watermark reads of the equipment snapshot.
+            models.Index(fields=["updated_at"], name="equipment_updated_idx"),
+        ]
+
+
+class EventTier(models.TextChoices):
+    HOT = "hot", _("Recent")
+    ARCHIVE = "archive", _("Archive")
+
+
+class EventRecord(BaseModel):
+    """
+    Fields shared by recent events and their archive tier.
+    """
     kind = models.CharField(
         verbose_name=_("type"), max_length=50, choices=EventKind.choices
     )
@@ -218,8 +354,9 @@ class Event(BaseModel):
     certificate_number = models.CharField(
         verbose_name=_("calibration certificate"), max_length=50
     )
-    certificate_results = models.TextField(verbose_name=_("calibration ranges and points"))
-    observation = models.TextField(verbose_name=_("observation"))
+    # Long free text, stored compressed; changelists defer both fields.
+    certificate_results = CompressedTextField(verbose_name=_("calibration ranges and points"))
+    observation = CompressedTextField(verbose_name=_("observation"))
     requires_recalibration = models.BooleanField(verbose_name=_("requires recalibration"), default=False)
 
     def delete(self, *args, **kwargs):
@@ -228,6 +365,251 @@ class Event(BaseModel):
     def __str__(self):
         return f"{self.item} {self.kind} {self.pk}"
 
+    class Meta:
+        abstract = True
+
+
+class Event(EventRecord):
+    item = models.ForeignKey(
+        Equipment, 
+        verbose_name=_("item"), 
+        on_delete=models.PROTECT,
+        related_name='events'
+    )
+
+    def save(self, *args, **kwargs):
+        # Event, the calibration_due_date update and their outbox entries commit together.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _("Event")
         verbose_name_plural = _("Events")
+        indexes = [models.Index(fields=["updated_at"], name="event_updated_idx")]
+
+
+class ArchivedEvent(EventRecord):
+    """
+    Cold tier of Event. Rows are moved here by `manage.py archive_events`
+    and keep their original uuid, timestamps and values.
+    """
+    item = models.ForeignKey(
+        Equipment,
+        verbose_name=_("item"),
+        on_delete=models.PROTECT,
+        related_name='archived_events'
+    )
+    archived_at = models.DateTimeField(verbose_name=_("archived at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Archived event")
+        verbose_name_plural = _("Archived events")
+
+
+class EventHistory(EventRecord):
+    """
+    Read-only view over both event tiers (``UNION ALL`` of Event and ArchivedEvent),
+    used by audit screens that need the complete history of an equipment.
+    """
+    item = models.ForeignKey(
+        Equipment,
+        verbose_name=_("item"),
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='history'
+    )
+    tier = models.CharField(verbose_name=_("tier"), max_length=10, choices=EventTier.choices)
+
+    class Meta:
+        managed = False
+        db_table = "equipment_eventhistory"
+        verbose_name = _("Event history")
+        verbose_name_plural = _("Event history")
+
+
+# Certificates are always downloaded, never rendered; other types are refused on upload.
+CERTIFICATE_CONTENT_TYPES = ("application/pdf", "application/octet-stream")
+
+
+class CertificateAttachment(BaseModel):
+    """
+    Certificate file (usually the vendor PDF) attached to an event.
+    The bytes live in the content-addressed store under ``sha256``, so
+    identical uploads share a single file on disk.
+    """
+    # No database constraint: the event may be moved to the archive tier.
+    event = models.ForeignKey(
+        Event,
+        verbose_name=_("event"),
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='attachments'
+    )
+    filename = models.CharField(verbose_name=_("file name"), max_length=255)
+    content_type = models.CharField(verbose_name=_("content type"), max_length=100)
+    size = models.BigIntegerField(verbose_name=_("size"))
+    sha256 = models.CharField(verbose_name=_("SHA-256"), max_length=64, db_index=True)
+
+    def __str__(self):
+        return self.filename
+
+    class Meta:
+        verbose_name = _("Certificate attachment")
+        verbose_name_plural = _("Certificate attachments")
+
+
+class CalibrationPoint(BaseModel):
+    """
+    One point of a calibration certificate, parsed from ``certificate_results``.
+    ``item`` and ``measured_at`` are copied from the event so drift analysis
+    reads this table alone.
+    """
+    # No database constraint: the event may be moved to the archive tier.
+    event = models.ForeignKey(
+        Event,
+        verbose_name=_("event"),
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='calibration_points'
+    )
+    item = models.ForeignKey(
+        Equipment,
+        verbose_name=_("item"),
+        on_delete=models.PROTECT,
+        related_name='calibration_points'
+    )
+    measured_at = models.DateTimeField(verbose_name=_("measured at"))
+    nominal = models.FloatField(verbose_name=_("nominal value"))
+    measured = models.FloatField(verbose_name=_("measured value"))
+    error = models.FloatField(verbose_name=_("error"))
+    uncertainty = models.FloatField(verbose_name=_("uncertainty"), null=True, blank=True)
+    tolerance = models.FloatField(verbose_name=_("tolerance"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.nominal} -> {self.measured}"
+
+    class Meta:
+        verbose_name = _("Calibration point")
+        verbose_name_plural = _("Calibration points")
+        indexes = [
+            models.Index(fields=["item", "measured_at"], name="calibrationpoint_item_idx"),
+        ]
+
+
+class IntervalRecommendation(BaseModel):
+    """
+    Calibration interval suggested by `manage.py recommend_intervals` from
+    the equipment history. Pending until accepted in the admin.
+    """
+    item = models.ForeignKey(
+        Equipment,
+        verbose_name=_("item"),
+        on_delete=models.PROTECT,
+        related_name='interval_recommendations'
+    )
+    current_periodicity = models.IntegerField(verbose_name=_("current periodicity"))
+    recommended_periodicity = models.IntegerField(verbose_name=_("recommended periodicity"))
+    calibrations = models.IntegerField(verbose_name=_("calibrations"))
+    failures = models.IntegerField(verbose_name=_("failures"))
+    corrective_maintenances = models.IntegerField(verbose_name=_("corrective maintenances"))
+    projected_tolerance_usage = models.FloatField(
+        verbose_name=_("projected tolerance usage"), null=True, blank=True
+    )
+    accepted_at = models.DateTimeField(verbose_name=_("accepted at"), null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.item}: {self.current_periodicity} -> {self.recommended_periodicity}"
+
+    class Meta:
+        verbose_name = _("Interval recommendation")
+        verbose_name_plural = _("Interval recommendations")
+
+
+class OutboxAction(models.TextChoices):
+    CREATED = "created", _("Created")
+    UPDATED = "updated", _("Updated")
+    ARCHIVED = "archived", _("Archived")
+    DELETED = "deleted", _("Deleted")
+
+
+class OutboxEntry(models.Model):
+    """
+    Append-only change feed of Equipment and Event writes.
+    Entries are written in the same transaction as the change they describe
+    and are ordered by ``sequence``, which consumers use as their cursor.
+
+    ``sequence`` is assigned on insert, not on commit. SQLite serializes
+    writers, so entries become visible in sequence order; on databases with
+    concurrent writers (e.g. PostgreSQL) a later sequence can commit first,
+    and readers stay OUTBOX_READ_LAG_SECONDS behind so they do not step
+    over entries of transactions still in flight.
+    """
+    sequence = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    model = models.CharField(verbose_name=_("model"), max_length=100)
+    object_uuid = models.UUIDField(verbose_name=_("object"), db_index=True)
+    # Laboratory of the equipment the entry is about, for scoped readers.
+    laboratory = models.ForeignKey(
+        Laboratory,
+        verbose_name=_("laboratory"),
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    action = models.CharField(verbose_name=_("action"), max_length=20, choices=OutboxAction.choices)
+    changed_fields = models.JSONField(verbose_name=_("changed fields"), default=list, blank=True)
+    payload = models.JSONField(verbose_name=_("payload"), encoder=DjangoJSONEncoder)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise PermissionDenied(_("Outbox entries are append-only."))
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise PermissionDenied(_("You don't have permission to delete this object."))
+
+    def __str__(self):
+        return f"#{self.sequence} {self.model} {self.action} {self.object_uuid}"
+
+    class Meta:
+        verbose_name = _("Outbox entry")
+        verbose_name_plural = _("Outbox entries")
+        ordering = ("sequence",)
+        indexes = [models.Index(fields=["laboratory", "sequence"], name="outbox_laboratory_idx")]
+
+
+class OutboxCursor(BaseModel):
+    """
+    Last outbox sequence acknowledged by a named consumer.
+    """
+    consumer = models.CharField(verbose_name=_("consumer"), max_length=100, unique=True)
+    position = models.BigIntegerField(verbose_name=_("position"), default=0)
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
+
+    class Meta:
+        verbose_name = _("Outbox cursor")
+        verbose_name_plural = _("Outbox cursors")
+
+
+class NotificationRun(BaseModel):
+    """
+    One execution of a scheduled notification command. The next run only
+    reports what changed since the latest run of the same channel.
+    """
+    channel = models.CharField(verbose_name=_("channel"), max_length=100)
+    ran_at = models.DateTimeField(verbose_name=_("ran at"))
+    equipment_count = models.PositiveIntegerField(verbose_name=_("equipment"), default=0)
+    messages_sent = models.PositiveIntegerField(verbose_name=_("messages sent"), default=0)
+
+    def __str__(self):
+        return f"{self.channel} @ {self.ran_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = _("Notification run")
+        verbose_name_plural = _("Notification runs")
+        indexes = [models.Index(fields=["channel", "-ran_at"], name="notificationrun_channel_idx")]
@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, CharField, Q, Value, When
+from django.template.loader import render_to_string
+from django.utils import timezone, translation
+
+from projeto.core.sharding import across_databases
+
+from .models import CalibrationStatus, Equipment, NotificationRun
+
+CALIBRATION_DIGEST_CHANNEL = "calibration_digest"
+
+# Days before the due date at which equipment enters each bucket.
+DUE_THRESHOLDS = (
+    (CalibrationStatus.EXPIRES_IN_60_DAYS, 60),
+    (CalibrationStatus.EXPIRES_IN_30_DAYS, 30),
+    (CalibrationStatus.EXPIRED, 0),
+)
+
+
+def last_run_at(channel):
+    return (
+        NotificationRun.objects.filter(channel=channel)
+        .order_by("-ran_at")
+        .values_list("ran_at", flat=True)
+        .first()
+    )
+
+
+def crossing_equipment(since, until):
+    """
+    Active equipment whose calibration entered a bucket in ``(since, until]``:
+    its due date minus the bucket threshold falls in the window. One query,
+    a union of due date ranges answered by the partial due date index.
+    Each equipment is annotated with the most urgent bucket it entered.
+    Read from every campus database.
+    """
+    ranges = [
+        (bucket, (since + timedelta(days=days), until + timedelta(days=days)))
+        for bucket, days in DUE_THRESHOLDS
+    ]
+    crossing = Q()
+    for _, (start, end) in ranges:
+        crossing |= Q(calibration_due_date__gt=start, calibration_due_date__lte=end)
+
+    return across_databases(
+        Equipment.objects.filter(crossing)
+        .annotate(
+            bucket=Case(
+                *[
+                    When(calibration_due_date__gt=start, calibration_due_date__lte=end, then=Value(bucket))
+                    for bucket, (start, end) in reversed(ranges)
+                ],
+                output_field=CharField(),
+            )
+        )
+        .select_related("laboratory", "asset")
+        .order_by("laboratory__name", "calibration_due_date")
+    )
+
+
+def build_digests(equipment, from_email=None):
+    """
+    One EmailMessage per active user with an e-mail address in each
+    laboratory that has equipment in ``equipment``.
+    """
+    by_laboratory = {}
+    for item in equipment:
+        buckets = by_laboratory.setdefault(item.laboratory, {bucket: [] for bucket, _ in DUE_THRESHOLDS})
+        buckets[item.bucket].append(item)
+    if not by_laboratory:
+        return []
+
+    recipients = {}
+    users = (
+        get_user_model()
+        .objects.filter(is_active=True, laboratory__in=by_laboratory)
+        .exclude(email="")
+        .values_list("laboratory_id", "email")
+    )
+    for laboratory_id, email in users:
+        recipients.setdefault(laboratory_id, []).append(email)
+
+    labels = dict(CalibrationStatus.choices)
+    messages = []
+    for laboratory, buckets in by_laboratory.items():
+        sections = [(labels[bucket], items) for bucket, items in buckets.items() if items]
+        with translation.override(settings.LANGUAGE_CODE):
+            body = render_to_string(
+                "equipment/calibration_digest.txt", {"laboratory": laboratory, "sections": sections}
+            )
+        subject = f"Calibrações a vencer — {laboratory.name}"
+        messages.extend(
+            EmailMessage(subject, body, from_email, [email]) for email in recipients.get(laboratory.pk, [])
+        )
+    return messages
+
+
+def send_calibration_digests(now=None, since=None, dry_run=False):
+    """
+    Sends one digest per laboratory user with the equipment that entered
+    the 60-day, 30-day or expired calibration buckets since the last run
+    (or since ``since``, or the last day on the first run), reusing a single
+    mail connection for the whole batch, and records the run.
+    Returns ``(equipment, messages)``.
+    """
+    now = now or timezone.now()
+    since = since or last_run_at(CALIBRATION_DIGEST_CHANNEL) or now - timedelta(days=1)
+
+    equipment = list(crossing_equipment(since, now))
+    messages = build_digests(equipment, settings.DEFAULT_FROM_EMAIL)
+    if dry_run:
+        return equipment, messages
+
+    # The run is only recorded once the batch went out, so a failed
+    # delivery is retried over the same window next time.
+    if messages:
+        get_connection().send_messages(messages)
+    NotificationRun.objects.create(
+        channel=CALIBRATION_DIGEST_CHANNEL,
+        ran_at=now,
+        equipment_count=len(equipment),
+        messages_sent=len(messages),
+    )
+    return equipment, messages
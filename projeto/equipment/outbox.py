@@ -0,0 +1,146 @@
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from projeto.core.sharding import atomic
+
+from .models import Equipment, OutboxAction, OutboxCursor, OutboxEntry
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_instance(instance):
+    """
+    Returns a JSON-friendly dict with the instance fields, keyed by field name.
+    """
+    data = serializers.serialize("python", [instance])[0]
+    return {"uuid": data["pk"], **data["fields"]}
+
+
+def laboratory_of(instance):
+    """Laboratory id of an equipment, or of the equipment of an (archived) event."""
+    if isinstance(instance, Equipment):
+        return instance.laboratory_id
+    return instance.item.laboratory_id
+
+
+def record_change(instance, created=False, update_fields=None, using=None, action=None):
+    """
+    Appends one outbox entry describing a saved (or deleted) instance.
+    Must be called inside the transaction that changed the instance.
+    """
+    return OutboxEntry.objects.using(using).create(
+        model=instance._meta.label_lower,
+        object_uuid=instance.pk,
+        laboratory_id=laboratory_of(instance),
+        action=action or (OutboxAction.CREATED if created else OutboxAction.UPDATED),
+        # updated_at changes with every save, it is not part of the change.
+        changed_fields=sorted(set(update_fields or []) - {"updated_at"}),
+        payload=serialize_instance(instance),
+    )
+
+
+def record_bulk_changes(queryset, action=OutboxAction.UPDATED, changed_fields=None):
+    """
+    Appends one outbox entry per row of ``queryset`` with a single insert.
+    Used by set-based writes (``update``/``bulk_create``/``delete``) that bypass signals.
+    """
+    if queryset.model is not Equipment:
+        queryset = queryset.select_related("item")
+    entries = [
+        OutboxEntry(
+            model=instance._meta.label_lower,
+            object_uuid=instance.pk,
+            laboratory_id=laboratory_of(instance),
+            action=action,
+            changed_fields=sorted(changed_fields or []),
+            payload=serialize_instance(instance),
+        )
+        for instance in queryset
+    ]
+    return OutboxEntry.objects.using(queryset.db).bulk_create(entries)
+
+
+def fetch_entries(after=0, limit=500, scope=None):
+    """
+    Returns up to ``limit`` entries with a sequence greater than ``after``,
+    restricted to ``scope`` (a LaboratoryScope) when given. Entries younger
+    than OUTBOX_READ_LAG_SECONDS are left for the next read.
+    """
+    queryset = OutboxEntry.objects.filter(sequence__gt=after)
+    if scope is not None:
+        queryset = scope.filter(queryset)
+    if lag := settings.OUTBOX_READ_LAG_SECONDS:
+        queryset = queryset.filter(created_at__lte=timezone.now() - timedelta(seconds=lag))
+    return list(queryset.order_by("sequence")[:limit])
+
+
+def entry_as_dict(entry):
+    return {
+        "sequence": entry.sequence,
+        "created_at": entry.created_at,
+        "model": entry.model,
+        "object_uuid": entry.object_uuid,
+        "action": entry.action,
+        "changed_fields": entry.changed_fields,
+        "payload": entry.payload,
+    }
+
+
+class DeliveryError(Exception):
+    pass
+
+
+def post_batch(url, entries, timeout=10):
+    body = json.dumps(
+        {"entries": [entry_as_dict(entry) for entry in entries]}, cls=DjangoJSONEncoder
+    ).encode()
+    request = urllib.request.Request(
+        url, data=body, method="POST", headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if not 200 <= response.status < 300:
+                raise DeliveryError(f"Webhook answered {response.status}")
+    except (urllib.error.URLError, TimeoutError) as exc:
+        raise DeliveryError(str(exc)) from exc
+
+
+def deliver_pending(consumer, url, batch_size=100, max_retries=5, backoff=1.0):
+    """
+    Delivers every entry after the consumer cursor to ``url`` in batches.
+    The cursor only advances after a batch is acknowledged, so delivery is
+    at-least-once and receivers should deduplicate by ``sequence``.
+    Returns the number of delivered entries.
+    """
+    cursor, _ = OutboxCursor.objects.get_or_create(consumer=consumer)
+    delivered = 0
+
+    while entries := fetch_entries(after=cursor.position, limit=batch_size):
+        for attempt in range(max_retries + 1):
+            try:
+                post_batch(url, entries)
+                break
+            except DeliveryError as exc:
+                if attempt == max_retries:
+                    raise
+                delay = backoff * 2 ** attempt
+                logger.warning(
+                    "Outbox delivery to %s failed (%s), retrying in %.1fs", url, exc, delay
+                )
+                time.sleep(delay)
+
+        with atomic():
+            cursor.position = entries[-1].sequence
+            cursor.save(update_fields=["position", "updated_at"])
+        delivered += len(entries)
+
+    return delivered
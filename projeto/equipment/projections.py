@@ -0,0 +1,195 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date
+from itertools import chain
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+
+from projeto.core.sharding import current_database, fan_out, fans_out
+
+from .models import Equipment, Event, EventKind
+
+CACHE_TIMEOUT = 24 * 60 * 60
+DAYS_PER_MONTH = 30.4375
+
+
+@dataclass(frozen=True)
+class ProjectionRow:
+    laboratory: str
+    category: str
+    kind: str
+    week: date
+    count: int
+    expected_cost: float
+
+
+def to_days(values):
+    """Aware datetimes (or None) to a datetime64[D] array of local dates."""
+    return np.array(
+        [timezone.localdate(value) if value else None for value in values], dtype="datetime64[D]"
+    )
+
+
+def expand_occurrences(first, period, start, end):
+    """
+    Every ``first + k * period`` that falls in ``[start, end]``, for all
+    schedules at once. Overdue schedules start at ``start``. Schedules
+    without a first date or with a non-positive period are skipped.
+    Returns ``(schedule_index, dates)``.
+    """
+    valid = ~np.isnat(first) & (period > 0)
+    first = np.where(first < start, start, first)
+    span = (end - first).astype(np.int64)
+    counts = np.where(valid & (span >= 0), span // np.where(period > 0, period, 1) + 1, 0)
+
+    schedule = np.repeat(np.arange(len(first)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    dates = first[schedule] + (offsets * period[schedule]).astype("timedelta64[D]")
+    return schedule, dates
+
+
+def week_start(dates):
+    """Monday of the ISO week of each date (1970-01-01 was a Thursday)."""
+    days = dates.astype(np.int64)
+    return (days - (days + 3) % 7).astype("datetime64[D]")
+
+
+def expected_prices():
+    """
+    Mean historical price per (equipment, kind) and per (category, kind),
+    the latter used for equipment without priced history.
+    """
+    priced = Event.objects.filter(price__isnull=False)
+    by_item = {
+        (row["item_id"], row["kind"]): float(row["average"])
+        for row in priced.values("item_id", "kind").annotate(average=Avg("price"))
+    }
+    by_category = {
+        (row["item__asset__category"], row["kind"]): float(row["average"])
+        for row in priced.values("item__asset__category", "kind").annotate(average=Avg("price"))
+    }
+    return by_item, by_category
+
+
+def compute_projection(months=12, laboratory_id=None, today=None):
+    """
+    Projects every recurring calibration and preventive maintenance of the
+    active inventory over the next ``months``, aggregated per laboratory,
+    asset category, kind and week, with the expected cost.
+    """
+    start = np.datetime64(today or timezone.localdate(), "D")
+    end = start + np.timedelta64(round(months * DAYS_PER_MONTH), "D")
+
+    equipment = Equipment.objects.all()
+    if laboratory_id:
+        equipment = equipment.filter(laboratory_id=laboratory_id)
+    rows = list(
+        equipment.values_list(
+            "uuid",
+            "laboratory__name",
+            "asset__category",
+            "calibration_due_date",
+            "calibration_periodicity",
+            "maintenance_due_date",
+            "maintenance_periodicity",
+            "bought_at",
+        )
+    )
+    if not rows:
+        return []
+    (
+        uuids,
+        laboratories,
+        categories,
+        calibration_due,
+        calibration_period,
+        maintenance_due,
+        maintenance_period,
+        bought_at,
+    ) = map(list, zip(*rows))
+
+    # Equipment never maintained is projected from its purchase date.
+    maintenance_period = np.array(maintenance_period, dtype=np.int64)
+    maintenance_due = to_days(maintenance_due)
+    maintenance_due = np.where(
+        np.isnat(maintenance_due),
+        to_days(bought_at) + maintenance_period.astype("timedelta64[D]"),
+        maintenance_due,
+    )
+
+    schedules = {
+        EventKind.CALIBRATION: (to_days(calibration_due), np.array(calibration_period, dtype=np.int64)),
+        EventKind.PREVENTIVE: (maintenance_due, maintenance_period),
+    }
+
+    price_by_item, price_by_category = expected_prices()
+    laboratory_names, laboratory_codes = np.unique(np.array(laboratories, dtype=object), return_inverse=True)
+    category_names, category_codes = np.unique(np.array(categories, dtype=object), return_inverse=True)
+
+    result = []
+    for kind, (first, period) in schedules.items():
+        schedule, dates = expand_occurrences(first, period, start, end)
+        if not len(schedule):
+            continue
+        price = np.array(
+            [
+                price_by_item.get((uuid, kind), price_by_category.get((category, kind), 0.0))
+                for uuid, category in zip(uuids, categories)
+            ]
+        )
+        groups = np.stack(
+            [laboratory_codes[schedule], category_codes[schedule], week_start(dates).astype(np.int64)], axis=1
+        )
+        unique_groups, inverse = np.unique(groups, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        counts = np.bincount(inverse)
+        costs = np.bincount(inverse, price[schedule])
+
+        result.extend(
+            ProjectionRow(
+                laboratory=laboratory_names[laboratory],
+                category=category_names[category],
+                kind=kind,
+                week=np.datetime64(int(week), "D").item(),
+                count=int(count),
+                expected_cost=round(float(cost), 2),
+            )
+            for (laboratory, category, week), count, cost in zip(unique_groups, counts, costs)
+        )
+    return sorted(result, key=lambda row: (row.week, row.laboratory, row.category, row.kind))
+
+
+def inputs_fingerprint(laboratory_id=None):
+    """
+    Changes whenever equipment, events, assets or laboratories are added or
+    updated, so cached projections are invalidated without explicit signals.
+    """
+    equipment = Equipment.all_objects.aggregate(
+        count=Count("pk"),
+        updated=Max("updated_at"),
+        asset_updated=Max("asset__updated_at"),
+        laboratory_updated=Max("laboratory__updated_at"),
+    )
+    events = Event.objects.aggregate(count=Count("pk"), updated=Max("updated_at"))
+    raw = f"{equipment}|{events}|{laboratory_id}|{current_database()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def merge_projections(projections):
+    """Rows of projections computed in several databases, in compute_projection's order."""
+    rows = chain.from_iterable(projections)
+    return sorted(rows, key=lambda row: (row.week, row.laboratory, row.category, row.kind))
+
+
+def get_projection(months=12, laboratory_id=None):
+    """
+    Cached compute_projection, recomputed when its inputs change or the day turns.
+    Across laboratories with campus databases, merges the projection of each.
+    """
+    if laboratory_id is None and fans_out():
+        return merge_projections(fan_out(get_projection, months))
+    key = f"equipment:projection:{months}:{timezone.localdate()}:{inputs_fingerprint(laboratory_id)}"
+    return cache.get_or_set(key, lambda: compute_projection(months, laboratory_id), CACHE_TIMEOUT)
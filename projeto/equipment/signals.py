@@ -1,16 +1,39 @@
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from datetime import timedelta
-from .models import Event, EventKind
+from projeto.core import sharding
+from .calibration import sync_calibration_points
+from .due_dates import recalibration_requests
+from .models import Asset, Equipment, Event, EventKind, Laboratory, OutboxAction
+from .outbox import record_change
+
+
+@receiver(post_save, sender=Equipment)
+@receiver(post_save, sender=Event)
+def record_outbox_entry(sender, instance, created, update_fields=None, using=None, **kwargs):
+    record_change(instance, created=created, update_fields=update_fields, using=using)
+
+
+# Events cannot be deleted: they only leave the hot table when archived,
+# which records its own entries.
+@receiver(post_delete, sender=Equipment)
+def record_outbox_deletion(sender, instance, using=None, **kwargs):
+    record_change(instance, using=using, action=OutboxAction.DELETED)
+
 
 @receiver(post_save, sender=Event)
 def update_expiration_date(sender, instance, created, **kwargs):
+    # Compared by event dates, like recompute_calibration_due_dates, so
+    # backdated events do not override later ones.
     if instance.kind != EventKind.CALIBRATION:
-        if instance.requires_recalibration:
+        if instance.requires_recalibration and not instance.item.events.filter(
+            kind=EventKind.CALIBRATION, returned_at__gte=instance.send_at
+        ).exists():
             equipment = instance.item
             equipment.calibration_due_date = timezone.now()
-            equipment.save(update_fields=['calibration_due_date'])
+            equipment.save(update_fields=['calibration_due_date', 'updated_at'])
 
         return
 
@@ -18,8 +41,55 @@ def update_expiration_date(sender, instance, created, **kwargs):
         return
 
     equipment = instance.item
+    later_calibration = equipment.events.filter(kind=EventKind.CALIBRATION, returned_at__gt=instance.returned_at)
+    if later_calibration.exists() or recalibration_requests().filter(
+        item=equipment, send_at__gt=instance.returned_at
+    ).exists():
+        return
+
     new_calibration_due_date = instance.returned_at + timedelta(days=equipment.calibration_periodicity)
 
     if equipment.calibration_due_date != new_calibration_due_date:
         equipment.calibration_due_date = new_calibration_due_date
-        equipment.save(update_fields=['calibration_due_date'])
+        equipment.save(update_fields=['calibration_due_date', 'updated_at'])
+
+
+@receiver(post_save, sender=Event)
+def update_maintenance_due_date(sender, instance, created, **kwargs):
+    if instance.kind != EventKind.PREVENTIVE or instance.returned_at is None:
+        return
+
+    # Like recompute_maintenance_due_dates: the latest returned preventive event wins.
+    equipment = instance.item
+    if equipment.events.filter(kind=EventKind.PREVENTIVE, returned_at__gt=instance.returned_at).exists():
+        return
+
+    new_maintenance_due_date = None
+    if equipment.maintenance_periodicity > 0:
+        new_maintenance_due_date = instance.returned_at + timedelta(days=equipment.maintenance_periodicity)
+
+    if equipment.maintenance_due_date != new_maintenance_due_date:
+        equipment.maintenance_due_date = new_maintenance_due_date
+        equipment.save(update_fields=['maintenance_due_date', 'updated_at'])
+
+
+@receiver(post_save, sender=Event)
+def update_calibration_points(sender, instance, update_fields=None, using=None, **kwargs):
+    if update_fields and not {'certificate_results', 'returned_at', 'send_at'} & set(update_fields):
+        return
+    with sharding.using_database(using):
+        sync_calibration_points([instance])
+
+
+@receiver(post_save, sender=Laboratory)
+@receiver(post_save, sender=Asset)
+def mirror_to_campus_databases(sender, instance, raw=False, using=None, **kwargs):
+    if not raw and using == DEFAULT_DB_ALIAS:
+        sharding.mirror(instance)
+
+
+@receiver(post_delete, sender=Laboratory)
+@receiver(post_delete, sender=Asset)
+def unmirror_from_campus_databases(sender, instance, using=None, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        sharding.unmirror(instance)
@@ -0,0 +1,287 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from projeto.core.sharding import current_database
+
+from .models import LATEST_EVENT_FIELDS, Equipment, Event, EventKind, Laboratory
+
+# Rows changed up to this long before the previous refresh are read again,
+# covering transactions that committed late and clock skew between workers.
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+COLUMNS = (
+    "uuid",
+    "serial_number",
+    "tag_number",
+    "inventory_number",
+    "laboratory_id",
+    "archived",
+    "calibration_due_date",
+    "maintenance_due_date",
+) + tuple(f"latest_event_{field}" for field in LATEST_EVENT_FIELDS)
+
+KINDS = list(EventKind.values)
+NAT = np.datetime64("NaT", "us")
+
+
+def to_datetime64(value):
+    if value is None:
+        return NAT
+    return np.datetime64(value.astimezone(dt_timezone.utc).replace(tzinfo=None), "us")
+
+
+def from_datetime64(value):
+    if np.isnat(value):
+        return None
+    return value.astype(datetime).replace(tzinfo=dt_timezone.utc)
+
+
+class EquipmentSnapshot:
+    """
+    Compact in-process copy of the active equipment for scan lookups and
+    kiosk displays. Each field is a numpy column (identifiers use numpy's
+    variable-width strings, dates datetime64) and ``index`` maps the uuid,
+    serial, tag and inventory numbers to a row, so a lookup is a dict hit
+    plus a few array reads. An identifier shared by several equipment
+    resolves to the first one loaded; the uuid is always exact.
+
+    Statuses are computed when read, with the model's own get_status and
+    get_calibration_status, so they follow the clock between refreshes.
+    ``refresh`` only reloads equipment whose row or events changed since
+    the last watermark (``updated_at``), and falls back to a full reload
+    when equipment disappeared (deleted rows leave no watermark).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watermark = None
+        self.refreshed_at = None
+        self.laboratory_codes = {}
+        self.laboratories = []
+        self.clear(capacity=0)
+
+    def clear(self, capacity):
+        self.uuids = np.zeros(capacity, dtype="V16")
+        self.serial_numbers = np.empty(capacity, dtype=np.dtypes.StringDType())
+        self.tag_numbers = np.empty(capacity, dtype=np.dtypes.StringDType())
+        self.inventory_numbers = np.empty(capacity, dtype=np.dtypes.StringDType())
+        self.laboratory = np.full(capacity, -1, dtype=np.int32)
+        self.calibration_due = np.full(capacity, NAT)
+        self.maintenance_due = np.full(capacity, NAT)
+        self.event_kind = np.full(capacity, -1, dtype=np.int8)
+        self.event_returned = np.full(capacity, NAT)
+        self.event_requires_recalibration = np.zeros(capacity, dtype=bool)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.index = {}
+        self.free = []
+        self.size = 0
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    @property
+    def nbytes(self):
+        """Memory held by the columns; strings over 15 bytes and the index come on top."""
+        return sum(
+            column.nbytes for column in (
+                self.uuids, self.serial_numbers, self.tag_numbers, self.inventory_numbers, self.laboratory,
+                self.calibration_due, self.maintenance_due, self.event_kind, self.event_returned,
+                self.event_requires_recalibration, self.live,
+            )
+        )
+
+    # Loading
+
+    def reload(self, now=None):
+        """Replaces the snapshot with every active equipment."""
+        started = now or timezone.now()
+        rows = list(Equipment.objects.with_status().values_list(*COLUMNS).iterator(chunk_size=2000))
+        laboratories = list(Laboratory.objects.all())
+        with self.lock:
+            self.load_laboratories(laboratories)
+            self.clear(capacity=len(rows))
+            for row in rows:
+                self.upsert(row)
+            self.watermark = started
+            self.refreshed_at = time.monotonic()
+
+    def refresh(self, now=None):
+        """Applies the equipment, event and laboratory changes since the last watermark."""
+        if self.watermark is None:
+            return self.reload(now)
+
+        started = now or timezone.now()
+        since = self.watermark - WATERMARK_OVERLAP
+        changed = set(Equipment.all_objects.filter(updated_at__gte=since).values_list("pk", flat=True))
+        changed |= set(Event.objects.filter(updated_at__gte=since).values_list("item_id", flat=True))
+        rows = []
+        if changed:
+            rows = list(Equipment.all_objects.filter(pk__in=changed).with_status().values_list(*COLUMNS))
+        laboratories = list(Laboratory.objects.filter(updated_at__gte=since))
+
+        with self.lock:
+            self.load_laboratories(laboratories)
+            for row in rows:
+                self.upsert(row)
+            self.watermark = started
+            self.refreshed_at = time.monotonic()
+            size = len(self)
+        if Equipment.objects.count() != size:
+            self.reload(now)
+
+    def load_laboratories(self, laboratories):
+        for laboratory in laboratories:
+            if laboratory.pk not in self.laboratory_codes:
+                self.laboratory_codes[laboratory.pk] = len(self.laboratories)
+                self.laboratories.append(None)
+            self.laboratories[self.laboratory_codes[laboratory.pk]] = (laboratory.pk, laboratory.name)
+
+    def upsert(self, row):
+        values = dict(zip(COLUMNS, row))
+        pk = values["uuid"]
+        position = self.index.get(str(pk))
+        if position is not None:
+            self.remove(position)
+        if values["archived"]:
+            return
+
+        position = self.allocate()
+        self.uuids[position] = np.void(pk.bytes)
+        self.serial_numbers[position] = values["serial_number"]
+        self.tag_numbers[position] = values["tag_number"]
+        self.inventory_numbers[position] = values["inventory_number"]
+        self.laboratory[position] = self.laboratory_codes.get(values["laboratory_id"], -1)
+        self.calibration_due[position] = to_datetime64(values["calibration_due_date"])
+        self.maintenance_due[position] = to_datetime64(values["maintenance_due_date"])
+        kind = values["latest_event_kind"]
+        self.event_kind[position] = KINDS.index(kind) if kind in KINDS else -1
+        self.event_returned[position] = to_datetime64(values["latest_event_returned_at"])
+        self.event_requires_recalibration[position] = bool(values["latest_event_requires_recalibration"])
+        self.live[position] = True
+        for key in (str(pk), values["serial_number"], values["tag_number"], values["inventory_number"]):
+            # The uuid always wins; otherwise the first equipment to claim an identifier keeps it.
+            if key and (key not in self.index or key == str(pk)):
+                self.index[key] = position
+
+    def remove(self, position):
+        for key in self.keys(position):
+            if self.index.get(key) == position:
+                del self.index[key]
+        self.live[position] = False
+        self.free.append(position)
+
+    def allocate(self):
+        if self.free:
+            return self.free.pop()
+        if self.size == len(self.live):
+            self.grow(max(16, 2 * self.size))
+        self.size += 1
+        return self.size - 1
+
+    def grow(self, capacity):
+        extra = capacity - len(self.live)
+        for name, fill in (
+            ("uuids", None),
+            ("serial_numbers", None),
+            ("tag_numbers", None),
+            ("inventory_numbers", None),
+            ("laboratory", -1),
+            ("calibration_due", NAT),
+            ("maintenance_due", NAT),
+            ("event_kind", -1),
+            ("event_returned", NAT),
+            ("event_requires_recalibration", False),
+            ("live", False),
+        ):
+            column = getattr(self, name)
+            padding = np.zeros(extra, dtype=column.dtype) if fill is None else np.full(extra, fill, dtype=column.dtype)
+            setattr(self, name, np.concatenate([column, padding]))
+
+    def keys(self, position):
+        return (
+            str(uuid.UUID(bytes=self.uuids[position].tobytes())),
+            str(self.serial_numbers[position]),
+            str(self.tag_numbers[position]),
+            str(self.inventory_numbers[position]),
+        )
+
+    # Reading
+
+    def equipment(self, position):
+        """An unsaved Equipment carrying the row, as with_status() would load it."""
+        laboratory = self.laboratories[self.laboratory[position]] if self.laboratory[position] >= 0 else None
+        item = Equipment(
+            uuid=uuid.UUID(bytes=self.uuids[position].tobytes()),
+            serial_number=str(self.serial_numbers[position]),
+            tag_number=str(self.tag_numbers[position]),
+            inventory_number=str(self.inventory_numbers[position]),
+            laboratory_id=laboratory[0] if laboratory else None,
+            calibration_due_date=from_datetime64(self.calibration_due[position]),
+            maintenance_due_date=from_datetime64(self.maintenance_due[position]),
+        )
+        kind = self.event_kind[position]
+        item.latest_event_kind = KINDS[kind] if kind >= 0 else None
+        item.latest_event_returned_at = from_datetime64(self.event_returned[position])
+        item.latest_event_requires_recalibration = bool(self.event_requires_recalibration[position])
+        return item
+
+    def record(self, position):
+        item = self.equipment(position)
+        laboratory = self.laboratories[self.laboratory[position]] if self.laboratory[position] >= 0 else (None, "")
+        return {
+            "uuid": str(item.uuid),
+            "serial_number": item.serial_number,
+            "tag_number": item.tag_number,
+            "inventory_number": item.inventory_number,
+            "laboratory": {"uuid": str(laboratory[0]) if laboratory[0] else None, "name": laboratory[1]},
+            "status": item.get_status(),
+            "calibration_status": item.get_calibration_status(),
+            "calibration_due_date": item.calibration_due_date,
+            "maintenance_due_date": item.maintenance_due_date,
+        }
+
+    def lookup(self, code):
+        """The record of the equipment with this uuid, serial, tag or inventory number, or None."""
+        with self.lock:
+            position = self.index.get(code.strip())
+            if position is None:
+                try:
+                    position = self.index.get(str(uuid.UUID(code.strip())))
+                except ValueError:
+                    return None
+            return None if position is None else self.record(position)
+
+    def laboratory_records(self, laboratory_id):
+        """Records of one laboratory's equipment, soonest calibration due date first (unset last)."""
+        with self.lock:
+            code = self.laboratory_codes.get(laboratory_id)
+            if code is None:
+                return []
+            positions = np.flatnonzero(self.live & (self.laboratory == code))
+            # NaT sorts last in numpy.
+            positions = positions[np.argsort(self.calibration_due[positions], kind="stable")]
+            return [self.record(position) for position in positions]
+
+
+snapshot = EquipmentSnapshot()
+# Snapshots of the campus databases by alias (see projeto.core.sharding).
+campus_snapshots = {}
+
+
+def get_snapshot():
+    """
+    The process-wide snapshot of the database in context, refreshed when
+    older than EQUIPMENT_SNAPSHOT_REFRESH_SECONDS.
+    """
+    database = current_database() or DEFAULT_DB_ALIAS
+    current = snapshot if database == DEFAULT_DB_ALIAS else campus_snapshots.setdefault(database, EquipmentSnapshot())
+    refreshed_at = current.refreshed_at
+    if refreshed_at is None or time.monotonic() - refreshed_at >= settings.EQUIPMENT_SNAPSHOT_REFRESH_SECONDS:
+        current.refresh()
+    return current
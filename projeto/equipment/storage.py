@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class ContentAddressedStorage:
+    """
+    Stores files on local disk under their SHA-256 digest
+    (``<root>/ab/cd/abcd...``). Writes stream through a temporary file in the
+    same directory, so identical content is stored once and readers never see
+    a partial file.
+    """
+    def __init__(self, root=None):
+        self.root = Path(root or settings.CERTIFICATE_STORAGE_ROOT)
+
+    def path(self, digest):
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest):
+        return self.path(digest).exists()
+
+    def save(self, chunks, max_size=None):
+        """
+        Consumes an iterable of byte chunks and returns ``(digest, size)``.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise UploadTooLarge(f"Upload exceeds {max_size} bytes")
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+
+            digest = hasher.hexdigest()
+            target = self.path(digest)
+            if target.exists():
+                os.unlink(temp_path)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        return digest, size
+
+    def iter_range(self, digest, start, length, chunk_size=CHUNK_SIZE):
+        """
+        Yields ``length`` bytes starting at ``start`` in chunks.
+        """
+        with open(self.path(digest), "rb") as stored_file:
+            stored_file.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = stored_file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def read_stream(stream, chunk_size=CHUNK_SIZE):
+    """
+    Iterates a file-like object (an UploadedFile or the raw request) in chunks.
+    """
+    while chunk := stream.read(chunk_size):
+        yield chunk
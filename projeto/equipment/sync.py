@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.db.models import Case, DateTimeField, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from projeto.core.sharding import atomic
+
+from .models import Asset, Equipment, OutboxEntry
+from .outbox import record_bulk_changes
+
+# Rows changed up to this long before the client's watermark are sent
+# again: transactions that committed late are not missed, and re-applying
+# a row on the client is harmless.
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+EQUIPMENT_COLUMNS = (
+    "uuid",
+    "asset_id",
+    "serial_number",
+    "tag_number",
+    "inventory_number",
+    "calibration_due_date",
+    "maintenance_due_date",
+    "last_audited_at",
+    "updated_at",
+)
+ASSET_COLUMNS = ("uuid", "category", "kind", "brand", "model", "description", "updated_at")
+
+
+def table(queryset, columns):
+    """Columnar form: field names once, then one list of values per row."""
+    return {"columns": list(columns), "rows": [list(row) for row in queryset.values_list(*columns)]}
+
+
+def laboratory_assets(equipment):
+    return Asset.objects.filter(pk__in=equipment.values("asset_id")).order_by("pk")
+
+
+def export_snapshot(laboratory, now=None):
+    """
+    Every active equipment of ``laboratory`` and the assets they use, with
+    the watermark to pass to ``export_changes`` on the next sync.
+    """
+    watermark = now or timezone.now()
+    equipment = Equipment.objects.filter(laboratory=laboratory).order_by("pk")
+    return {
+        "laboratory": laboratory.pk,
+        "watermark": watermark,
+        "assets": table(laboratory_assets(equipment), ASSET_COLUMNS),
+        "equipment": table(equipment, EQUIPMENT_COLUMNS),
+    }
+
+
+def export_changes(laboratory, since, now=None):
+    """
+    Rows of ``laboratory`` changed since the ``since`` watermark, plus
+    tombstones: equipment archived or moved to another laboratory since
+    then. Only equipment that once belonged to ``laboratory`` (its outbox
+    has an entry for it, written when the row was created there) is sent.
+    """
+    watermark = now or timezone.now()
+    changed = Equipment.all_objects.filter(updated_at__gte=since - WATERMARK_OVERLAP)
+    equipment = changed.filter(laboratory=laboratory, archived=False).order_by("pk")
+    was_here = OutboxEntry.objects.filter(
+        model=Equipment._meta.label_lower, object_uuid=OuterRef("pk"), laboratory=laboratory
+    )
+    tombstones = changed.filter(
+        Q(archived=True, laboratory=laboratory) | (~Q(laboratory=laboratory) & Exists(was_here))
+    ).order_by("pk")
+    assets = laboratory_assets(Equipment.objects.filter(laboratory=laboratory)).filter(
+        updated_at__gte=since - WATERMARK_OVERLAP
+    )
+    return {
+        "laboratory": laboratory.pk,
+        "since": since,
+        "watermark": watermark,
+        "assets": table(assets, ASSET_COLUMNS),
+        "equipment": table(equipment, EQUIPMENT_COLUMNS),
+        "deleted": list(tombstones.values_list("pk", flat=True)),
+    }
+
+
+def apply_scans(laboratory, scans):
+    """
+    Records an uploaded batch of audit scans (``(uuid, scanned_at)`` pairs)
+    with one UPDATE of ``last_audited_at``. A scan only moves the date
+    forward, so re-uploading a batch changes nothing. Equipment of another
+    laboratory is left alone and reported as misplaced.
+    """
+    scanned = {}
+    for pk, scanned_at in scans:
+        scanned[pk] = max(scanned_at, scanned.get(pk, scanned_at))
+
+    known = Equipment.all_objects.filter(pk__in=scanned).values_list("pk", "laboratory_id", "last_audited_at")
+    newer = {}
+    misplaced = []
+    found = set()
+    for pk, laboratory_id, last_audited_at in known:
+        found.add(pk)
+        if laboratory_id != laboratory.pk:
+            misplaced.append(pk)
+            continue
+        if last_audited_at is None or last_audited_at < scanned[pk]:
+            newer[pk] = scanned[pk]
+
+    if newer:
+        with atomic():
+            Equipment.all_objects.filter(pk__in=newer, laboratory=laboratory).update(
+                last_audited_at=Case(
+                    *[When(pk=pk, then=Value(scanned_at)) for pk, scanned_at in newer.items()],
+                    output_field=DateTimeField(),
+                ),
+                updated_at=timezone.now(),
+            )
+            record_bulk_changes(Equipment.all_objects.filter(pk__in=newer), changed_fields=["last_audited_at"])
+
+    return {
+        "applied": len(newer),
+        "unknown": sorted(set(scanned) - found, key=str),
+        "misplaced": sorted(misplaced, key=str),
+    }
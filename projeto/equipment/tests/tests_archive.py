@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from projeto.equipment.archive import archive_events
+from projeto.equipment.models import (
+    ArchivedEvent,
+    Asset,
+    Equipment,
+    Event,
+    EventHistory,
+    EventKind,
+    EventTier,
+    Laboratory,
+)
+
+
+class ArchiveEventsTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        self.equipment = self.create_equipment('SN1')
+        self.now = timezone.now()
+
+    def create_equipment(self, serial_number, archived=False):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG1',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            archived=archived,
+            asset=self.asset
+        )
+
+    def create_event(self, equipment, days_ago):
+        returned_at = timezone.now() - timedelta(days=days_ago)
+        return Event.objects.create(
+            kind=EventKind.CHECK,
+            send_at=returned_at - timedelta(days=1),
+            returned_at=returned_at,
+            certificate_number=f'CERT{days_ago}',
+            certificate_results='OK',
+            observation='-',
+            item=equipment
+        )
+
+    def test_moves_old_events_but_keeps_latest_per_equipment(self):
+        oldest = self.create_event(self.equipment, days_ago=2000)
+        old_latest = self.create_event(self.equipment, days_ago=1500)
+
+        self.assertEqual(archive_events(horizon_days=365, now=self.now), 1)
+        self.assertEqual(list(Event.objects.values_list('pk', flat=True)), [old_latest.pk])
+
+        archived = ArchivedEvent.objects.get()
+        self.assertEqual(archived.pk, oldest.pk)
+        self.assertEqual(archived.created_at, oldest.created_at)
+        self.assertEqual(archived.certificate_number, oldest.certificate_number)
+
+    def test_moves_every_event_of_archived_equipment(self):
+        retired = self.create_equipment('SN2', archived=True)
+        self.create_event(retired, days_ago=1)
+        recent = self.create_event(self.equipment, days_ago=1)
+
+        self.assertEqual(archive_events(horizon_days=365, now=self.now), 1)
+        self.assertEqual(list(Event.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(ArchivedEvent.objects.get().item, retired)
+
+    def test_history_unions_both_tiers(self):
+        self.create_event(self.equipment, days_ago=2000)
+        self.create_event(self.equipment, days_ago=10)
+        archive_events(horizon_days=365, now=self.now)
+
+        self.assertEqual(
+            sorted(self.equipment.history.values_list('tier', flat=True)),
+            [EventTier.ARCHIVE, EventTier.HOT]
+        )
+        self.assertEqual(EventHistory.objects.filter(item__laboratory=self.laboratory).count(), 2)
@@ -0,0 +1,112 @@
+import hashlib
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment.forms import CertificateAttachmentForm
+from projeto.equipment.models import Asset, CertificateAttachment, Equipment, Event, Laboratory
+from projeto.equipment.storage import ContentAddressedStorage
+
+PDF = b'%PDF-1.4 ' + bytes(range(256)) * 1000
+
+
+class CertificateAttachmentTest(TestCase):
+    def setUp(self):
+        storage_root = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_root.cleanup)
+        settings_override = override_settings(CERTIFICATE_STORAGE_ROOT=storage_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        laboratory = Laboratory.objects.create(name='Lab A')
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG1',
+            bought_at=timezone.now(),
+            laboratory=laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            asset=asset
+        )
+        self.event = Event.objects.create(
+            kind='calibration',
+            send_at=timezone.now(),
+            returned_at=timezone.now(),
+            certificate_number='CERT1',
+            certificate_results='OK',
+            observation='-',
+            item=equipment
+        )
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def upload(self, content, content_type='application/pdf', **extra):
+        return self.client.post(
+            reverse('equipment:certificate-upload', args=[self.event.pk]) + '?filename=cert.pdf',
+            data=content,
+            content_type=content_type,
+            **extra
+        )
+
+    def test_upload_is_content_addressed_and_deduplicated(self):
+        first = self.upload(PDF).json()
+        second = self.upload(PDF).json()
+
+        digest = hashlib.sha256(PDF).hexdigest()
+        self.assertEqual(first['sha256'], digest)
+        self.assertEqual(second['sha256'], digest)
+        self.assertEqual(CertificateAttachment.objects.filter(sha256=digest).count(), 2)
+        storage = ContentAddressedStorage()
+        self.assertEqual(storage.path(digest).read_bytes(), PDF)
+        self.assertEqual(len([p for p in storage.root.rglob('*') if p.is_file()]), 1)
+
+    def test_only_pdf_uploads_are_accepted(self):
+        self.assertEqual(self.upload(b'<script>alert(1)</script>', 'text/html').status_code, 415)
+        self.assertEqual(self.upload(PDF, CONTENT_LENGTH='abc').status_code, 400)
+        form = CertificateAttachmentForm(
+            data={}, files={'file': SimpleUploadedFile('cert.html', b'<html>', 'text/html')},
+            instance=CertificateAttachment(event=self.event)
+        )
+        self.assertFalse(form.is_valid())
+        self.assertFalse(CertificateAttachment.objects.exists())
+
+    def test_admin_form_stores_the_upload(self):
+        form = CertificateAttachmentForm(
+            data={}, files={'file': SimpleUploadedFile('cert.pdf', PDF, 'application/pdf')},
+            instance=CertificateAttachment(event=self.event)
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        attachment = form.save()
+
+        self.assertEqual(attachment.size, len(PDF))
+        self.assertEqual(attachment.sha256, hashlib.sha256(PDF).hexdigest())
+
+    def test_download_supports_ranges(self):
+        uuid = self.upload(PDF).json()['uuid']
+        url = reverse('equipment:certificate-download', args=[uuid])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(b''.join(response.streaming_content), PDF)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(PDF)}')
+        self.assertEqual(b''.join(response.streaming_content), PDF[100:200])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(PDF).hexdigest()}"')
+        self.assertEqual(b''.join(response.streaming_content), PDF[100:200])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), PDF[-10:])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(PDF)}-')
+        self.assertEqual(response.status_code, 416)
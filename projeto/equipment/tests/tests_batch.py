@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.contrib.admin.models import LogEntry
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment.batch import create_event_batch
+from projeto.equipment.due_dates import recompute_calibration_due_dates
+from projeto.equipment.models import (
+    Asset,
+    CalibrationPoint,
+    Equipment,
+    Event,
+    EventKind,
+    Laboratory,
+    OutboxAction,
+    OutboxEntry,
+)
+
+
+class EventBatchTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        asset = Asset.objects.create(brand='Eppendorf', model='Research', kind='analog')
+        self.equipment = [
+            Equipment.objects.create(
+                serial_number=f'P{index}',
+                tag_number='TAG',
+                bought_at=self.now,
+                laboratory=self.laboratory,
+                maintenance_periodicity=0,
+                calibration_periodicity=180,
+                asset=asset
+            )
+            for index in range(3)
+        ]
+
+    def test_batch_matches_signal_side_effects(self):
+        returned_at = self.now - timedelta(days=1)
+        events = [
+            Event(
+                item=item,
+                kind=EventKind.CALIBRATION,
+                send_at=returned_at - timedelta(days=2),
+                returned_at=returned_at,
+                certificate_number=f'C{index}',
+                certificate_results='100; 100.2; 0.1',
+                observation='-',
+            )
+            for index, item in enumerate(self.equipment)
+        ]
+
+        with self.assertNumQueries(15):
+            created = create_event_batch(events)
+
+        self.assertEqual(len(created), 3)
+        self.assertEqual(
+            set(Equipment.objects.values_list('calibration_due_date', flat=True)),
+            {returned_at + timedelta(days=180)}
+        )
+        self.assertEqual(CalibrationPoint.objects.count(), 3)
+        self.assertEqual(OutboxEntry.objects.filter(model='equipment.event', action=OutboxAction.CREATED).count(), 3)
+
+    def test_backdated_events_give_the_same_due_dates_as_the_signals(self):
+        def history(item):
+            # Entered newest first: a calibration, then a failure found before it, then one found after it.
+            calibrated_at = self.now - timedelta(days=100)
+            return [
+                Event(item=item, kind=EventKind.CALIBRATION, send_at=calibrated_at - timedelta(days=2),
+                      returned_at=calibrated_at, certificate_number='C1', certificate_results='-', observation='-'),
+                Event(item=item, kind=EventKind.CORRECTIVE, send_at=calibrated_at - timedelta(days=50),
+                      returned_at=calibrated_at - timedelta(days=40), requires_recalibration=True,
+                      certificate_number='-', certificate_results='-', observation='-'),
+            ]
+
+        signal_item, batch_item, _ = self.equipment
+        for event in history(signal_item):
+            event.save()
+        create_event_batch(history(batch_item))
+        signal_item.refresh_from_db()
+        batch_item.refresh_from_db()
+        self.assertEqual(signal_item.calibration_due_date, self.now + timedelta(days=80))
+        self.assertEqual(batch_item.calibration_due_date, signal_item.calibration_due_date)
+
+        failures = [
+            Event(item=item, kind=EventKind.CORRECTIVE, send_at=self.now - timedelta(days=10),
+                  returned_at=self.now - timedelta(days=5), requires_recalibration=True,
+                  certificate_number='-', certificate_results='-', observation='-')
+            for item in (signal_item, batch_item)
+        ]
+        failures[0].save()
+        create_event_batch(failures[1:])
+        for item in (signal_item, batch_item):
+            item.refresh_from_db()
+            self.assertLess(item.calibration_due_date, timezone.now())
+        self.assertEqual(recompute_calibration_due_dates(Equipment.objects.filter(pk=batch_item.pk)), 0)
+
+    def test_admin_page_validates_all_rows_then_saves(self):
+        admin = CustomUser.objects.create_superuser('admin', password='x')
+        self.client.force_login(admin)
+        url = reverse('admin:equipment_event_batch')
+        header = {
+            'equipment': [item.pk for item in self.equipment],
+            'kind': EventKind.CALIBRATION,
+            'send_at_0': self.now.strftime('%d/%m/%Y'),
+            'send_at_1': '08:00',
+            'returned_at_0': '',
+            'returned_at_1': '',
+            'observation': 'Vendor visit',
+        }
+
+        response = self.client.post(url, header)
+        self.assertContains(response, 'name="save"')
+        self.assertContains(response, 'P2')
+
+        rows = {'form-TOTAL_FORMS': '3', 'form-INITIAL_FORMS': '3'}
+        for index, item in enumerate(self.equipment):
+            rows[f'form-{index}-item'] = item.pk
+            rows[f'form-{index}-certificate_number'] = f'C{index}'
+            rows[f'form-{index}-certificate_results'] = '-'
+        rows['form-2-certificate_number'] = ''
+
+        response = self.client.post(url, {**header, **rows, 'save': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Event.objects.count(), 0)
+
+        rows['form-2-certificate_number'] = 'C2'
+        response = self.client.post(url, {**header, **rows, 'save': '1'})
+        self.assertRedirects(response, reverse('admin:equipment_event_changelist'))
+        self.assertEqual(Event.objects.filter(observation='Vendor visit').count(), 3)
+        self.assertEqual(LogEntry.objects.count(), 1)
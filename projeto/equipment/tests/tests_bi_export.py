@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from projeto.core.models import CustomUser
+from projeto.equipment.bi_export import TABLES, export, pa, write_table
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, EventTier, Laboratory
+
+if pa is not None:
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+
+@skipUnless(pa is not None, "pyarrow is not installed")
+class BiExportTest(TestCase):
+    def setUp(self):
+        self.now = datetime(2026, 3, 10, 12, tzinfo=dt_timezone.utc)
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        self.asset = Asset.objects.create(brand='Mettler', model='XS', kind='digital')
+        self.equipment = [
+            self.create_equipment('SN1', self.laboratory),
+            self.create_equipment('SN2', self.other_laboratory),
+        ]
+        self.event = Event.objects.create(
+            item=self.equipment[0],
+            kind=EventKind.CALIBRATION,
+            send_at=self.now - timedelta(days=3),
+            returned_at=self.now - timedelta(days=1),
+            price=Decimal('120.50'),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+        )
+        # Spread the rows over two months.
+        Equipment.all_objects.filter(pk=self.equipment[1].pk).update(updated_at=self.now - timedelta(days=40))
+        Equipment.all_objects.filter(pk=self.equipment[0].pk).update(updated_at=self.now)
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def create_equipment(self, serial_number, laboratory):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=self.now,
+            laboratory=laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+
+    def read(self, table):
+        return pa.dataset.dataset(os.path.join(self.root, table), partitioning='hive').to_table().to_pylist()
+
+    def test_partitions_by_updated_month_with_statuses(self):
+        results = export(self.root, tables=['equipment', 'event'], chunk_size=1)
+        self.assertEqual(results['equipment'], {'2026-01': 1, '2026-03': 1})
+        self.assertTrue(os.path.isfile(os.path.join(self.root, 'equipment', 'updated_month=2026-03', 'part-0.parquet')))
+
+        rows = {row['serial_number']: row for row in self.read('equipment')}
+        self.assertEqual(rows['SN1']['uuid'], str(self.equipment[0].pk))
+        self.assertEqual(rows['SN1']['status'], self.equipment[0].get_status())
+        self.assertEqual(rows['SN1']['updated_month'], '2026-03')
+
+        [event] = self.read('event')
+        self.assertEqual(event['tier'], EventTier.HOT)
+        self.assertEqual(event['price'], Decimal('120.50'))
+        self.assertEqual(event['item_id'], str(self.equipment[0].pk))
+
+    def test_incremental_rewrites_changed_months_only(self):
+        export(self.root, tables=['equipment'], now=self.now)
+        january = os.path.join(self.root, 'equipment', 'updated_month=2026-01', 'part-0.parquet')
+        modified = os.path.getmtime(january)
+
+        later = self.now + timedelta(days=30)
+        Equipment.all_objects.filter(pk=self.equipment[0].pk).update(tag_number='NEW', updated_at=later)
+        results = export(self.root, tables=['equipment'], incremental=True, now=later)
+
+        self.assertEqual(results['equipment'], {'2026-04': 1})
+        self.assertEqual(os.path.getmtime(january), modified)
+        # The older copy stays in March: readers keep the latest updated_at per uuid.
+        copies = [row for row in self.read('equipment') if row['serial_number'] == 'SN1']
+        self.assertEqual(max(copies, key=lambda row: row['updated_at'])['tag_number'], 'NEW')
+
+    def test_arrow_format_and_command(self):
+        output = io.StringIO()
+        call_command('export_bi', output=self.root, format='arrow', tables=['laboratory'], stdout=output)
+        self.assertIn('laboratory: 2 rows', output.getvalue())
+
+        sink = io.BytesIO()
+        self.assertEqual(write_table(TABLES['asset'], sink, 'arrow'), 1)
+        self.assertEqual(pa.ipc.open_file(sink.getvalue()).read_all().column('brand').to_pylist(), ['Mettler'])
+
+    def test_endpoint_is_scoped_to_the_laboratory(self):
+        user = CustomUser.objects.create_user('analyst', password='x', is_staff=True, laboratory=self.laboratory)
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('equipment:bi-export', args=['equipment', 'parquet']))
+        self.assertIn('attachment', response['Content-Disposition'])
+        table = pa.parquet.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.column('serial_number').to_pylist(), ['SN1'])
+
+        response = self.client.get(reverse('equipment:bi-export', args=['users', 'parquet']))
+        self.assertEqual(response.status_code, 404)
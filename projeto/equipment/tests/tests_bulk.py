@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory, OutboxEntry
+
+
+class BulkEquipmentActionsTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        self.equipment = [
+            Equipment.objects.create(
+                serial_number=f'SN{index}',
+                tag_number='TAG',
+                bought_at=self.now,
+                laboratory=self.laboratory,
+                maintenance_periodicity=0,
+                calibration_periodicity=365,
+                asset=asset
+            )
+            for index in range(3)
+        ]
+        self.admin = CustomUser.objects.create_superuser('admin', password='x')
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:equipment_equipment_changelist')
+
+    def post_action(self, action, **data):
+        return self.client.post(
+            self.url, {'action': action, '_selected_action': [item.pk for item in self.equipment], **data}
+        )
+
+    def test_archive_is_one_update_with_one_log_entry(self):
+        OutboxEntry.objects.all().delete()
+        # Counts the log entry's content type lookup whatever the tests before cached.
+        ContentType.objects.clear_cache()
+
+        with self.assertNumQueries(13):
+            response = self.post_action('archive_selected')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Equipment.all_objects.filter(archived=True).count(), 3)
+        self.assertEqual(OutboxEntry.objects.filter(changed_fields=['archived']).count(), 3)
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.object_repr, f'3 {Equipment._meta.verbose_name_plural}')
+        self.assertIn('SN0', entry.change_message)
+
+    def test_move_asks_for_the_laboratory_first(self):
+        response = self.post_action('move_to_laboratory')
+        self.assertContains(response, 'name="apply"')
+        self.assertEqual(Equipment.objects.filter(laboratory=self.other_laboratory).count(), 0)
+
+        response = self.post_action('move_to_laboratory', apply='1', laboratory=self.other_laboratory.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Equipment.objects.filter(laboratory=self.other_laboratory).count(), 3)
+
+    def test_periodicity_change_recomputes_due_dates(self):
+        returned_at = self.now - timedelta(days=10)
+        Event.objects.create(
+            kind=EventKind.CALIBRATION,
+            send_at=returned_at,
+            returned_at=returned_at,
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+            item=self.equipment[0]
+        )
+
+        self.post_action(
+            'change_calibration_periodicity',
+            apply='1',
+            calibration_periodicity_0='0',
+            calibration_periodicity_1='0',
+            calibration_periodicity_2='0',
+            calibration_periodicity_3='30',
+        )
+
+        self.assertEqual(set(Equipment.objects.values_list('calibration_periodicity', flat=True)), {30})
+        self.equipment[0].refresh_from_db()
+        self.assertEqual(self.equipment[0].calibration_due_date, returned_at + timedelta(days=30))
+
+    def test_laboratory_users_cannot_move_equipment(self):
+        user = CustomUser.objects.create_user('lab_user', password='x', is_staff=True, laboratory=self.laboratory)
+        user.user_permissions.set(Permission.objects.filter(codename__in=['view_equipment', 'change_equipment']))
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'archive_selected')
+        self.assertNotContains(response, 'move_to_laboratory')
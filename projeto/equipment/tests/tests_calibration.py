@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from projeto.equipment.calibration import parse_certificate_results
+from projeto.equipment.drift import analyze_drift, category_drift
+from projeto.equipment.models import Asset, CalibrationPoint, Equipment, Event, EventKind, Laboratory
+
+
+class ParseCertificateResultsTest(SimpleTestCase):
+    def test_parses_table_rows(self):
+        text = 'Nominal; Medido; Incerteza; Tolerância\n10,0 V; 10,02 V; ±0,01; 0,05\n20.0 | 19.97'
+        self.assertEqual(
+            parse_certificate_results(text),
+            [(10.0, 10.02, 0.01, 0.05), (20.0, 19.97, None, None)]
+        )
+
+    def test_ignores_free_text(self):
+        self.assertEqual(parse_certificate_results('0-10V, 5 pontos'), [])
+        self.assertEqual(parse_certificate_results(''), [])
+
+
+class CalibrationDriftTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog', category='pipette')
+
+    def create_history(self, serial_number, errors):
+        equipment = Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+        start = timezone.now() - timedelta(days=365 * len(errors))
+        for year, error in enumerate(errors):
+            returned_at = start + timedelta(days=365 * year)
+            Event.objects.create(
+                kind=EventKind.CALIBRATION,
+                send_at=returned_at,
+                returned_at=returned_at,
+                certificate_number=f'C{year}',
+                certificate_results=f'100; {100 + error}; 0.1; 1.0',
+                observation='-',
+                item=equipment
+            )
+        return equipment
+
+    def test_points_are_parsed_on_save(self):
+        equipment = self.create_history('SN1', [0.2])
+        point = CalibrationPoint.objects.get(item=equipment)
+        self.assertAlmostEqual(point.error, 0.2)
+        self.assertEqual(point.tolerance, 1.0)
+
+    def test_flags_instruments_trending_out_of_tolerance(self):
+        drifting = self.create_history('SN1', [0.1, 0.4, 0.7])
+        stable = self.create_history('SN2', [0.2, 0.2, 0.2])
+
+        results = {result.equipment_uuid: result for result in analyze_drift()}
+
+        self.assertTrue(results[drifting.uuid].trending_out_of_tolerance)
+        self.assertAlmostEqual(results[drifting.uuid].projected_usage, 1.1, places=2)
+        self.assertFalse(results[stable.uuid].trending_out_of_tolerance)
+        self.assertAlmostEqual(results[stable.uuid].slope_per_year, 0.0, places=6)
+        self.assertEqual(
+            category_drift(results.values())['pipette']['trending_out'], 1
+        )
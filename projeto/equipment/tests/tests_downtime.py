@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.equipment.downtime import compute_downtime, grouped_percentiles, merge_intervals
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory
+
+
+class IntervalArithmeticTest(SimpleTestCase):
+    def test_merges_overlapping_intervals_per_group(self):
+        groups = np.array([1, 0, 0, 0, 1, 0])
+        starts = np.array([0, 10, 0, 30, 5, 12])
+        ends = np.array([10, 20, 5, 40, 8, 25])
+
+        merged_groups, merged_starts, merged_ends = merge_intervals(groups, starts, ends)
+
+        self.assertEqual(list(merged_groups), [0, 0, 0, 1])
+        self.assertEqual(list(merged_starts), [0, 10, 30, 0])
+        self.assertEqual(list(merged_ends), [5, 25, 40, 10])
+
+    def test_grouped_percentiles_match_numpy(self):
+        rng = np.random.default_rng(0)
+        groups = rng.integers(0, 4, 200)
+        values = rng.random(200)
+
+        unique_groups, counts, matrix = grouped_percentiles(groups, values, (50, 90))
+
+        for group, count, row in zip(unique_groups, counts, matrix):
+            self.assertEqual(count, (groups == group).sum())
+            np.testing.assert_allclose(row, np.percentile(values[groups == group], [50, 90]))
+
+
+class DowntimeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog', category='balance')
+        self.equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=self.now - timedelta(days=400),
+            laboratory=self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=0,
+            asset=asset
+        )
+
+    def create_event(self, kind, send_days_ago, returned_days_ago):
+        return Event.objects.create(
+            kind=kind,
+            send_at=self.now - timedelta(days=send_days_ago),
+            returned_at=None if returned_days_ago is None else self.now - timedelta(days=returned_days_ago),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+            item=self.equipment
+        )
+
+    def test_overlapping_events_count_once(self):
+        self.create_event(EventKind.CORRECTIVE, 100, 90)
+        self.create_event(EventKind.CALIBRATION, 95, 85)
+        self.create_event(EventKind.CHECK, 2, None)
+
+        report = compute_downtime(days=100, now=self.now)
+
+        [row] = report.availability
+        self.assertEqual(row['equipment'], 1)
+        self.assertAlmostEqual(row['downtime_hours'], 17 * 24)
+        self.assertAlmostEqual(row['availability'], 1 - 17 / 100)
+        self.assertEqual(row['repairs'], 1)
+        self.assertAlmostEqual(row['mttr_hours'], 10 * 24)
+        self.assertEqual(
+            sorted((turnaround['kind'], turnaround['events']) for turnaround in report.turnaround),
+            [(EventKind.CALIBRATION, 1), (EventKind.CORRECTIVE, 1)]
+        )
+
+    def test_export_is_scoped_and_csv(self):
+        self.create_event(EventKind.CALIBRATION, 10, 5)
+        user = get_user_model().objects.create_user(
+            username='staff', password='x', is_staff=True, laboratory=self.laboratory
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('equipment:downtime-export'), {'table': 'turnaround'})
+
+        self.assertEqual(response.status_code, 200)
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], 'laboratory,category,kind,events,p50_hours,p90_hours,p95_hours')
+        self.assertEqual(lines[1], 'Lab A,balance,calibration,1,120.0,120.0,120.0')
+        self.assertEqual(self.client.get(reverse('equipment:dashboard')).status_code, 200)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from projeto.equipment.intervals import accept_recommendations, refresh_recommendations
+from projeto.equipment.models import (
+    Asset,
+    Equipment,
+    Event,
+    EventKind,
+    IntervalRecommendation,
+    Laboratory,
+)
+
+
+class IntervalRecommendationTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+
+    def create_equipment(self, serial_number):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=200,
+            asset=self.asset
+        )
+
+    def create_event(self, equipment, kind, days_ago, requires_recalibration=False):
+        returned_at = timezone.now() - timedelta(days=days_ago)
+        return Event.objects.create(
+            kind=kind,
+            send_at=returned_at,
+            returned_at=returned_at,
+            certificate_number='C',
+            certificate_results='-',
+            observation='-',
+            requires_recalibration=requires_recalibration,
+            item=equipment
+        )
+
+    def test_failures_shorten_and_clean_records_extend(self):
+        failing = self.create_equipment('SN1')
+        self.create_event(failing, EventKind.CALIBRATION, days_ago=300)
+        self.create_event(failing, EventKind.CORRECTIVE, days_ago=100, requires_recalibration=True)
+        reliable = self.create_equipment('SN2')
+        for days_ago in (600, 400, 200):
+            self.create_event(reliable, EventKind.CALIBRATION, days_ago=days_ago)
+        self.create_equipment('SN3')
+
+        recommendations = {r.item_id: r for r in refresh_recommendations()}
+
+        self.assertEqual(len(recommendations), 2)
+        self.assertEqual(recommendations[failing.pk].recommended_periodicity, 140)
+        self.assertEqual(recommendations[failing.pk].failures, 1)
+        self.assertEqual(recommendations[reliable.pk].recommended_periodicity, 250)
+
+    def test_accept_updates_periodicity_and_due_date(self):
+        equipment = self.create_equipment('SN1')
+        calibration = self.create_event(equipment, EventKind.CALIBRATION, days_ago=10)
+        for days_ago in (600, 400):
+            self.create_event(equipment, EventKind.CALIBRATION, days_ago=days_ago)
+        refresh_recommendations()
+
+        self.assertEqual(accept_recommendations(IntervalRecommendation.objects.all()), 1)
+
+        equipment.refresh_from_db()
+        self.assertEqual(equipment.calibration_periodicity, 250)
+        self.assertEqual(equipment.calibration_due_date, calibration.returned_at + timedelta(days=250))
+        self.assertIsNotNone(IntervalRecommendation.objects.get().accepted_at)
+        self.assertEqual(accept_recommendations(IntervalRecommendation.objects.all()), 0)
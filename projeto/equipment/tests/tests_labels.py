@@ -0,0 +1,83 @@
+import re
+import zlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment import labels
+from projeto.equipment.labels import LabelSheet, label_sheets
+from projeto.equipment.models import Asset, Equipment, Laboratory
+
+
+def read_pdf(data):
+    """Checks the cross-reference table and returns the decompressed page streams."""
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    offsets = re.findall(rb"(\d{10}) 00000 n", data[xref:])
+    for number, offset in enumerate(offsets, start=1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number), number
+    return [zlib.decompress(stream) for stream in re.findall(rb"stream\n(.*?)\nendstream", data, re.S)]
+
+
+class LabelSheetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='Mettler', model='XS', kind='digital')
+        for index in range(5):
+            Equipment.objects.create(
+                serial_number=f'SN{index}',
+                tag_number=f'TAG{index}',
+                inventory_number=f'INV({index})',
+                bought_at=timezone.now(),
+                laboratory=self.laboratory,
+                maintenance_periodicity=0,
+                calibration_periodicity=365,
+                asset=self.asset
+            )
+        self.sheet = LabelSheet(columns=2, rows=2)
+
+    def test_paginated_pdf(self):
+        data = b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example/', self.sheet))
+        self.assertTrue(data.startswith(b'%PDF-1.4') and data.endswith(b'%%EOF\n'))
+        self.assertIn(b'/Count 2', data)
+
+        pages = read_pdf(data)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0].count(b'BI /IM true'), 4)
+        self.assertIn(b'(TAG0) Tj', pages[0])
+        self.assertIn(b'(INV\\(4\\)) Tj', pages[1])
+
+    def test_rendered_labels_are_cached_until_updated(self):
+        render = mock.Mock(side_effect=labels.render_label)
+        with mock.patch.object(labels, 'render_label', render):
+            first = b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example', self.sheet))
+            self.assertEqual(render.call_count, 5)
+
+            self.assertEqual(b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example', self.sheet)), first)
+            self.assertEqual(render.call_count, 5)
+
+            Equipment.objects.filter(tag_number='TAG1').update(tag_number='NEW', updated_at=timezone.now())
+            b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example', self.sheet))
+            self.assertEqual(render.call_count, 6)
+
+    def test_process_pool(self):
+        with mock.patch.object(labels, 'PARALLEL_THRESHOLD', 1):
+            parallel = b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example', self.sheet, processes=2))
+        cache.clear()
+        self.assertEqual(b''.join(label_sheets(Equipment.objects.all(), 'https://lab.example', self.sheet)), parallel)
+
+    def test_admin_action_streams_pdf(self):
+        user = CustomUser.objects.create_superuser('admin', password='x')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('admin:equipment_equipment_changelist'),
+            {'action': 'print_labels', '_selected_action': Equipment.objects.values_list('pk', flat=True)},
+        )
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        data = b''.join(response.streaming_content)
+        self.assertIn(b'/Count 1', data)
+        self.assertEqual(len(read_pdf(data)), 1)
@@ -4,13 +4,14 @@ from django.core.exceptions import PermissionDenied, ValidationError
 from django.test import TestCase
 from django.utils import timezone
 
-from projeto.equipment.models import Asset, Equipment, Event, Laboratory
+from projeto.equipment.due_dates import recompute_maintenance_due_dates
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory, MaintenanceStatus
 
 
 class LaboratoryModelTest(TestCase):
     def test_field_count(self):
         field_names = [f.name for f in Laboratory._meta.fields if f.name != 'id']
-        self.assertEqual(len(field_names), 4)
+        self.assertEqual(len(field_names), 5)
 
     def test_create_and_str(self):
         laboratory = Laboratory.objects.create(name='Lab A')
@@ -114,3 +115,116 @@ class EventModelTest(TestCase):
         )
         with self.assertRaises(ValidationError):
             event.full_clean()
+
+
+class EquipmentManagerTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab C')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+
+    def create_equipment(self, serial_number, archived):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=90,
+            calibration_periodicity=365,
+            archived=archived,
+            asset=self.asset
+        )
+
+    def test_default_manager_excludes_archived(self):
+        active = self.create_equipment('SN1', archived=False)
+        retired = self.create_equipment('SN2', archived=True)
+
+        self.assertEqual(list(Equipment.objects.all()), [active])
+        self.assertEqual(Equipment.all_objects.count(), 2)
+        self.assertEqual(Equipment.all_objects.active().get(), active)
+        self.assertEqual(Equipment._base_manager.get(pk=retired.pk), retired)
+
+
+class MaintenanceDueDateTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        laboratory = Laboratory.objects.create(name='Lab D')
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        self.equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=self.now - timedelta(days=400),
+            laboratory=laboratory,
+            maintenance_periodicity=90,
+            calibration_periodicity=365,
+            asset=asset
+        )
+
+    def create_event(self, kind, returned_at):
+        return Event.objects.create(
+            kind=kind,
+            send_at=returned_at - timedelta(days=1),
+            returned_at=returned_at,
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+            item=self.equipment
+        )
+
+    def test_preventive_maintenance_sets_due_date(self):
+        self.assertEqual(self.equipment.get_maintenance_status(), MaintenanceStatus.NOT_SCHEDULED)
+
+        returned_at = self.now - timedelta(days=70)
+        self.create_event(EventKind.CALIBRATION, self.now)
+        self.create_event(EventKind.PREVENTIVE, returned_at)
+
+        self.equipment.refresh_from_db()
+        self.assertEqual(self.equipment.maintenance_due_date, returned_at + timedelta(days=90))
+        self.assertEqual(self.equipment.get_maintenance_status(), MaintenanceStatus.EXPIRES_IN_30_DAYS)
+
+    def test_recompute_follows_periodicity(self):
+        returned_at = self.now - timedelta(days=10)
+        self.create_event(EventKind.PREVENTIVE, returned_at)
+        Equipment.objects.filter(pk=self.equipment.pk).update(maintenance_periodicity=30)
+
+        self.assertEqual(recompute_maintenance_due_dates(Equipment.objects.all()), 1)
+
+        self.equipment.refresh_from_db()
+        self.assertEqual(self.equipment.maintenance_due_date, returned_at + timedelta(days=30))
+
+        Equipment.objects.filter(pk=self.equipment.pk).update(maintenance_periodicity=0)
+        recompute_maintenance_due_dates(Equipment.objects.all())
+        self.equipment.refresh_from_db()
+        self.assertIsNone(self.equipment.maintenance_due_date)
+
+    def test_backdated_preventive_event_keeps_the_later_due_date(self):
+        returned_at = self.now - timedelta(days=10)
+        self.create_event(EventKind.PREVENTIVE, returned_at)
+        self.create_event(EventKind.PREVENTIVE, self.now - timedelta(days=200))
+
+        self.equipment.refresh_from_db()
+        self.assertEqual(self.equipment.maintenance_due_date, returned_at + timedelta(days=90))
+        recompute_maintenance_due_dates(Equipment.objects.all())
+        self.equipment.refresh_from_db()
+        self.assertEqual(self.equipment.maintenance_due_date, returned_at + timedelta(days=90))
+
+
+class EquipmentStatusAnnotationTest(TestCase):
+    setUp = MaintenanceDueDateTest.setUp
+    create_event = MaintenanceDueDateTest.create_event
+
+    def assertSameStatus(self):
+        self.equipment.refresh_from_db()
+        annotated = Equipment.objects.with_status().get(pk=self.equipment.pk)
+        with self.assertNumQueries(0):
+            status = annotated.get_status()
+            calibration_status = annotated.get_calibration_status()
+        self.assertEqual(status, self.equipment.get_status())
+        self.assertEqual(calibration_status, self.equipment.get_calibration_status())
+
+    def test_with_status_matches_per_row_status(self):
+        self.assertSameStatus()
+        self.create_event(EventKind.CALIBRATION, self.now - timedelta(days=5))
+        self.assertSameStatus()
+        event = self.create_event(EventKind.CORRECTIVE, self.now - timedelta(days=1))
+        Event.objects.filter(pk=event.pk).update(requires_recalibration=True)
+        self.assertSameStatus()
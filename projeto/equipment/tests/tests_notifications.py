@@ -0,0 +1,74 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment.models import Asset, CalibrationStatus, Equipment, Laboratory, NotificationRun
+from projeto.equipment.notifications import crossing_equipment, send_calibration_digests
+
+
+class CalibrationDigestTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        CustomUser.objects.create_user('a1', email='a1@example.com', laboratory=self.laboratory)
+        CustomUser.objects.create_user('a2', email='a2@example.com', laboratory=self.laboratory)
+        CustomUser.objects.create_user('a3', email='', laboratory=self.laboratory)
+        CustomUser.objects.create_user('b1', email='b1@example.com', laboratory=self.other_laboratory)
+
+    def create_equipment(self, serial_number, due_in_days, laboratory=None):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=self.now,
+            laboratory=laboratory or self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            calibration_due_date=self.now + timedelta(days=due_in_days),
+            asset=self.asset
+        )
+
+    def test_finds_bucket_crossings_in_one_query(self):
+        self.create_equipment('SN60', 59.5)
+        self.create_equipment('SN30', 29.5)
+        self.create_equipment('SN0', -0.5)
+        self.create_equipment('SN45', 45)
+        self.create_equipment('SN-10', -10)
+
+        with self.assertNumQueries(1):
+            crossing = {
+                item.serial_number: item.bucket
+                for item in crossing_equipment(self.now - timedelta(days=1), self.now)
+            }
+
+        self.assertEqual(crossing, {
+            'SN60': CalibrationStatus.EXPIRES_IN_60_DAYS,
+            'SN30': CalibrationStatus.EXPIRES_IN_30_DAYS,
+            'SN0': CalibrationStatus.EXPIRED,
+        })
+
+    def test_sends_one_digest_per_lab_user_and_resumes_from_last_run(self):
+        self.create_equipment('SN30', 29.5)
+        self.create_equipment('SN-B', -0.5, laboratory=self.other_laboratory)
+
+        equipment, messages = send_calibration_digests(now=self.now)
+
+        self.assertEqual(len(equipment), 2)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['a1@example.com', 'a2@example.com', 'b1@example.com']
+        )
+        self.assertIn('SN30', mail.outbox[0].body)
+        self.assertNotIn('SN-B', mail.outbox[0].body)
+        self.assertEqual(NotificationRun.objects.get().messages_sent, 3)
+
+        mail.outbox.clear()
+        call_command('send_calibration_digests', stdout=StringIO())
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(NotificationRun.objects.count(), 2)
@@ -0,0 +1,163 @@
+from unittest import mock
+
+from django.core.exceptions import PermissionDenied
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment import outbox
+from projeto.equipment.archive import archive_events
+from projeto.equipment.models import (
+    Asset,
+    Equipment,
+    Event,
+    EventKind,
+    Laboratory,
+    OutboxAction,
+    OutboxCursor,
+    OutboxEntry,
+)
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='HP', model='X200', kind='analog')
+        self.equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG1',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+
+    def create_calibration(self):
+        return Event.objects.create(
+            kind=EventKind.CALIBRATION,
+            send_at=timezone.now(),
+            returned_at=timezone.now(),
+            certificate_number='CERT1',
+            certificate_results='OK',
+            observation='-',
+            item=self.equipment
+        )
+
+    def test_saves_are_recorded_in_order(self):
+        event = self.create_calibration()
+        entries = list(OutboxEntry.objects.all())
+
+        self.assertEqual(
+            [(entry.model, entry.action) for entry in entries],
+            [
+                ('equipment.equipment', 'created'),
+                ('equipment.event', 'created'),
+                ('equipment.equipment', 'updated'),
+            ]
+        )
+        self.assertEqual(entries[1].object_uuid, event.uuid)
+        self.assertEqual(entries[2].changed_fields, ['calibration_due_date'])
+        self.assertIsNotNone(entries[2].payload['calibration_due_date'])
+
+    def test_entries_are_append_only(self):
+        entry = OutboxEntry.objects.get()
+        with self.assertRaises(PermissionDenied):
+            entry.save()
+        with self.assertRaises(PermissionDenied):
+            entry.delete()
+
+    def test_fetch_entries_uses_cursor(self):
+        self.create_calibration()
+        first = outbox.fetch_entries(after=0, limit=2)
+        rest = outbox.fetch_entries(after=first[-1].sequence, limit=2)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(rest), 1)
+        self.assertGreater(rest[0].sequence, first[-1].sequence)
+
+    def test_deliver_pending_retries_and_advances_cursor(self):
+        self.create_calibration()
+        failures = [outbox.DeliveryError('down'), None, None]
+
+        def post_batch(url, entries):
+            if error := failures.pop(0):
+                raise error
+
+        with mock.patch.object(outbox, 'post_batch', side_effect=post_batch), \
+                mock.patch.object(outbox.time, 'sleep'):
+            delivered = outbox.deliver_pending('erp', 'http://localhost/hook', batch_size=2, backoff=0)
+
+        self.assertEqual(delivered, 3)
+        self.assertEqual(
+            OutboxCursor.objects.get(consumer='erp').position,
+            OutboxEntry.objects.last().sequence
+        )
+
+    def test_deliver_pending_keeps_cursor_when_retries_are_exhausted(self):
+        with mock.patch.object(outbox, 'post_batch', side_effect=outbox.DeliveryError('down')), \
+                mock.patch.object(outbox.time, 'sleep'):
+            with self.assertRaises(outbox.DeliveryError):
+                outbox.deliver_pending('erp', 'http://localhost/hook', max_retries=2)
+
+        self.assertEqual(OutboxCursor.objects.get(consumer='erp').position, 0)
+
+    def test_feed_is_scoped_to_the_laboratory(self):
+        other = Equipment.objects.create(
+            serial_number='SN2',
+            tag_number='TAG2',
+            bought_at=timezone.now(),
+            laboratory=Laboratory.objects.create(name='Lab B'),
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+        self.create_calibration()
+        user = CustomUser.objects.create_user('lab', password='x', is_staff=True, laboratory=self.laboratory)
+        self.client.force_login(user)
+
+        entries = self.client.get(reverse('equipment:outbox-feed')).json()['entries']
+
+        self.assertEqual(len(entries), 3)
+        self.assertNotIn(str(other.pk), {entry['object_uuid'] for entry in entries})
+        self.assertEqual(
+            set(OutboxEntry.objects.values_list('laboratory', flat=True)),
+            {self.laboratory.pk, other.laboratory_id}
+        )
+
+    def test_feed_refuses_limits_below_one(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', password='x'))
+        for limit in ('0', '-1'):
+            response = self.client.get(reverse('equipment:outbox-feed'), {'limit': limit})
+            self.assertEqual(response.status_code, 400)
+
+    def test_feed_reads_one_database(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', password='x'))
+        response = self.client.get(reverse('equipment:outbox-feed'))
+        self.assertEqual(response.json()['database'], 'default')
+        response = self.client.get(reverse('equipment:outbox-feed'), {'database': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archived_events_and_deleted_equipment_are_recorded(self):
+        event = self.create_calibration()
+        self.equipment.archived = True
+        self.equipment.save()
+        archive_events()
+        spare = Equipment.objects.create(
+            serial_number='SN3',
+            tag_number='TAG3',
+            bought_at=timezone.now(),
+            laboratory=self.laboratory,
+            maintenance_periodicity=180,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+        spare_pk = spare.pk
+        spare.delete()
+
+        archived = OutboxEntry.objects.get(action=OutboxAction.ARCHIVED)
+        self.assertEqual((archived.model, archived.object_uuid), ('equipment.event', event.pk))
+        self.assertEqual(archived.laboratory_id, self.laboratory.pk)
+        deleted = OutboxEntry.objects.get(action=OutboxAction.DELETED)
+        self.assertEqual(deleted.object_uuid, spare_pk)
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from projeto.equipment.models import Asset, Equipment, Event, EventKind, Laboratory
+from projeto.equipment.projections import expand_occurrences, get_projection, week_start
+
+
+class ExpandOccurrencesTest(SimpleTestCase):
+    def test_expands_all_schedules_at_once(self):
+        first = np.array(['2025-01-10', '2024-12-01', 'NaT'], dtype='datetime64[D]')
+        period = np.array([30, 100, 10])
+        schedule, dates = expand_occurrences(
+            first, period, np.datetime64('2025-01-01'), np.datetime64('2025-03-31')
+        )
+
+        self.assertEqual(list(schedule), [0, 0, 0, 1])
+        self.assertEqual(
+            [str(value) for value in dates],
+            ['2025-01-10', '2025-02-09', '2025-03-11', '2025-01-01']
+        )
+
+    def test_week_start_is_monday(self):
+        dates = np.array(['2025-01-01', '2025-01-05', '2025-01-06'], dtype='datetime64[D]')
+        self.assertEqual(
+            [str(value) for value in week_start(dates)],
+            ['2024-12-30', '2024-12-30', '2025-01-06']
+        )
+
+
+class ProjectionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        asset = Asset.objects.create(brand='HP', model='X200', kind='analog', category='balance')
+        now = timezone.now()
+        self.equipment = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG',
+            bought_at=now - timedelta(days=400),
+            laboratory=self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=91,
+            asset=asset
+        )
+        Event.objects.create(
+            kind=EventKind.CALIBRATION,
+            send_at=now,
+            returned_at=now,
+            price=Decimal('150.00'),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+            item=self.equipment
+        )
+
+    def test_projects_calibrations_with_expected_cost(self):
+        rows = get_projection(months=12)
+
+        self.assertEqual(sum(row.count for row in rows), 4)
+        self.assertEqual(sum(row.expected_cost for row in rows), 600.0)
+        self.assertEqual({(row.laboratory, row.category, row.kind) for row in rows},
+                         {('Lab A', 'balance', EventKind.CALIBRATION)})
+
+    def test_cache_is_invalidated_when_inputs_change(self):
+        get_projection(months=12)
+        Equipment.objects.filter(pk=self.equipment.pk).update(
+            calibration_periodicity=182, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(sum(row.count for row in get_projection(months=12)), 2)
+
+        Event.objects.create(
+            kind=EventKind.CHECK,
+            send_at=timezone.now(),
+            requires_recalibration=True,
+            certificate_number='C2',
+            certificate_results='-',
+            observation='-',
+            item=self.equipment
+        )
+        self.assertEqual(sum(row.count for row in get_projection(months=12)), 3)
+
+    def test_cache_is_invalidated_when_laboratories_or_assets_change(self):
+        get_projection(months=12)
+        Laboratory.objects.filter(pk=self.laboratory.pk).update(
+            name='Lab B', updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual({row.laboratory for row in get_projection(months=12)}, {'Lab B'})
+
+        Asset.objects.filter(pk=self.equipment.asset_id).update(
+            category='thermometer', updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual({row.category for row in get_projection(months=12)}, {'thermometer'})
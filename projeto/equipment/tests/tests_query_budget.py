@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.jobs import enqueue
+from projeto.core.models import CustomUser
+from projeto.equipment.models import (
+    Asset,
+    Equipment,
+    Event,
+    EventKind,
+    IntervalRecommendation,
+    Laboratory,
+)
+
+SMALL, LARGE = 2, 8
+
+
+class QueryBudgetTest(TestCase):
+    """
+    Renders each admin page and endpoint against SMALL and LARGE seeded
+    equipment (with events, recommendations and jobs) and asserts the
+    query count does not grow with the data and stays under its budget.
+    A per-row query in list_display or a filter fails here.
+    """
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x')
+        self.client.force_login(self.user)
+        self.seeded = 0
+
+    def seed(self, count):
+        for index in range(self.seeded, count):
+            laboratory = Laboratory.objects.create(name=f'Lab {index}')
+            asset = Asset.objects.create(brand=f'Brand {index}', model=f'M{index}', kind='digital')
+            item = Equipment.objects.create(
+                serial_number=f'SN{index}',
+                tag_number=f'TAG{index}',
+                bought_at=self.now - timedelta(days=400),
+                laboratory=laboratory,
+                maintenance_periodicity=180,
+                calibration_periodicity=365,
+                asset=asset
+            )
+            for kind, days in ((EventKind.CALIBRATION, 300), (EventKind.PREVENTIVE, 100), (EventKind.CORRECTIVE, 10)):
+                Event.objects.create(
+                    item=item,
+                    kind=kind,
+                    send_at=self.now - timedelta(days=days + 3),
+                    returned_at=self.now - timedelta(days=days),
+                    price=100,
+                    certificate_number=f'C{index}-{kind}',
+                    certificate_results='10; 10.1; 0.2',
+                    observation='-',
+                )
+            IntervalRecommendation.objects.create(
+                item=item,
+                current_periodicity=365,
+                recommended_periodicity=180,
+                calibrations=3,
+                failures=1,
+                corrective_maintenances=1,
+                projected_tolerance_usage=0.8,
+            )
+            enqueue('equipment.recompute_due_dates', user=self.user)
+        self.seeded = count
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return len(queries)
+
+    def assertQueryBudgets(self, budgets):
+        """``budgets`` maps URLs (or callables returning one) to their maximum query count."""
+        self.seed(SMALL)
+        urls = {url() if callable(url) else url: budget for url, budget in budgets.items()}
+        small = {}
+        for url in urls:
+            self.client.get(url)  # Warms up per-process caches (content types, sessions).
+            small[url] = self.count_queries(url)
+        self.seed(LARGE)
+        for url, budget in urls.items():
+            with self.subTest(url):
+                large = self.count_queries(url)
+                self.assertEqual(
+                    small[url], large, f'{url} runs {small[url]} queries for {SMALL} equipment and {large} for {LARGE}'
+                )
+                self.assertLessEqual(large, budget)
+
+    def test_equipment_admin(self):
+        self.assertQueryBudgets({
+            reverse('admin:equipment_equipment_changelist'): 12,
+            lambda: reverse('admin:equipment_equipment_change', args=[Equipment.objects.first().pk]): 12,
+        })
+
+    def test_event_admin(self):
+        self.assertQueryBudgets({
+            reverse('admin:equipment_event_changelist'): 14,
+            lambda: reverse('admin:equipment_event_change', args=[Event.objects.first().pk]): 12,
+            reverse('admin:equipment_eventhistory_changelist'): 10,
+        })
+
+    def test_other_changelists(self):
+        self.assertQueryBudgets({
+            reverse('admin:equipment_asset_changelist'): 12,
+            reverse('admin:equipment_laboratory_changelist'): 10,
+            reverse('admin:equipment_intervalrecommendation_changelist'): 10,
+            reverse('admin:equipment_outboxentry_changelist'): 12,
+            reverse('admin:core_job_changelist'): 12,
+        })
+
+    def test_endpoints(self):
+        self.assertQueryBudgets({
+            reverse('equipment:outbox-feed'): 5,
+            reverse('equipment:projection-export'): 10,
+            reverse('equipment:downtime-export'): 9,
+            reverse('equipment:downtime-export') + '?table=turnaround': 9,
+            reverse('equipment:dashboard'): 15,
+        })
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment import snapshot as snapshot_module
+from projeto.equipment.models import (
+    Asset,
+    CalibrationStatus,
+    Equipment,
+    EquipmentStatus,
+    Event,
+    EventKind,
+    Laboratory,
+)
+from projeto.equipment.snapshot import EquipmentSnapshot
+
+
+class EquipmentSnapshotTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.asset = Asset.objects.create(brand='Mettler', model='XS', kind='digital')
+        self.equipment = [self.create_equipment(f'SN{index}') for index in range(3)]
+        self.snapshot = EquipmentSnapshot()
+        self.snapshot.reload()
+
+    def create_equipment(self, serial_number, laboratory=None):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number=f'TAG-{serial_number}',
+            inventory_number=f'INV-{serial_number}',
+            bought_at=self.now - timedelta(days=400),
+            laboratory=laboratory or self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+
+    def calibrate(self, item, days_ago):
+        return Event.objects.create(
+            item=item,
+            kind=EventKind.CALIBRATION,
+            send_at=self.now - timedelta(days=days_ago + 2),
+            returned_at=self.now - timedelta(days=days_ago),
+            certificate_number='C1',
+            certificate_results='-',
+            observation='-',
+        )
+
+    def test_lookup_by_any_identifier(self):
+        item = self.equipment[1]
+        for code in (str(item.pk), item.pk.hex, 'SN1', 'TAG-SN1', 'INV-SN1'):
+            with self.assertNumQueries(0):
+                record = self.snapshot.lookup(code)
+            self.assertEqual(record['uuid'], str(item.pk), code)
+        self.assertEqual(record['laboratory'], {'uuid': str(self.laboratory.pk), 'name': 'Lab A'})
+        self.assertIsNone(self.snapshot.lookup('unknown'))
+
+    def test_status_matches_the_model(self):
+        self.calibrate(self.equipment[0], days_ago=10)
+        self.calibrate(self.equipment[1], days_ago=340)
+        self.snapshot.refresh()
+
+        for item in Equipment.objects.all():
+            record = self.snapshot.lookup(str(item.pk))
+            self.assertEqual(record['status'], item.get_status())
+            self.assertEqual(record['calibration_status'], item.get_calibration_status())
+            self.assertEqual(record['calibration_due_date'], item.calibration_due_date)
+        self.assertEqual(self.snapshot.lookup('SN0')['status'], EquipmentStatus.AVAILABLE)
+        self.assertEqual(self.snapshot.lookup('SN1')['calibration_status'], CalibrationStatus.EXPIRES_IN_30_DAYS)
+
+    def test_refresh_applies_changes_since_the_watermark(self):
+        self.calibrate(self.equipment[0], days_ago=10)
+        added = self.create_equipment('SN9')
+        Equipment.objects.filter(pk=self.equipment[2].pk).update(archived=True, updated_at=timezone.now())
+
+        with self.assertNumQueries(5):
+            self.snapshot.refresh()
+
+        self.assertEqual(self.snapshot.lookup('SN0')['calibration_status'], CalibrationStatus.UP_TO_DATE)
+        self.assertEqual(self.snapshot.lookup('SN9')['uuid'], str(added.pk))
+        self.assertIsNone(self.snapshot.lookup('SN2'))
+        self.assertEqual(len(self.snapshot), 3)
+
+    def test_deleted_equipment_triggers_a_reload(self):
+        self.equipment[2].delete()
+        self.snapshot.refresh()
+        self.assertIsNone(self.snapshot.lookup('SN2'))
+        self.assertEqual(len(self.snapshot), 2)
+
+    def test_laboratory_records_sorted_by_due_date(self):
+        self.calibrate(self.equipment[2], days_ago=300)
+        self.calibrate(self.equipment[0], days_ago=10)
+        self.create_equipment('OTHER', laboratory=Laboratory.objects.create(name='Lab B'))
+        self.snapshot.refresh()
+
+        records = self.snapshot.laboratory_records(self.laboratory.pk)
+        self.assertEqual([record['serial_number'] for record in records], ['SN2', 'SN0', 'SN1'])
+
+
+class SnapshotEndpointTest(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, snapshot_module, 'snapshot', snapshot_module.snapshot)
+        snapshot_module.snapshot = EquipmentSnapshot()
+        laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        asset = Asset.objects.create(brand='Mettler', model='XS', kind='digital')
+        self.item = Equipment.objects.create(
+            serial_number='SN1',
+            tag_number='TAG1',
+            inventory_number='INV1',
+            bought_at=timezone.now(),
+            laboratory=laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=asset
+        )
+        self.user = CustomUser.objects.create_user('lab_user', password='x', is_staff=True, laboratory=laboratory)
+        self.client.force_login(self.user)
+
+    @override_settings(EQUIPMENT_SNAPSHOT_REFRESH_SECONDS=3600)
+    def test_scan_and_kiosk(self):
+        response = self.client.get(reverse('equipment:scan-lookup', args=['TAG1']))
+        self.assertEqual(response.json()['uuid'], str(self.item.pk))
+        self.assertEqual(response.json()['status'], EquipmentStatus.UNAVAILABLE)
+
+        response = self.client.get(reverse('equipment:kiosk', args=[self.item.laboratory_id]))
+        self.assertEqual([record['serial_number'] for record in response.json()['equipment']], ['SN1'])
+
+    def test_other_laboratories_are_hidden(self):
+        self.user.laboratory = self.other_laboratory
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('equipment:scan-lookup', args=['SN1'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('equipment:kiosk', args=[self.item.laboratory_id])).status_code, 404)
@@ -0,0 +1,98 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projeto.core.models import CustomUser
+from projeto.equipment.models import Asset, Equipment, Laboratory, OutboxEntry
+from projeto.equipment.sync import WATERMARK_OVERLAP, apply_scans, export_changes, export_snapshot
+
+
+class SyncTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.laboratory = Laboratory.objects.create(name='Lab A')
+        self.other_laboratory = Laboratory.objects.create(name='Lab B')
+        self.asset = Asset.objects.create(brand='Mettler', model='XS', kind='digital')
+        self.equipment = [self.create_equipment(f'SN{index}') for index in range(3)]
+        self.elsewhere = self.create_equipment('SN9', laboratory=self.other_laboratory)
+
+    def create_equipment(self, serial_number, laboratory=None):
+        return Equipment.objects.create(
+            serial_number=serial_number,
+            tag_number='TAG',
+            bought_at=self.now,
+            laboratory=laboratory or self.laboratory,
+            maintenance_periodicity=0,
+            calibration_periodicity=365,
+            asset=self.asset
+        )
+
+    def rows(self, table, column='uuid'):
+        position = table['columns'].index(column)
+        return [row[position] for row in table['rows']]
+
+    def test_snapshot_is_scoped_to_the_laboratory(self):
+        snapshot = export_snapshot(self.laboratory)
+        self.assertEqual(sorted(self.rows(snapshot['equipment'], 'serial_number')), ['SN0', 'SN1', 'SN2'])
+        self.assertEqual(self.rows(snapshot['assets']), [self.asset.pk])
+
+    def test_changes_since_watermark_with_tombstones(self):
+        watermark = export_snapshot(self.laboratory, now=self.now + WATERMARK_OVERLAP * 2)['watermark']
+        later = watermark + timedelta(minutes=5)
+        Equipment.objects.filter(pk=self.equipment[0].pk).update(tag_number='NEW', updated_at=later)
+        Equipment.objects.filter(pk=self.equipment[1].pk).update(archived=True, updated_at=later)
+        Equipment.objects.filter(pk=self.equipment[2].pk).update(laboratory=self.other_laboratory, updated_at=later)
+        Equipment.objects.filter(pk=self.elsewhere.pk).update(tag_number='ELSEWHERE', updated_at=later)
+
+        changes = export_changes(self.laboratory, since=later)
+        self.assertEqual(self.rows(changes['equipment'], 'tag_number'), ['NEW'])
+        self.assertEqual(set(changes['deleted']), {self.equipment[1].pk, self.equipment[2].pk})
+        self.assertEqual(changes['assets']['rows'], [])
+
+    def test_scans_apply_in_one_pass(self):
+        first, second = self.now - timedelta(hours=2), self.now - timedelta(hours=1)
+        scans = [
+            (self.equipment[0].pk, first),
+            (self.equipment[0].pk, second),
+            (self.elsewhere.pk, first),
+            (self.laboratory.pk, first),
+        ]
+
+        with self.assertNumQueries(6):
+            result = apply_scans(self.laboratory, scans)
+
+        self.assertEqual(result['applied'], 1)
+        self.assertEqual(result['unknown'], [self.laboratory.pk])
+        self.assertEqual(result['misplaced'], [self.elsewhere.pk])
+        self.assertEqual(Equipment.objects.get(pk=self.equipment[0].pk).last_audited_at, second)
+        self.assertIsNone(Equipment.objects.get(pk=self.elsewhere.pk).last_audited_at)
+        self.assertEqual(OutboxEntry.objects.filter(changed_fields=['last_audited_at']).count(), 1)
+
+        self.assertEqual(apply_scans(self.laboratory, scans)['applied'], 0)
+
+    def test_api(self):
+        user = CustomUser.objects.create_user('auditor', password='x', is_staff=True, laboratory=self.laboratory)
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('equipment:sync-snapshot', args=[self.laboratory.pk]))
+        self.assertIn('attachment', response['Content-Disposition'])
+        watermark = response.json()['watermark']
+
+        response = self.client.get(reverse('equipment:sync-changes', args=[self.laboratory.pk]), {'since': watermark})
+        self.assertEqual(len(response.json()['equipment']['rows']), 3)  # Within the overlap.
+
+        response = self.client.post(
+            reverse('equipment:sync-scans', args=[self.laboratory.pk]),
+            json.dumps({'scans': [{'uuid': str(self.equipment[0].pk), 'scanned_at': watermark}]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['applied'], 1)
+
+        for since in ('x', '2024-13-01T00:00:00'):
+            response = self.client.get(reverse('equipment:sync-changes', args=[self.laboratory.pk]), {'since': since})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('equipment:sync-snapshot', args=[self.other_laboratory.pk]))
+        self.assertEqual(response.status_code, 404)
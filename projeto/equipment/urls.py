@@ -0,0 +1,24 @@
+from django.urls import path
+
+from . import views
+
+app_name = "equipment"
+
+urlpatterns = [
+    path("api/outbox/", views.outbox_feed, name="outbox-feed"),
+    path("api/scan/<str:code>/", views.scan_lookup, name="scan-lookup"),
+    path("api/kiosk/<uuid:laboratory>/", views.kiosk, name="kiosk"),
+    path("api/sync/<uuid:laboratory>/snapshot/", views.sync_snapshot, name="sync-snapshot"),
+    path("api/sync/<uuid:laboratory>/changes/", views.sync_changes, name="sync-changes"),
+    path("api/sync/<uuid:laboratory>/scans/", views.sync_scans, name="sync-scans"),
+    path(
+        "events/<uuid:event_uuid>/attachments/",
+        views.upload_certificate,
+        name="certificate-upload",
+    ),
+    path("attachments/<uuid:uuid>/", views.download_certificate, name="certificate-download"),
+    path("reports/projection.csv", views.projection_export, name="projection-export"),
+    path("reports/downtime.csv", views.downtime_export, name="downtime-export"),
+    path("reports/bi/<str:table>.<str:file_format>", views.bi_export, name="bi-export"),
+    path("dashboard/", views.dashboard, name="dashboard"),
+]
@@ -1,3 +1,401 @@
-from django.shortcuts import render
+import csv
+import json
+import re
+import tempfile
+from uuid import UUID
 
-# Create your views here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import DEFAULT_DB_ALIAS
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_GET, require_POST
+
+from projeto.core.scoping import get_laboratory_scope
+from projeto.core.sharding import (
+    across_databases,
+    all_databases,
+    current_database,
+    fan_out,
+    fans_out,
+    using_database,
+    using_laboratory_database,
+)
+
+from .bi_export import FORMATS, TABLES, ExportUnavailable, write_table
+from .downtime import PERCENTILES, get_downtime
+from .models import CERTIFICATE_CONTENT_TYPES, CertificateAttachment, Event, EventKind, Laboratory
+from .outbox import entry_as_dict, fetch_entries
+from .projections import get_projection
+from .snapshot import get_snapshot
+from .storage import ContentAddressedStorage, UploadTooLarge, read_stream
+from .sync import apply_scans, export_changes, export_snapshot
+
+OUTBOX_MAX_LIMIT = 1000
+PROJECTION_MAX_MONTHS = 60
+DOWNTIME_MAX_DAYS = 365 * 10
+SYNC_MAX_SCANS = 2000
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@staff_member_required
+@require_GET
+def outbox_feed(request):
+    """
+    Cursor-based read of the change feed: ``?after=<sequence>&limit=<n>``.
+    Sequences are numbered per database: with campus databases, users
+    without a laboratory read one feed per ``?database=<alias>`` (default
+    "default"), each with its own cursor, like ``deliver_outbox --database``.
+    """
+    try:
+        after = int(request.GET.get("after", 0))
+        limit = min(int(request.GET.get("limit", 500)), OUTBOX_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "after and limit must be integers"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be positive"}, status=400)
+    # Users of a laboratory read the database of its campus, set by CampusDatabaseMiddleware.
+    database = current_database() or request.GET.get("database", DEFAULT_DB_ALIAS)
+    if database not in all_databases() or request.GET.get("database", database) != database:
+        return JsonResponse({"error": "Unknown database"}, status=400)
+
+    with using_database(database):
+        entries = fetch_entries(after=after, limit=limit, scope=get_laboratory_scope(request))
+    return JsonResponse(
+        {
+            "database": database,
+            "entries": [entry_as_dict(entry) for entry in entries],
+            "next_cursor": entries[-1].sequence if entries else after,
+            "has_more": len(entries) == limit,
+        }
+    )
+
+
+@staff_member_required
+@require_POST
+def upload_certificate(request, event_uuid):
+    """
+    Streams the raw request body into the certificate store.
+    The file name comes from ``?filename=`` and the type from Content-Type.
+    """
+    scope = get_laboratory_scope(request)
+    event = get_object_or_404(
+        across_databases(scope.filter(Event.objects.all(), "item__laboratory")), pk=event_uuid
+    )
+
+    content_type = request.content_type or "application/octet-stream"
+    if content_type not in CERTIFICATE_CONTENT_TYPES:
+        return JsonResponse({"error": "Only PDF certificates are accepted"}, status=415)
+
+    max_size = settings.CERTIFICATE_MAX_UPLOAD_SIZE
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Invalid Content-Length"}, status=400)
+    if content_length > max_size:
+        return JsonResponse({"error": "File too large"}, status=413)
+
+    try:
+        digest, size = ContentAddressedStorage().save(read_stream(request), max_size=max_size)
+    except UploadTooLarge:
+        return JsonResponse({"error": "File too large"}, status=413)
+    if not size:
+        return JsonResponse({"error": "Empty upload"}, status=400)
+
+    # Created through the event: the attachment goes to the event's database.
+    attachment = event.attachments.create(
+        filename=request.GET.get("filename") or f"{event.certificate_number or digest}.pdf",
+        content_type=content_type,
+        size=size,
+        sha256=digest,
+    )
+    return JsonResponse({"uuid": attachment.uuid, "sha256": digest, "size": size}, status=201)
+
+
+def parse_range(header, size):
+    """
+    Returns ``(start, end)`` (inclusive) for a single ``bytes=`` range,
+    None when the header should be ignored, or raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+@staff_member_required
+@require_GET
+def download_certificate(request, uuid):
+    """
+    Streams a stored certificate, honouring single ``Range`` requests.
+    """
+    scope = get_laboratory_scope(request)
+    attachment = get_object_or_404(
+        across_databases(scope.filter(CertificateAttachment.objects.all(), "event__item__laboratory")), pk=uuid
+    )
+    storage = ContentAddressedStorage()
+    etag = f'"{attachment.sha256}"'
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, attachment.size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{attachment.size}"
+            return response
+
+    start, end = byte_range or (0, attachment.size - 1)
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        storage.iter_range(attachment.sha256, start, length),
+        status=206 if byte_range else 200,
+        # Rows stored before uploads were restricted may carry any type.
+        content_type=(
+            attachment.content_type if attachment.content_type in CERTIFICATE_CONTENT_TYPES
+            else "application/octet-stream"
+        ),
+    )
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = content_disposition_header(True, attachment.filename)
+    response["X-Content-Type-Options"] = "nosniff"
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{attachment.size}"
+    return response
+
+
+@staff_member_required
+@require_GET
+def projection_export(request):
+    """
+    CSV of the projected calibration and maintenance workload: ``?months=12``.
+    """
+    try:
+        months = min(max(int(request.GET.get("months", 12)), 1), PROJECTION_MAX_MONTHS)
+    except ValueError:
+        return HttpResponse("months must be an integer", status=400)
+
+    scope = get_laboratory_scope(request)
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = content_disposition_header(True, f"projection-{months}m.csv")
+    writer = csv.writer(response)
+    writer.writerow(["week", "laboratory", "category", "kind", "count", "expected_cost"])
+    for row in get_projection(months, scope.laboratory_id):
+        writer.writerow([row.week, row.laboratory, row.category, row.kind, row.count, row.expected_cost])
+    return response
+
+
+def parse_days(request):
+    return min(max(int(request.GET.get("days", 365)), 1), DOWNTIME_MAX_DAYS)
+
+
+@staff_member_required
+@require_GET
+def dashboard(request):
+    """
+    Availability, MTTR and turnaround over the last ``?days=365``, next to
+    the projected workload of the next twelve months.
+    """
+    try:
+        days = parse_days(request)
+    except ValueError:
+        return HttpResponse("days must be an integer", status=400)
+
+    scope = get_laboratory_scope(request)
+    workload = {}
+    for row in get_projection(12, scope.laboratory_id):
+        key = (row.laboratory, str(EventKind(row.kind).label))
+        totals = workload.setdefault(key, {"count": 0, "expected_cost": 0.0})
+        totals["count"] += row.count
+        totals["expected_cost"] += row.expected_cost
+
+    report = get_downtime(days, scope.laboratory_id)
+    context = {
+        **admin.site.each_context(request),
+        "title": "Indicadores de disponibilidade",
+        "days": days,
+        "availability": report.availability,
+        "turnaround": [{**row, "kind": EventKind(row["kind"]).label} for row in report.turnaround],
+        "workload": [
+            {"laboratory": laboratory, "kind": kind, **totals}
+            for (laboratory, kind), totals in sorted(workload.items())
+        ],
+    }
+    return render(request, "admin/equipment/dashboard.html", context)
+
+
+@staff_member_required
+@require_GET
+def downtime_export(request):
+    """
+    CSV of availability and MTTR (``?table=availability``, the default) or
+    turnaround percentiles (``?table=turnaround``) over the last ``?days=365``.
+    """
+    try:
+        days = parse_days(request)
+    except ValueError:
+        return HttpResponse("days must be an integer", status=400)
+    table = request.GET.get("table", "availability")
+    if table not in ("availability", "turnaround"):
+        return HttpResponse("table must be availability or turnaround", status=400)
+
+    scope = get_laboratory_scope(request)
+    rows = getattr(get_downtime(days, scope.laboratory_id), table)
+    columns = (
+        ["laboratory", "category", "equipment", "availability", "downtime_hours", "repairs", "mttr_hours"]
+        if table == "availability"
+        else ["laboratory", "category", "kind", "events", *[f"p{percentile}_hours" for percentile in PERCENTILES]]
+    )
+
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = content_disposition_header(True, f"{table}-{days}d.csv")
+    writer = csv.DictWriter(response, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+    return response
+
+
+@staff_member_required
+@require_GET
+def bi_export(request, table, file_format):
+    """
+    One BI table (see ``manage.py export_bi``) as a single Parquet or Arrow
+    file, restricted to the user's laboratory.
+    """
+    if table not in TABLES or file_format not in FORMATS:
+        raise Http404
+    output = tempfile.TemporaryFile()
+    try:
+        write_table(
+            TABLES[table],
+            output,
+            file_format,
+            scope=get_laboratory_scope(request),
+            chunk_size=settings.BI_EXPORT_CHUNK_SIZE,
+        )
+    except ExportUnavailable as error:
+        output.close()
+        return HttpResponse(str(error), status=501)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"{table}.{file_format}",
+        content_type="application/vnd.apache.parquet" if file_format == "parquet" else "application/vnd.apache.arrow.file",
+    )
+
+
+def visible_record(request, record):
+    scope = get_laboratory_scope(request)
+    return scope.is_global or record["laboratory"]["uuid"] == str(scope.laboratory_id)
+
+
+@staff_member_required
+@require_GET
+def scan_lookup(request, code):
+    """
+    Equipment and its current status for a scanned uuid, serial, tag or
+    inventory number, answered from the in-process snapshot.
+    """
+    if fans_out():
+        record = next(filter(None, fan_out(lambda: get_snapshot().lookup(code))), None)
+    else:
+        record = get_snapshot().lookup(code)
+    if record is None or not visible_record(request, record):
+        raise Http404
+    return JsonResponse(record)
+
+
+@staff_member_required
+@require_GET
+def kiosk(request, laboratory):
+    """Status board of one laboratory, answered from the in-process snapshot."""
+    scope = get_laboratory_scope(request)
+    if not scope.is_global and scope.laboratory_id != laboratory:
+        raise Http404
+    with using_laboratory_database(laboratory):
+        return JsonResponse({"equipment": get_snapshot().laboratory_records(laboratory)})
+
+
+def parse_timestamp(value):
+    """Aware datetime from an ISO 8601 string (naive ones are in TIME_ZONE), or None."""
+    parsed = parse_datetime(value or "")
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def get_sync_laboratory(request, laboratory):
+    scope = get_laboratory_scope(request)
+    if not scope.is_global and scope.laboratory_id != laboratory:
+        raise Http404
+    return get_object_or_404(Laboratory, pk=laboratory)
+
+
+@staff_member_required
+@require_GET
+def sync_snapshot(request, laboratory):
+    """
+    Full offline copy of a laboratory's equipment and assets, in columnar
+    JSON, to start an audit. Sync later with the returned ``watermark``.
+    """
+    laboratory = get_sync_laboratory(request, laboratory)
+    with using_laboratory_database(laboratory.pk):
+        response = JsonResponse(export_snapshot(laboratory))
+    response["Content-Disposition"] = content_disposition_header(True, f"audit-{laboratory.pk}.json")
+    return response
+
+
+@staff_member_required
+@require_GET
+def sync_changes(request, laboratory):
+    """Changes and tombstones since ``?since=<watermark>``."""
+    laboratory = get_sync_laboratory(request, laboratory)
+    try:
+        since = parse_timestamp(request.GET.get("since"))
+    except ValueError:
+        since = None
+    if since is None:
+        return JsonResponse({"error": "since must be an ISO 8601 datetime"}, status=400)
+    with using_laboratory_database(laboratory.pk):
+        return JsonResponse(export_changes(laboratory, since))
+
+
+@staff_member_required
+@require_POST
+def sync_scans(request, laboratory):
+    """
+    Applies a batch of audit scans: ``{"scans": [{"uuid": ..., "scanned_at": ...}]}``,
+    at most SYNC_MAX_SCANS per request.
+    """
+    laboratory = get_sync_laboratory(request, laboratory)
+    try:
+        scans = json.loads(request.body)["scans"]
+        if len(scans) > SYNC_MAX_SCANS:
+            return JsonResponse({"error": f"At most {SYNC_MAX_SCANS} scans per batch"}, status=413)
+        scans = [(UUID(scan["uuid"]), parse_timestamp(scan["scanned_at"])) for scan in scans]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid scan batch"}, status=400)
+    if any(scanned_at is None for _, scanned_at in scans):
+        return JsonResponse({"error": "scanned_at must be an ISO 8601 datetime"}, status=400)
+    with using_laboratory_database(laboratory.pk):
+        return JsonResponse(apply_scans(laboratory, scans))
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,12 +39,17 @@ PROJECT_APPS = [
 INSTALLED_APPS += PROJECT_APPS
 
 MIDDLEWARE = [
+    "projeto.core.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "projeto.core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "projeto.core.middleware.ProfilingMiddleware",
+    "projeto.core.middleware.LaboratoryScopeMiddleware",
+    "projeto.core.middleware.CampusDatabaseMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -75,6 +81,21 @@ DATABASES = {
     }
 }
 
+# Campus -> database of its laboratories' equipment and events, e.g.
+# CAMPUS_DATABASES="sede:campus_sede,vacaria:campus_vacaria"; other campuses use "default".
+# Each alias is a SQLite file next to db.sqlite3: create it with
+# `manage.py migrate --database <alias>` and `manage.py mirror_campus_data`.
+CAMPUS_DATABASES = dict(
+    pair.split(":", 1) for pair in os.environ.get("CAMPUS_DATABASES", "").split(",") if pair
+)
+for alias in sorted(set(CAMPUS_DATABASES.values()) - {"default"}):
+    DATABASES[alias] = {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / f"db-{alias}.sqlite3"}
+
+DATABASE_ROUTERS = ["projeto.core.sharding.CampusRouter"]
+
+# Gives the test cases the campus databases (and a test one when there are none).
+TEST_RUNNER = "projeto.core.test_runner.CampusTestRunner"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -111,9 +132,27 @@ LOCALE_PATHS = [
 ADMIN_LANGUAGE_CODE = 'pt-br'
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes hashed names plus .gz/.br copies; projeto.core.staticfiles.serve
+# hands them out with far-future caching when no web server serves STATIC_ROOT.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "projeto.core.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# New BaseModel rows get time-ordered (v7) UUID primary keys instead of random uuid4.
+# Existing rows keep their keys, so this can be switched on at any time.
+TIME_ORDERED_PRIMARY_KEYS = False
+
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/admin/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
@@ -121,6 +160,80 @@ DATE_FORMAT = "%d/%m/%Y"
 
 AUTH_USER_MODEL = "core.CustomUser"
 
+# Local receiver used by `manage.py deliver_outbox` when --url is not given.
+OUTBOX_WEBHOOK_URL = "http://127.0.0.1:8001/outbox/"
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_RETRIES = 5
+# Outbox readers skip entries younger than this. SQLite commits them in sequence
+# order, so 0 is safe; with concurrent writers (PostgreSQL) use a few seconds.
+OUTBOX_READ_LAG_SECONDS = 0
+
+# Content-addressed store of calibration certificate files.
+CERTIFICATE_STORAGE_ROOT = BASE_DIR / "storage" / "certificates"
+CERTIFICATE_MAX_UPLOAD_SIZE = 100 * 1024 * 1024
+
+# Uploads are always spooled to a temporary file, never kept whole in memory.
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+
+# Event history window used by `manage.py recommend_intervals`.
+CALIBRATION_INTERVAL_LOOKBACK_DAYS = 365 * 3
+
+# Events returned before this horizon are moved to the archive tier by `manage.py archive_events`.
+EVENT_ARCHIVE_HORIZON_DAYS = 365 * 3
+
+# Files produced by background jobs (`manage.py run_workers`), e.g. exports.
+JOB_OUTPUT_ROOT = BASE_DIR / "storage" / "jobs"
+# Running jobs that report no progress for this long are taken as crashed and queued again.
+JOB_LEASE_SECONDS = 15 * 60
+
+# Parquet/Arrow exports for BI written by `manage.py export_bi` (needs the "bi" extra).
+BI_EXPORT_ROOT = BASE_DIR / "storage" / "bi"
+BI_EXPORT_CHUNK_SIZE = 5000
+
+# QR codes on printed labels link to the equipment admin page under this URL
+# (`manage.py print_labels`); the admin action uses the URL of the request.
+LABEL_BASE_URL = "http://localhost:8000"
+# Worker processes that render label sheets.
+LABEL_PROCESSES = 4
+
+# Scan and kiosk endpoints read an in-process equipment snapshot refreshed at most this often.
+EQUIPMENT_SNAPSHOT_REFRESH_SECONDS = 5
+
+# Calibration digests (`manage.py send_calibration_digests`) are written to files
+# locally; point EMAIL_BACKEND at SMTP in production.
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = BASE_DIR / "storage" / "emails"
+DEFAULT_FROM_EMAIL = "calibracao@localhost"
+
+# Request metrics are served at /metrics to these addresses (and to staff users).
+# They are kept in process memory, so the application must run in a single worker
+# process for them to be complete. Behind a reverse proxy on the same host every
+# client appears as 127.0.0.1: set METRICS_TOKEN there, and scrapers then send
+# "Authorization: Bearer <token>" instead of being trusted by address.
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Requests slower than this are logged to "projeto.requests" as JSON; None disables it.
+SLOW_REQUEST_THRESHOLD_MS = 1000
+
+# Superusers profile a request with the X-Profile header or ?_profile; reports are saved here.
+PROFILE_ROOT = BASE_DIR / "storage" / "profiles"
+
+# SELECTs slower than this are EXPLAINed and logged to "projeto.sql"; None disables it.
+SLOW_QUERY_THRESHOLD_MS = 500
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "projeto.requests": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+        "projeto.sql": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
+}
+
 JAZZMIN_SETTINGS = {
 
     # "hide_apps": ["core"],  # Esconde o app "core" do menu lateral
@@ -130,10 +243,17 @@ JAZZMIN_SETTINGS = {
         "auth.Group": "fas fa-users",
         "equipment.Equipment": "fas fa-microscope",
         "equipment.Event": "fas fa-calendar-check",
+        "equipment.EventHistory": "fas fa-history",
+        "equipment.OutboxEntry": "fas fa-stream",
+        "core.Job": "fas fa-tasks",
         "equipment.Laboratory": "fas fa-flask",
         "equipment.Asset": "fas fa-box",
     },
 
+    "topmenu_links": [
+        {"name": "Indicadores", "url": "equipment:dashboard", "permissions": ["equipment.view_event"]},
+    ],
+
     "side_menu": [
         {
             "label": "Autenticação e Autorização",
@@ -151,6 +271,14 @@ JAZZMIN_SETTINGS = {
                 "equipment.Equipment",
                 "equipment.Asset",
                 "equipment.Event",
+                "equipment.EventHistory",
+            ]
+        },
+        {
+            "label": "Tarefas",
+            "icon": "fas fa-tasks",
+            "models": [
+                "core.Job",
             ]
         },
     ],
@@ -1,8 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from django.views.generic.base import RedirectView
 from django.urls import path
-from projeto.core import views as my_views
+from projeto.core import staticfiles, views as my_views
 
 urlpatterns = [
     # redireciona o admin/login para o seu login customizado
@@ -13,6 +14,11 @@ urlpatterns = [
 
     path('admin/', admin.site.urls),
 
+    path('equipment/', include('projeto.equipment.urls')),
+    path('jobs/<uuid:uuid>/output/', my_views.job_output, name='job-output'),
+    path('metrics', my_views.metrics, name='metrics'),
+    re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), staticfiles.serve, name='static'),
+
     # sua URL raiz
     path('', RedirectView.as_view(url='/admin/', permanent=False)),
 ]